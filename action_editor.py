@@ -0,0 +1,118 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from actions import ACTION_KINDS, CLICK, Action
+from conditions import CHANGE, DEFAULT_TIMEOUT, IMAGE, PIXEL, STABLE, Condition
+from screen import format_color
+from input_backends import BUTTONS
+
+
+class ActionEditor:
+    """Toplevel for setting the button, action and own delay of selected points.
+
+    on_apply(button, delay, action) gets the button name, the delay in
+    seconds (None for the job's) and an Action; if it returns False (or
+    raises ValueError) the window stays open.
+    """
+
+    def __init__(self, parent, on_apply, count, button="left", delay=None, action=None):
+        self.on_apply = on_apply
+        action = action or Action()
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"🖱 Point Action ({count} point{'s' if count != 1 else ''})")
+        self.window.resizable(False, False)
+        self.window.transient(parent)
+        frame = ttk.Frame(self.window, padding="10")
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E))
+
+        self.button_var = tk.StringVar(value=button)
+        self.kind_var = tk.StringVar(value=action.kind)
+        self.count_var = tk.StringVar(value=str(action.count))
+        self.gap_var = tk.StringVar(value=f"{action.gap * 1000:g}")
+        self.duration_var = tk.StringVar(value=f"{action.duration:g}")
+        self.to_x_var = tk.StringVar(value=str(action.to[0]) if action.to else "")
+        self.to_y_var = tk.StringVar(value=str(action.to[1]) if action.to else "")
+        self.keys_var = tk.StringVar(value=action.keys)
+        self.delay_var = tk.StringVar(value=f"{delay:g}" if delay is not None else "")
+        when = self.when = action.when
+        self.when_var = tk.StringVar(value=when.kind if when else "")
+        self.when_value_var = tk.StringVar(value=self.format_when(when) if when else "")
+        self.timeout_var = tk.StringVar(value=f"{when.timeout if when else DEFAULT_TIMEOUT:g}")
+
+        fields = [
+            ("Action:", ttk.Combobox(frame, textvariable=self.kind_var, values=ACTION_KINDS, state="readonly", width=10)),
+            ("Button:", ttk.Combobox(frame, textvariable=self.button_var, values=BUTTONS, state="readonly", width=10)),
+            ("Clicks:", ttk.Spinbox(frame, from_=1, to=10, textvariable=self.count_var, width=10)),
+            ("Gap (ms):", ttk.Entry(frame, textvariable=self.gap_var, width=12)),
+            ("Duration (s):", ttk.Entry(frame, textvariable=self.duration_var, width=12)),
+            ("Drag to X:", ttk.Entry(frame, textvariable=self.to_x_var, width=12)),
+            ("Drag to Y:", ttk.Entry(frame, textvariable=self.to_y_var, width=12)),
+            ("Keys:", ttk.Entry(frame, textvariable=self.keys_var, width=12)),
+            ("Own delay (s):", ttk.Entry(frame, textvariable=self.delay_var, width=12)),
+            ("Wait for:", ttk.Combobox(frame, textvariable=self.when_var, values=("", PIXEL, IMAGE, CHANGE, STABLE),
+                                       state="readonly", width=10)),
+            ("Color / image / region:", ttk.Entry(frame, textvariable=self.when_value_var, width=12)),
+            ("Timeout (s):", ttk.Entry(frame, textvariable=self.timeout_var, width=12)),
+        ]
+        for row, (label, widget) in enumerate(fields):
+            ttk.Label(frame, text=label, font=('Segoe UI', 8)).grid(row=row, column=0, sticky=tk.W, pady=1)
+            widget.grid(row=row, column=1, sticky=tk.W, padx=(5, 0), pady=1)
+        ttk.Label(frame, text="Keys: e.g. enter, ctrl+c, ctrl+a delete\nOwn delay: blank uses the job's\n"
+                             "Wait for: pixel at the point is #rrggbb, image file on screen,\n"
+                             "or region (left, top, width, height) changes / stops changing",
+                  font=('Segoe UI', 7), foreground='#64748b').grid(row=len(fields), column=0, columnspan=2,
+                                                                     sticky=tk.W, pady=(5, 0))
+
+        button_frame = ttk.Frame(frame)
+        button_frame.grid(row=len(fields) + 1, column=0, columnspan=2, sticky=tk.E, pady=(8, 0))
+        ttk.Button(button_frame, text="Apply", style="Primary.TButton", command=self.apply,
+                   width=8).grid(row=0, column=0, padx=(0, 3))
+        ttk.Button(button_frame, text="Close", command=self.window.destroy, width=8).grid(row=0, column=1)
+        self.window.bind('<Return>', lambda event: self.apply())
+
+    @staticmethod
+    def format_when(when):
+        if when.kind == PIXEL:
+            return format_color(when.color)
+        if when.kind == IMAGE:
+            return when.image
+        return ", ".join(str(value) for value in when.region) if when.region else ""
+
+    def build(self):
+        """Return (button, delay, action) from the fields; ValueError if invalid"""
+        to = None
+        if self.to_x_var.get().strip() or self.to_y_var.get().strip():
+            to = (int(self.to_x_var.get()), int(self.to_y_var.get()))
+        when = None
+        kind = self.when_var.get()
+        if kind:
+            # Keep settings the window doesn't show (region, offset, tolerance)
+            data = self.when.to_dict() if self.when and self.when.kind == kind else {}
+            value = self.when_value_var.get().strip()
+            if kind in (CHANGE, STABLE):
+                # Blank watches the whole screen
+                value = [int(part) for part in value.replace(",", " ").split()] if value else None
+            data.update({"color" if kind == PIXEL else kind: value,
+                         "timeout": float(self.timeout_var.get() or 0)})
+            when = Condition.from_dict(data)
+        action = Action(kind=self.kind_var.get() or CLICK,
+                        count=int(self.count_var.get() or 1),
+                        gap=float(self.gap_var.get() or 0) / 1000,
+                        duration=float(self.duration_var.get() or 0),
+                        to=to,
+                        keys=self.keys_var.get(),
+                        when=when)
+        action.validate()
+        delay_text = self.delay_var.get().strip()
+        return self.button_var.get(), float(delay_text) if delay_text else None, action
+
+    def apply(self):
+        try:
+            button, delay, action = self.build()
+            applied = self.on_apply(button, delay, action)
+        except ValueError as e:
+            messagebox.showerror("Invalid Action", str(e), parent=self.window)
+            return
+        if applied is not False:
+            self.window.destroy()
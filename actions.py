@@ -0,0 +1,197 @@
+import time
+
+from conditions import Condition, ConditionalProgram
+from input_backends import check_key
+
+# Action kinds
+CLICK = "click"
+HOLD = "hold"
+DRAG = "drag"
+KEY = "key"
+MOVE = "move"
+ACTION_KINDS = (CLICK, HOLD, DRAG, KEY, MOVE)
+
+MAX_CLICK_COUNT = 10
+MAX_ACTION_SECONDS = 60.0  # Longest hold/drag/key press
+DRAG_STEP = 0.01  # Seconds between pointer moves during a drag
+MAX_DRAG_MOVES = 1000
+SPIN_NS = 1_000_000  # Busy-wait the final millisecond before each step
+
+# Steps that undo a press; they still run when an action is cut short
+RELEASE_OPS = ("release", "key_up")
+
+
+class Action:
+    """What a point does instead of one click (its button comes from the point).
+
+    click: count clicks, gap seconds apart (double/triple clicks)
+    hold:  press, keep the button down for duration seconds, release
+    drag:  press at the point, move to `to` over duration seconds, release there
+    key:   press keys, e.g. "enter", "ctrl+c" or "ctrl+a delete" (combos are
+           separated by spaces and pressed gap seconds apart, each held for
+           duration); the point's coordinates are not used
+    move:  move the pointer to the point without clicking (recorded paths)
+
+    when (a conditions.Condition or its dict) makes any kind wait for a
+    pixel color or template image on screen first.
+    """
+
+    def __init__(self, kind=CLICK, count=1, gap=0.05, duration=0.0, to=None, keys="", when=None):
+        self.kind = kind
+        self.count = int(count)
+        self.gap = float(gap)
+        self.duration = float(duration)
+        self.to = tuple(int(value) for value in to) if to is not None else None
+        self.keys = keys.strip().lower()
+        self.when = Condition.from_dict(when) if isinstance(when, dict) else when
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{key: data[key] for key in ("kind", "count", "gap", "duration", "to", "keys", "when")
+                      if key in data})
+
+    def to_dict(self):
+        """Return the fields that matter for this kind"""
+        data = {"kind": self.kind}
+        if self.kind == CLICK:
+            data.update(count=self.count, gap=self.gap)
+        elif self.kind == HOLD:
+            data.update(duration=self.duration)
+        elif self.kind == DRAG:
+            data.update(to=list(self.to), duration=self.duration)
+        elif self.kind == KEY:
+            data.update(keys=self.keys, gap=self.gap, duration=self.duration)
+        if self.when is not None:
+            data["when"] = self.when.to_dict()
+        return data
+
+    def __eq__(self, other):
+        return isinstance(other, Action) and self.to_dict() == other.to_dict()
+
+    def validate(self):
+        """Raise ValueError if the action cannot be run"""
+        if self.kind not in ACTION_KINDS:
+            raise ValueError(f"Unknown action kind {self.kind!r} (choose from {', '.join(ACTION_KINDS)})")
+        if not 1 <= self.count <= MAX_CLICK_COUNT:
+            raise ValueError(f"Click count per point must be 1-{MAX_CLICK_COUNT}")
+        if not (0 <= self.gap <= MAX_ACTION_SECONDS and 0 <= self.duration <= MAX_ACTION_SECONDS):
+            raise ValueError(f"Action gaps and durations must be 0-{MAX_ACTION_SECONDS:g} seconds")
+        if self.kind == DRAG and (self.to is None or len(self.to) != 2):
+            raise ValueError("A drag needs a target point")
+        if self.kind == KEY:
+            if not self.keys:
+                raise ValueError("A key action needs keys")
+            for combo in self.keys.split():
+                for key in combo.split("+"):
+                    check_key(key)
+        if self.when is not None:
+            self.when.validate()
+
+    def is_plain(self):
+        """Return True for a single click (stored without an Action)"""
+        return self.kind == CLICK and self.count == 1 and self.when is None
+
+    def describe(self):
+        if self.when is not None:
+            return f"{self.describe_kind()} {self.when.describe()}"
+        return self.describe_kind()
+
+    def describe_kind(self):
+        if self.kind == CLICK:
+            return f"×{self.count}"
+        if self.kind == HOLD:
+            return f"hold {self.duration:.2f}s"
+        if self.kind == DRAG:
+            return f"drag → ({self.to[0]}, {self.to[1]})"
+        if self.kind == MOVE:
+            return "move"
+        return f"key {self.keys}"
+
+    def span(self):
+        """Seconds from the first step to the last"""
+        return self.steps(0, 0)[-1][0] / 1e9
+
+    def steps(self, x, y, button="left"):
+        """Return the action as (offset_ns, op, args) backend steps"""
+        gap_ns = int(self.gap * 1e9)
+        duration_ns = int(self.duration * 1e9)
+        if self.kind == CLICK:
+            return [(index * gap_ns, "click", (x, y, button)) for index in range(self.count)]
+        if self.kind == HOLD:
+            return [(0, "press", (x, y, button)), (duration_ns, "release", (x, y, button))]
+        if self.kind == DRAG:
+            to_x, to_y = self.to
+            moves = max(1, min(MAX_DRAG_MOVES, int(self.duration / DRAG_STEP)))
+            steps = [(0, "press", (x, y, button))]
+            for move in range(1, moves + 1):
+                fraction = move / moves
+                steps.append((duration_ns * move // moves, "move",
+                              (round(x + (to_x - x) * fraction), round(y + (to_y - y) * fraction))))
+            steps.append((duration_ns, "release", (to_x, to_y, button)))
+            return steps
+        if self.kind == MOVE:
+            return [(0, "move", (x, y))]
+        steps = []
+        offset = 0
+        for combo in self.keys.split():
+            keys = combo.split("+")
+            steps += [(offset, "key_down", (key,)) for key in keys]
+            offset += duration_ns
+            steps += [(offset, "key_up", (key,)) for key in reversed(keys)]
+            offset += gap_ns
+        return steps
+
+    def compile(self, backend, x, y, button="left", capture=None):
+        """Bind the steps to a backend: a program for perform().
+
+        Actions with a condition need a screen.CaptureCache and become a
+        ConditionalProgram that compiles its steps once the condition holds.
+        """
+        if self.when is not None:
+            if capture is None:
+                raise ValueError("Conditional actions need a screen source")
+            return ConditionalProgram(self, self.when, capture, backend, x, y, button)
+        return self.compile_steps(backend, x, y, button)
+
+    def compile_steps(self, backend, x, y, button="left"):
+        return [(offset, getattr(backend, op), args, op in RELEASE_OPS) for offset, op, args in self.steps(x, y, button)]
+
+
+def perform(program, stop_event=None, clock=time.perf_counter_ns):
+    """Run a compiled action, each step at its offset from now.
+
+    Waits sleep on stop_event; if it is set (or a step raises, e.g. the
+    failsafe) the outstanding releases still run so no button or key is
+    left held. Returns False if the action was stopped.
+    """
+    if isinstance(program, ConditionalProgram):
+        return program.run(perform, stop_event)
+    start = clock()
+    index = 0
+    try:
+        for index, (offset, fn, args, _) in enumerate(program):
+            deadline = start + offset
+            remaining = deadline - clock()
+            if remaining > SPIN_NS:
+                if stop_event is None:
+                    time.sleep((remaining - SPIN_NS) / 1e9)
+                elif stop_event.wait((remaining - SPIN_NS) / 1e9):
+                    release_all(program[index:])
+                    return False
+            while clock() < deadline:
+                pass
+            fn(*args)
+    except BaseException:
+        release_all(program[index + 1:])
+        raise
+    return True
+
+
+def release_all(program):
+    """Run the release steps of a program, ignoring errors"""
+    for _, fn, args, release in program:
+        if release:
+            try:
+                fn(*args)
+            except Exception:
+                pass
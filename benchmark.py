@@ -0,0 +1,267 @@
+"""Click engine benchmarks: python benchmark.py [--quick] [--output FILE] [--compare FILE]
+
+Runs headless against the simulated input backend and measures click
+throughput per point count, interval accuracy/jitter, emergency stop
+latency, logging overhead, multi-job scheduler lateness and memory growth over a long unlimited run
+(simulated on a virtual clock). Results are emitted as JSON; --compare
+checks them against a previous result file and exits non-zero on
+regressions beyond --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from click_engine import ClickEngine, ClickJob, NullLog
+from input_backends import SimulatedBackend
+from job_scheduler import JobScheduler
+from log_pipeline import LogPipeline
+from precision_timer import PrecisionScheduler
+from stop_signal import StopSignal
+
+
+class VirtualClock:
+    """Deterministic nanosecond clock: waiting advances time instantly"""
+
+    def __init__(self):
+        self.now_ns = 0
+
+    def __call__(self):
+        return self.now_ns
+
+    def wait(self, event, timeout):
+        """PrecisionScheduler waiter that jumps the clock forward"""
+        if not event.is_set():
+            self.now_ns += int(timeout * 1e9)
+        return event.is_set()
+
+    def scheduler(self, stop_event):
+        """PrecisionScheduler driven by this clock (no spinning)"""
+        return PrecisionScheduler(stop_event, clock=self, waiter=self.wait, spin_ns=0)
+
+
+class VirtualBackend(SimulatedBackend):
+    """Simulated backend on a virtual clock that stops the run after max_clicks"""
+
+    def __init__(self, clock, stop_event, max_clicks, click_cost_ns=20_000):
+        super().__init__(clock=clock, max_records=1)
+        self.virtual_clock = clock
+        self.stop_event = stop_event
+        self.max_clicks = max_clicks
+        self.cost_ns = click_cost_ns
+
+    def click(self, x, y, button="left"):
+        self.virtual_clock.now_ns += self.cost_ns
+        super().click(x, y, button)
+        if self.click_count >= self.max_clicks:
+            self.stop_event.trigger("benchmark done")
+
+
+def percentiles(values, scale=1.0):
+    """Return p50/p99/max of values (multiplied by scale)"""
+    if not values:
+        return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def pick(pct):
+        return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))] * scale
+
+    return {"p50": pick(50), "p99": pick(99), "max": ordered[-1] * scale}
+
+
+def run_job(job, backend=None, log=None, stop_event=None, scheduler_factory=PrecisionScheduler):
+    """Run a job on a fresh engine and return (stats, backend)"""
+    backend = backend or SimulatedBackend(max_records=None)
+    engine = ClickEngine(backend, stop_event=stop_event or StopSignal(), log=log or NullLog(),
+                         scheduler_factory=scheduler_factory)
+    return engine.run(job), backend
+
+
+def bench_throughput(clicks, point_counts, burst=False):
+    """Max sustained clicks/s with zero interval and point delay"""
+    results = {}
+    for count in point_counts:
+        points = [(i % 1920, i % 1080) for i in range(count)]
+        stats, _ = run_job(ClickJob(points, max_clicks=clicks, interval=0, point_delay=0, burst=burst))
+        results[str(count)] = {"clicks_per_sec": stats.clicks / stats.elapsed, "clicks": stats.clicks}
+    return results
+
+
+def bench_jitter(clicks, intervals):
+    """Inter-click interval error for a single point at several intervals"""
+    results = {}
+    for interval in intervals:
+        stats, backend = run_job(ClickJob([(10, 10)], max_clicks=clicks, interval=interval, point_delay=0,
+                                          burst=False))
+        stamps = [t for t, _, _, _ in backend.clicks()]
+        errors_ms = [abs((b - a) / 1e6 - interval * 1000) for a, b in zip(stamps, stamps[1:])]
+        results[f"{interval * 1000:g}ms"] = {
+            "achieved_rate": stats.timing["achieved_rate"],
+            "target_rate": 1 / interval,
+            "interval_error_ms": percentiles(errors_ms),
+            "overruns": stats.timing["overruns"],
+        }
+    return results
+
+
+def bench_stop_latency(trials, interval=0.01):
+    """Time from stop signal to engine return, and clicks after the signal"""
+    return_latency_ms = []
+    late_clicks = 0
+    for _ in range(trials):
+        stop_event = StopSignal()
+        backend = SimulatedBackend(max_records=None)
+        thread = threading.Thread(target=run_job, args=(ClickJob([(10, 10), (20, 20)], interval=interval,
+                                                                 point_delay=interval / 2),),
+                                  kwargs={"backend": backend, "stop_event": stop_event})
+        thread.start()
+        time.sleep(random.uniform(0.02, 0.05))
+        signalled = time.perf_counter_ns()
+        stop_event.trigger("benchmark")
+        thread.join()
+        return_latency_ms.append((time.perf_counter_ns() - signalled) / 1e6)
+        late_clicks += sum(1 for t, _, _, _ in backend.clicks() if t > signalled)
+    return {"return_latency_ms": percentiles(return_latency_ms), "clicks_after_signal": late_clicks,
+            "trials": trials}
+
+
+def bench_log_overhead(clicks):
+    """Throughput with no log, and with the log pipeline in each click format"""
+    points = [(10, 10), (20, 20)]
+    results = {}
+    baseline, _ = run_job(ClickJob(points, max_clicks=clicks, interval=0, point_delay=0, burst=False))
+    results["none"] = {"clicks_per_sec": clicks / baseline.elapsed}
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in ("text", "jsonl", "binary"):
+            log = LogPipeline(os.path.join(directory, f"bench_{fmt}.log"), gui=False, click_format=fmt)
+            stats, _ = run_job(ClickJob(points, max_clicks=clicks, interval=0, point_delay=0, burst=False),
+                               log=log)
+            drain_started = time.perf_counter()
+            log.close()
+            results[fmt] = {
+                "clicks_per_sec": clicks / stats.elapsed,
+                "per_click_overhead_us": (stats.elapsed - baseline.elapsed) / clicks * 1e6,
+                "writer_drain_sec": time.perf_counter() - drain_started,
+            }
+    return results
+
+
+def bench_memory(clicks, checkpoints=5, interval=0.01):
+    """Memory growth over a long unlimited run, simulated on a virtual clock"""
+    samples = []
+    tracemalloc.start()
+    try:
+        step = clicks // checkpoints
+        for checkpoint in range(1, checkpoints + 1):
+            clock = VirtualClock()
+            stop_event = StopSignal()
+            backend = VirtualBackend(clock, stop_event, step * checkpoint)
+            run_job(ClickJob([(10, 10), (20, 20)], interval=interval, point_delay=0, burst=False),
+                    backend=backend,
+                    stop_event=stop_event, scheduler_factory=clock.scheduler)
+            current, peak = tracemalloc.get_traced_memory()
+            samples.append({"clicks": step * checkpoint, "simulated_hours": clock.now_ns / 3.6e12,
+                            "peak_kb": peak / 1024})
+            tracemalloc.reset_peak()
+    finally:
+        tracemalloc.stop()
+    return {"samples": samples, "growth_kb": samples[-1]["peak_kb"] - samples[0]["peak_kb"]}
+
+
+def bench_scheduler(jobs, duration, interval=0.02):
+    """Deadline lateness with many concurrent jobs sharing one JobScheduler thread"""
+    backend = SimulatedBackend(max_records=None)
+    threads_before = threading.active_count()
+    scheduler = JobScheduler(backend)
+    for i in range(jobs):
+        scheduler.add(ClickJob([(i, i)], interval=interval, point_delay=0, burst=False),
+                      delay=i * interval / jobs)
+    threads = threading.active_count() - threads_before
+    time.sleep(duration)
+    scheduler.close()
+    lateness_ms = [ns / 1e6 for entry in scheduler.jobs.values() for ns in entry.timing.lateness_ns]
+    return {"jobs": jobs, "threads": threads, "target_rate": jobs / interval,
+            "achieved_rate": backend.click_count / duration, "lateness_ms": percentiles(lateness_ms)}
+
+
+def run_all(quick=False):
+    scale = 10 if quick else 1
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "quick": quick, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "throughput": bench_throughput(200_000 // scale, (1, 10, 100)),
+        "throughput_burst": bench_throughput(200_000 // scale, (1, 10, 100), burst=True),
+        "jitter": bench_jitter(500 // scale, (0.001, 0.005, 0.02)),
+        "stop_latency": bench_stop_latency(20 // scale),
+        "log_overhead": bench_log_overhead(100_000 // scale),
+        "scheduler": bench_scheduler(50, 0.5 if quick else 3.0),
+        "memory": bench_memory(400_000 // scale),
+    }
+
+
+# Headline metrics checked by --compare: (path, higher_is_better)
+REGRESSION_CHECKS = [
+    (("throughput", "1", "clicks_per_sec"), True),
+    (("throughput", "100", "clicks_per_sec"), True),
+    (("throughput_burst", "100", "clicks_per_sec"), True),
+    (("jitter", "5ms", "interval_error_ms", "p99"), False),
+    (("stop_latency", "return_latency_ms", "p99"), False),
+    (("log_overhead", "text", "clicks_per_sec"), True),
+    (("scheduler", "lateness_ms", "p99"), False),
+    (("memory", "growth_kb"), False),
+]
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression descriptions (empty if none)"""
+    regressions = []
+    for path, higher_is_better in REGRESSION_CHECKS:
+        try:
+            new, old = results, baseline
+            for key in path:
+                new, old = new[key], old[key]
+        except KeyError:
+            continue
+        if higher_is_better:
+            regressed = new < old * (1 - tolerance)
+        else:
+            # Absolute slack so near-zero baselines don't flag noise
+            regressed = new > old * (1 + tolerance) + 0.5
+        if regressed:
+            regressions.append(f"{'.'.join(path)}: {old:.3f} -> {new:.3f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Auto Clicker engine benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Smaller runs (about 10x faster)")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Baseline JSON results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.quick)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Headless entry point: python main.py run --config job.json
+
+Runs a click job on the ClickEngine without importing tkinter or plyer.
+The job file uses the same keys as autoclicker_settings.json
+(click_points, click_mode, click_count, interval, point_delay) or the
+ClickJob names (points, max_clicks, max_cycles, interval, point_delay). A "jobs" list
+of such entries (each with an optional "name" and start "delay" in
+seconds) runs them concurrently on one JobScheduler thread.
+--job-profile runs a profile saved from the GUI instead of a job file.
+A "source" entry generates the points while the job runs (grid sweeps,
+random points, a tailed file or a plugin; see click_sources).
+--points takes the points from a CSV, .npy or .acseq file; .acseq files
+are memory-mapped and streamed. "python main.py convert IN OUT" converts
+between the point file formats (CSV to .acseq streams row by row).
+"""
+import argparse
+import json
+import signal
+import sys
+
+from click_engine import ClickEngine, ClickJob
+from input_backends import BACKEND_NAMES, create_backend
+from job_scheduler import JobScheduler
+from log_pipeline import LogPipeline, LOG_FILE, load_logging_config
+from metrics import Metrics, MetricsServer
+from point_files import SEQUENCE_EXTENSION, iter_csv, load_points, save_points, write_sequence
+from profiling import PROFILE_MODES, Profiler
+from profile_store import ProfileStore
+from stop_signal import StopMonitor, StopSignal, STOP_FILE, create_stop_file_watcher, default_hotkey_backend
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="Auto Clicker Pro command line")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run a click job headlessly")
+    source = run.add_mutually_exclusive_group(required=True)
+    source.add_argument("--config", help="Job file (JSON)")
+    source.add_argument("--job-profile", metavar="NAME",
+                        help="Saved profile from the profile store ($AUTOCLICKER_PROFILES to relocate it)")
+    run.add_argument("--backend", choices=BACKEND_NAMES, default=None,
+                     help="Input backend (default: the job file's 'input_backend', else auto)")
+    run.add_argument("--log-file", default=LOG_FILE, help=f"Log file (default: {LOG_FILE})")
+    run.add_argument("--settings", default="autoclicker_settings.json",
+                     help="Settings file to read the optional 'logging' section from")
+    run.add_argument("--metrics-port", type=int, default=None,
+                     help="Serve /metrics (Prometheus) and /metrics.json on this localhost port")
+    run.add_argument("--profile", choices=PROFILE_MODES, default=None,
+                     help="Time click loop phases (spans), also write a Chrome trace (trace) or "
+                          "cProfile stats (cprofile); default: $AUTOCLICKER_PROFILE")
+    run.add_argument("--profile-output", default=None, help="Trace/profile output file")
+    run.add_argument("--points", default=None, metavar="FILE",
+                     help="Take the points from a CSV, .npy or .acseq file (.acseq is streamed)")
+
+    convert = commands.add_parser("convert", help="Convert a point file between CSV, .npy and .acseq")
+    convert.add_argument("source", help="Input point file")
+    convert.add_argument("target", help="Output point file (format from the extension)")
+    return parser
+
+
+def run_job(args):
+    """Run one job, print its stats as JSON and return the exit code"""
+    try:
+        data = load_job_data(args)
+        if args.points:
+            data["points_file"] = args.points
+        specs = data["jobs"] if "jobs" in data else [data]
+        jobs = [ClickJob.from_dict(spec) for spec in specs]
+        if not jobs:
+            raise ValueError("'jobs' is empty")
+        for job in jobs:
+            job.validate()
+            if "jobs" in data and job.source is not None:
+                raise ValueError("generated click sources can't run as concurrent jobs")
+        backend = create_backend(args.backend or data.get("input_backend", "auto"))
+        profiler = Profiler(args.profile, args.profile_output) if args.profile else Profiler.from_env()
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Cannot run job {args.config or args.job_profile}: {e}", file=sys.stderr)
+        return 2
+
+    stop_event = StopSignal()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.trigger("interrupted"))
+    monitor = StopMonitor(stop_event, [default_hotkey_backend(), create_stop_file_watcher(STOP_FILE)])
+    log = LogPipeline(args.log_file, gui=False, **load_logging_config(args.settings))
+    metrics = Metrics()
+    server = None
+    if args.metrics_port:
+        try:
+            server = MetricsServer(metrics, args.metrics_port).start()
+        except OSError as e:
+            print(f"Metrics endpoint unavailable on port {args.metrics_port}: {e}", file=sys.stderr)
+
+    tracer = profiler.tracer if profiler else None
+    monitor.start()
+    try:
+        if "jobs" in data:
+            result = run_concurrent(jobs, specs, backend, stop_event, log, metrics, tracer)
+        else:
+            engine = ClickEngine(backend, stop_event=stop_event, log=log, metrics=metrics, tracer=tracer)
+            result = (profiler.run(engine.run, jobs[0]) if profiler else engine.run(jobs[0])).to_dict()
+        if profiler:
+            profiler.finish(lambda line: print(line, file=sys.stderr))
+    finally:
+        monitor.stop()
+        log.close()
+        backend.close()
+        if server:
+            server.close()
+
+    if stop_event.reason:
+        result["stop_signal"] = stop_event.reason
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def load_job_data(args):
+    """Return the job dict from --config or --job-profile"""
+    if args.config:
+        with open(args.config, 'r') as f:
+            return json.load(f)
+    store = ProfileStore()
+    try:
+        if args.job_profile not in store:
+            raise ValueError(f"no profile named '{args.job_profile}' ({len(store)} saved in {store.path})")
+        profile = store.get(args.job_profile)
+        return dict(profile.settings, click_points=profile.points)
+    finally:
+        store.close()
+
+
+def run_concurrent(jobs, specs, backend, stop_event, log, metrics=None, tracer=None):
+    """Run several jobs at once on a JobScheduler and return their stats"""
+    scheduler = JobScheduler(backend, stop_event=stop_event, log=log, metrics=metrics, tracer=tracer)
+    try:
+        for job, spec in zip(jobs, specs):
+            scheduler.add(job, name=spec.get("name"), delay=float(spec.get("delay", 0)))
+        # Short timeouts keep the main thread responsive to Ctrl+C
+        while not scheduler.wait(0.5):
+            pass
+    finally:
+        scheduler.close()
+    return {"jobs": scheduler.stats()}
+
+
+def convert_points(args):
+    """Convert a point file; CSV to .acseq streams without loading the points"""
+    try:
+        source_csv = not args.source.lower().endswith((".npy", SEQUENCE_EXTENSION))
+        if source_csv and args.target.lower().endswith(SEQUENCE_EXTENSION):
+            count = write_sequence(iter_csv(args.source), args.target, delays=True, buttons=True)
+        else:
+            count = save_points(load_points(args.source), args.target)
+    except (OSError, ValueError) as e:
+        print(f"Cannot convert {args.source}: {e}", file=sys.stderr)
+        return 2
+    print(f"{count} points written to {args.target}")
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        return run_job(args)
+    if args.command == "convert":
+        return convert_points(args)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,474 @@
+import itertools
+import time
+
+from actions import perform
+from click_sources import PREFETCH, ClickSource, Prefetcher, SourceError, read_row
+from input_backends import FailSafeError, create_backend, validate_batch
+from log_pipeline import OUTCOME_ERROR, OUTCOME_FAILSAFE
+from point_store import PointStore
+from precision_timer import PrecisionScheduler
+from screen import CaptureCache, create_screen
+from stop_signal import StopSignal
+
+# Stop reasons reported in RunStats
+COMPLETED = "completed"
+STOPPED = "stopped"
+FAILSAFE = "failsafe"
+ERROR = "error"
+
+# Burst mode: when points follow each other this closely, whole cycles are
+# compiled into one action list and handed to the backend in a single call.
+# Batches are capped in size and timeline span so stops stay responsive.
+BURST_MAX_POINT_DELAY = 0.002
+BURST_MAX_CLICKS = 1000
+BURST_MAX_SPAN = 0.05
+
+
+def compile_burst(points, point_delay, interval, cycles):
+    """Compile cycles over points into (offset_ns, x, y, button) actions and point indexes"""
+    actions = []
+    point_indexes = []
+    offset = 0
+    waits_ns = [int(wait * 1e9) for wait in points.delays_before(interval, point_delay)]
+    buttons = points.button_names()
+    for cycle in range(cycles):
+        for point_index, (x, y) in enumerate(points):
+            if point_index or cycle:
+                offset += waits_ns[point_index]
+            actions.append((offset, x, y, buttons[point_index]))
+            point_indexes.append(point_index)
+    return actions, point_indexes
+
+
+class NullLog:
+    """Log sink that drops everything (LogPipeline-compatible)"""
+
+    def message(self, text):
+        pass
+
+    def click(self, point_index, x, y, total, outcome=0):
+        pass
+
+    def burst(self, actions, point_indexes, first_total):
+        pass
+
+    def cycle(self, total):
+        pass
+
+
+class ClickJob:
+    """A click job specification, independent of the GUI.
+
+    points may be a PointStore, which is snapshotted rather than copied, a
+    memory-mapped point_files.PointSequence, which is streamed, or
+    (x, y[, delay[, button[, action]]]) rows. With a click_sources.ClickSource
+    the points are generated while the job runs instead (each row waits its
+    own delay or point_delay; the job ends when the source runs out).
+    max_cycles ends the job after that many passes over the points, whether
+    or not their clicks succeeded.
+    """
+
+    def __init__(self, points=(), max_clicks=None, interval=1.0, point_delay=0.1, burst="auto", duration=None,
+                 source=None, prefetch=PREFETCH, max_cycles=None):
+        self.source = source
+        self.prefetch = int(prefetch)
+        if hasattr(points, "snapshot"):
+            self.points = points.snapshot()
+        else:
+            self.points = PointStore.from_points((int(x), int(y), *rest) for x, y, *rest in points)
+        self.max_clicks = max_clicks
+        self.max_cycles = max_cycles
+        self.interval = float(interval)
+        self.point_delay = float(point_delay)
+        self.burst = burst
+        self.duration = float(duration) if duration else None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a job from a job file or the GUI settings dict.
+
+        "points_file" names a CSV, .npy or .acseq file to use instead of
+        inline points (.acseq files are memory-mapped and streamed), and
+        "source" a generated source (see ClickSource.from_dict).
+        """
+        max_clicks = data.get("max_clicks")
+        if max_clicks is None and data.get("click_mode") == "limited":
+            max_clicks = int(data.get("click_count", 0))
+        if data.get("points_file"):
+            from point_files import open_points
+            points = open_points(data["points_file"])
+        else:
+            points = data.get("points", data.get("click_points", []))
+        return cls(
+            points=points,
+            max_clicks=max_clicks,
+            interval=data.get("interval", 1.0),
+            point_delay=data.get("point_delay", 0.1),
+            burst=data.get("burst", "auto"),
+            duration=data.get("duration"),
+            source=ClickSource.from_dict(data["source"]) if data.get("source") else None,
+            prefetch=data.get("prefetch", PREFETCH),
+            max_cycles=data.get("max_cycles"),
+        )
+
+    def to_dict(self):
+        data = {
+            "max_clicks": self.max_clicks,
+            "max_cycles": self.max_cycles,
+            "interval": self.interval,
+            "point_delay": self.point_delay,
+            "burst": self.burst,
+            "duration": self.duration,
+        }
+        if self.source is not None:
+            data.update(source=self.source.to_dict(), prefetch=self.prefetch)
+        elif isinstance(self.points, PointStore):
+            data["points"] = self.points.to_rows()
+        else:
+            data["points_file"] = self.points.path
+        return data
+
+    def validate(self):
+        """Raise ValueError if the job cannot be run"""
+        if not self.points and self.source is None:
+            raise ValueError("Please add at least one click point")
+        if self.prefetch <= 0:
+            raise ValueError("Prefetch must be positive")
+        if self.max_clicks is not None and self.max_clicks <= 0:
+            raise ValueError("Click count must be positive")
+        if self.max_cycles is not None and self.max_cycles <= 0:
+            raise ValueError("Cycle count must be positive")
+        if self.interval < 0 or self.point_delay < 0:
+            raise ValueError("Intervals must be non-negative")
+        if self.duration is not None and self.duration <= 0:
+            raise ValueError("Duration must be positive")
+        if self.burst is True and self.points.actions:
+            raise ValueError("Burst mode only supports single clicks")
+        if self.burst is True and (self.source is not None or not isinstance(self.points, PointStore)):
+            raise ValueError("Streamed point files run point by point, not in burst mode")
+
+    def use_burst(self):
+        """Return True if the job should run in burst mode"""
+        if self.source is not None:
+            return False
+        if self.burst == "auto":
+            # Per-point delays may be long, which would make batches
+            # unstoppable, and actions need their own timing. A cycle longer
+            # than a batch would be compiled whole, so it runs point by point
+            if (self.points.has_custom_delays() or self.points.actions
+                    or len(self.points) > BURST_MAX_CLICKS):
+                return False
+            return self.point_delay <= BURST_MAX_POINT_DELAY and (
+                len(self.points) > 1 or self.interval <= BURST_MAX_POINT_DELAY)
+        return bool(self.burst)
+
+    def mode(self):
+        return "limited" if self.max_clicks or self.max_cycles else "unlimited"
+
+    def target_rate(self):
+        """Return the configured clicks per second"""
+        if self.source is not None:
+            return 1 / self.point_delay if self.point_delay > 0 else float("inf")
+        cycle_time = sum(self.points.delays_before(self.interval, self.point_delay))
+        return len(self.points) / cycle_time if cycle_time > 0 else float("inf")
+
+
+class RunStats:
+    """Outcome of one ClickEngine.run call"""
+
+    def __init__(self):
+        self.clicks = 0
+        self.cycles = 0
+        self.batches = 0
+        self.errors = 0
+        self.stop_reason = None
+        self.elapsed = 0.0
+        self.timing = {}
+
+    def to_dict(self):
+        return {
+            "clicks": self.clicks,
+            "cycles": self.cycles,
+            "batches": self.batches,
+            "errors": self.errors,
+            "stop_reason": self.stop_reason,
+            "elapsed": self.elapsed,
+            "timing": self.timing,
+        }
+
+
+class ClickEngine:
+    """Runs ClickJobs on the calling thread with deadline-based timing.
+
+    The engine has no GUI dependencies: clicks go through an InputBackend
+    (created on first run if none is given), progress goes to a
+    LogPipeline-compatible log, and stop requests arrive through stop_event.
+    scheduler_factory lets benchmarks substitute a virtual clock. With a
+    metrics.Metrics, clicks, click latency and deadline lateness are also
+    recorded there, and with a profiling.SpanTracer the loop's wait, click
+    and log phases are timed as spans. Both only wrap the loop's local
+    callables, so without them the click loop has no extra overhead.
+    Actions that wait for the screen read it through a CaptureCache over
+    screen (a screen source, created on first use if none is given).
+    """
+
+    def __init__(self, backend=None, stop_event=None, log=None, scheduler_factory=PrecisionScheduler,
+                 metrics=None, tracer=None, screen=None):
+        self.backend = backend
+        self.screen = screen
+        self.capture = None
+        self.stop_event = stop_event if stop_event is not None else StopSignal()
+        self.log = log or NullLog()
+        self.scheduler_factory = scheduler_factory
+        self.metrics = metrics
+        self.tracer = tracer
+
+    def capture_cache(self):
+        """Return the CaptureCache for conditional actions, opening the screen source on first use"""
+        if self.capture is None:
+            if self.screen is None:
+                self.screen = create_screen()
+            self.capture = CaptureCache(self.screen)
+        return self.capture
+
+    def run(self, job):
+        """Run a job until it completes or is stopped; return RunStats"""
+        job.validate()
+        stats = RunStats()
+        if self.backend is None:
+            self.backend = create_backend()
+        burst = job.use_burst()
+        points = f"Source: {job.source.describe()}" if job.source is not None else f"Points: {len(job.points)}"
+        self.log.message(f"Starting clicks - Mode: {job.mode()}, Max: {job.max_clicks}, "
+                         f"Interval: {job.interval}s, {points}"
+                         f"{', Burst mode' if burst else ''}")
+
+        # Absolute deadlines: click time is subtracted from each wait and
+        # a stop request wakes the scheduler through stop_event at once
+        scheduler = self.scheduler_factory(self.stop_event)
+        metrics = self.metrics
+        if metrics:
+            metrics.runs.inc()
+            metrics.active_jobs.inc()
+            scheduler.stats.histogram = metrics.interval_error.cell()
+        started = time.perf_counter()
+        scheduler.start()
+        if job.duration:
+            scheduler.limit(job.duration)
+        try:
+            if burst:
+                self._run_burst(job, stats, scheduler)
+            elif job.source is not None:
+                self._run_source(job, stats, scheduler)
+            else:
+                self._run_points(job, stats, scheduler)
+        finally:
+            if metrics:
+                metrics.active_jobs.inc(-1)
+
+        stats.elapsed = time.perf_counter() - started
+        stats.timing = scheduler.stats.summary()
+        if burst and stats.elapsed > 0:
+            # The scheduler fires once per batch; report the click rate instead
+            stats.timing["achieved_rate"] = stats.clicks / stats.elapsed
+        self.log_timing_summary(job, stats)
+        return stats
+
+    def _run_points(self, job, stats, scheduler):
+        """Click point by point, waiting for each deadline"""
+        points = job.points
+        waits = points.delays_before(job.interval, job.point_delay)
+        buttons = points.button_names()
+        # Multi-clicks, holds, drags and keys, precompiled to timed backend steps
+        programs = points.compile_actions(self.backend, self.capture_cache() if points.needs_screen() else None)
+
+        def steps():
+            # (point index, (x, y), wait, button, program) per point; None ends a cycle
+            for _ in range(job.max_cycles) if job.max_cycles else itertools.count():
+                yield from zip(itertools.count(), points, waits, buttons, programs or itertools.repeat(None))
+                yield None
+
+        self._run_steps(job, steps(), stats, scheduler)
+        if stats.stop_reason is None:
+            stats.stop_reason = COMPLETED  # Ran max_cycles passes
+
+    def _run_source(self, job, stats, scheduler):
+        """Click the rows of a generated source as they arrive, until it runs out"""
+        rows = Prefetcher(job.source.open(), job.prefetch, self.stop_event).start()
+        backend = self.backend
+        point_delay = job.point_delay
+
+        def steps():
+            action_span = 0.0
+            for index, row in enumerate(rows):
+                try:
+                    x, y, delay, button, action = read_row(row)
+                except (ValueError, TypeError) as e:
+                    stats.errors += 1
+                    self.log.message(f"Skipping invalid source row {row!r}: {str(e)}")
+                    continue
+                # As with stored points, the wait counts from the end of the previous action
+                if delay is None:
+                    delay = 0.0 if action and action.when is not None and action.when.replaces_delay() else point_delay
+                wait = delay + action_span
+                capture = self.capture_cache() if action and action.when is not None else None
+                program = action.compile(backend, x, y, button, capture) if action else None
+                action_span = action.span() if action else 0.0
+                yield index, (x, y), wait, button, program
+
+        try:
+            self._run_steps(job, steps(), stats, scheduler)
+        except SourceError as e:
+            stats.errors += 1
+            stats.stop_reason = ERROR
+            self.log.message(f"Click source '{job.source.describe()}' failed: {str(e)}")
+        finally:
+            rows.close()
+        if stats.stop_reason is None:
+            stats.stop_reason = STOPPED if scheduler.stopped() else COMPLETED
+
+    def _run_steps(self, job, steps, stats, scheduler):
+        """Wait for and click each step until stopped, max_clicks or the end of steps"""
+        log = self.log
+        metrics = self.metrics
+        click = metrics.instrument(self.backend.click) if metrics else self.backend.click
+        wait = scheduler.wait
+        log_click = log.click
+        log_cycle = log.cycle
+        run_action = perform
+        if self.tracer:
+            wait = self.tracer.wrap("engine.wait", wait)
+            click = self.tracer.wrap("engine.click", click)
+            log_click = self.tracer.wrap("engine.log", log_click)
+            log_cycle = self.tracer.wrap("engine.log", log_cycle)
+            run_action = self.tracer.wrap("engine.action", run_action)
+        max_clicks = job.max_clicks
+        first_click = True
+
+        for step in steps:
+            if step is None:
+                stats.cycles += 1
+                log_cycle(stats.clicks)
+                continue
+            point_index, (x, y), wait_seconds, button, program = step
+            # Wait for this point's deadline (its own delay, the point
+            # delay, or the cycle interval before the first point)
+            if first_click:
+                if scheduler.stopped():
+                    stats.stop_reason = STOPPED
+                    break
+                scheduler.mark()
+                first_click = False
+            elif not wait(wait_seconds):
+                stats.stop_reason = STOPPED if scheduler.stopped() else COMPLETED
+                break
+
+            try:
+                if program is None:
+                    click(x, y, button)
+                else:
+                    if not run_action(program, self.stop_event):
+                        stats.stop_reason = STOPPED
+                        break
+                    if metrics:
+                        metrics.clicks.inc()
+                stats.clicks += 1
+                log_click(point_index, x, y, stats.clicks)
+            except FailSafeError:
+                log.click(point_index, x, y, stats.clicks, OUTCOME_FAILSAFE)
+                log.message("🚨 Failsafe triggered - mouse moved to corner!")
+                stats.stop_reason = FAILSAFE
+                break
+            except Exception as e:
+                stats.errors += 1
+                if metrics:
+                    metrics.errors.inc()
+                log.click(point_index, x, y, stats.clicks, OUTCOME_ERROR)
+                log.message(f"Error clicking point ({x}, {y}): {str(e)}")
+
+            if max_clicks and stats.clicks >= max_clicks:
+                stats.stop_reason = COMPLETED
+                break
+
+    def _run_burst(self, job, stats, scheduler):
+        """Submit pre-compiled batches of whole cycles to the backend"""
+        log = self.log
+        points = job.points
+        waits = points.delays_before(job.interval, job.point_delay)
+        max_clicks = job.max_clicks
+        # Clicks sent or failed, like the points a max_cycles run passes over
+        max_attempts = job.max_cycles * len(points) if job.max_cycles else None
+        attempts = 0
+        cycles = 1
+        if waits[0] <= BURST_MAX_POINT_DELAY:
+            period = sum(waits)
+            cycles = max(1, BURST_MAX_CLICKS // len(points))
+            if period > 0:
+                cycles = max(1, min(cycles, int(BURST_MAX_SPAN / period)))
+        actions, point_indexes = compile_burst(points, job.point_delay, job.interval, cycles)
+        validate_batch(actions)
+        # Next batch starts one cycle-start wait after this batch's last click
+        span = actions[-1][0] / 1e9 + waits[0]
+        first_batch = True
+        wait = scheduler.wait
+        click_batch = self.backend.click_batch
+        log_burst = log.burst
+        if self.tracer:
+            wait = self.tracer.wrap("engine.wait", wait)
+            click_batch = self.tracer.wrap("engine.batch", click_batch)
+            log_burst = self.tracer.wrap("engine.log", log_burst)
+
+        while stats.stop_reason is None:
+            if first_batch:
+                if scheduler.stopped():
+                    stats.stop_reason = STOPPED
+                    break
+                scheduler.mark()
+                first_batch = False
+            elif not wait(span):
+                stats.stop_reason = STOPPED if scheduler.stopped() else COMPLETED
+                break
+
+            batch, batch_indexes = actions, point_indexes
+            if max_clicks and stats.clicks + len(batch) > max_clicks:
+                batch = batch[:max_clicks - stats.clicks]
+            if max_attempts and attempts + len(batch) > max_attempts:
+                batch = batch[:max_attempts - attempts]
+            batch_indexes = batch_indexes[:len(batch)]
+            attempts += len(batch)
+            try:
+                sent = time.perf_counter_ns()
+                click_batch(batch)
+                sent = time.perf_counter_ns() - sent
+            except FailSafeError:
+                log.message("🚨 Failsafe triggered - mouse moved to corner!")
+                stats.stop_reason = FAILSAFE
+                break
+            except Exception as e:
+                stats.errors += 1
+                if self.metrics:
+                    self.metrics.errors.inc(len(batch))
+                log.message(f"Error sending burst of {len(batch)} clicks: {str(e)}")
+                if max_attempts and attempts >= max_attempts:
+                    stats.stop_reason = COMPLETED
+                continue
+
+            log_burst(batch, batch_indexes, stats.clicks + 1)
+            stats.clicks += len(batch)
+            stats.cycles += len(batch) // len(points)
+            stats.batches += 1
+            if self.metrics:
+                # Batch cost spread over its clicks (includes the planned gaps)
+                self.metrics.clicks.inc(len(batch))
+                self.metrics.click_latency.record(sent // len(batch))
+            if (max_clicks and stats.clicks >= max_clicks) or (max_attempts and attempts >= max_attempts):
+                stats.stop_reason = COMPLETED
+
+    def log_timing_summary(self, job, stats):
+        """Log achieved vs. target click rate and timing jitter"""
+        timing = stats.timing
+        self.log.message(f"⏱ Rate: {timing['achieved_rate']:.1f} clicks/s (target {job.target_rate():.1f}) - "
+                         f"Jitter p50 {timing['jitter_p50_ms']:.3f}ms, "
+                         f"p99 {timing['jitter_p99_ms']:.3f}ms, "
+                         f"max {timing['jitter_max_ms']:.3f}ms, "
+                         f"overruns {timing['overruns']}")
@@ -0,0 +1,299 @@
+"""Generated click sources: points produced lazily instead of a fixed list.
+
+A ClickSource wraps a factory returning an iterable of click rows
+(x, y[, delay[, button[, action]]]) - a generator for a grid sweep, random
+points in a region, lines appended to a file by another process, or a
+Python plugin. ClickJob(source=...) runs it on the ClickEngine, which
+pulls rows through a Prefetcher: a background thread that keeps at most
+a bounded number of rows ready, so huge or endless sources run in
+constant memory and a slow generator doesn't hold up the click timing.
+"""
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+
+from actions import Action
+from input_backends import BUTTONS
+from point_store import check_point
+
+PREFETCH = 1024  # Rows generated ahead of the click loop
+PREFETCH_CHUNK = 64  # Most rows handed to the click loop at once
+PREFETCH_POLL = 0.05  # Seconds between stop checks while the queue is full/empty
+TAIL_POLL = 0.1  # Seconds between checks for new lines in a tailed file
+TAIL_END = "end"  # A tailed file's line that ends the source
+
+_END = object()
+
+
+class SourceError(Exception):
+    """Wraps an exception raised inside a source's generator"""
+
+
+def read_row(row):
+    """Return (x, y, delay, button, action) for a source row; ValueError if invalid"""
+    if not 2 <= len(row) <= 5:
+        raise ValueError(f"Invalid click point {row!r}")
+    x, y = row[0], row[1]
+    check_point(x, y)
+    delay = row[2] if len(row) > 2 else None
+    if delay is not None and delay < 0:
+        raise ValueError("Point delays must be non-negative")
+    button = (row[3] if len(row) > 3 else None) or "left"
+    if button not in BUTTONS:
+        raise ValueError(f"Unknown mouse button {button!r}")
+    action = row[4] if len(row) > 4 else None
+    if isinstance(action, dict):
+        action = Action.from_dict(action)
+    if action is not None:
+        action.validate()
+        if action.is_plain():
+            action = None
+    return x, y, delay, button, action
+
+
+def grid_sweep(left, top, right, bottom, step=10, step_y=None, serpentine=False):
+    """Yield the points of a grid row by row (serpentine: every other row backwards)"""
+    step_x = int(step)
+    step_y = int(step_y or step)
+    if step_x <= 0 or step_y <= 0:
+        raise ValueError("Grid steps must be positive")
+    columns = range(int(left), int(right) + 1, step_x)
+    for row, y in enumerate(range(int(top), int(bottom) + 1, step_y)):
+        for x in (reversed(columns) if serpentine and row % 2 else columns):
+            yield x, y
+
+
+def random_points(left, top, right, bottom, count=None, seed=None):
+    """Yield count (or endless) uniformly random points inside a region"""
+    import random
+    rng = random.Random(seed)
+    left, top, right, bottom = int(left), int(top), int(right), int(bottom)
+    if right < left or bottom < top:
+        raise ValueError("Random region must have right >= left and bottom >= top")
+    for _ in (range(int(count)) if count is not None else itertools.count()):
+        yield rng.randint(left, right), rng.randint(top, bottom)
+
+
+def parse_line(line):
+    """Return a row from a tailed line: "x,y[,delay[,button]]" or a JSON row"""
+    if line.startswith("["):
+        return json.loads(line)
+    cells = [cell.strip() for cell in line.split(",")]
+    row = [int(cells[0]), int(cells[1])]
+    if len(cells) > 2:
+        row.append(float(cells[2]) if cells[2] else None)
+    if len(cells) > 3:
+        row.append(cells[3])
+    return row
+
+
+def tail_file(path, poll=TAIL_POLL, from_start=True):
+    """Yield rows as lines are appended to a file by another process.
+
+    Lines are "x,y[,delay[,button]]" or JSON rows; blank lines and lines
+    starting with # are skipped and a line reading "end" finishes the
+    source. While no new line has arrived it yields None (no row yet),
+    so the Prefetcher can still notice a stop.
+    """
+    with open(path, "r") as f:
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        partial = ""
+        while True:
+            chunk = f.readline()
+            if not chunk:
+                time.sleep(float(poll))
+                yield None
+                continue
+            partial += chunk
+            if not partial.endswith("\n"):
+                continue  # The writer hasn't finished this line yet
+            line, partial = partial.strip(), ""
+            if not line or line.startswith("#"):
+                continue
+            if line.lower() == TAIL_END:
+                return
+            try:
+                yield parse_line(line)
+            except (ValueError, IndexError) as e:
+                raise ValueError(f"{path}: invalid line {line!r}: {e}")
+
+
+def load_plugin(plugin):
+    """Return the factory named by "module:function" or "path/to/file.py:function" """
+    import importlib
+    import importlib.util
+    module_name, _, function = plugin.rpartition(":")
+    if not module_name or not function:
+        raise ValueError(f"Plugin must be 'module:function', got {plugin!r}")
+    try:
+        if module_name.endswith(".py"):
+            spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(module_name))[0],
+                                                          module_name)
+            if spec is None:
+                raise ImportError(f"cannot load {module_name}")
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        else:
+            module = importlib.import_module(module_name)
+    except (ImportError, OSError) as e:
+        raise ValueError(f"Cannot load plugin {plugin!r}: {e}")
+    factory = getattr(module, function, None)
+    if not callable(factory):
+        raise ValueError(f"Plugin {plugin!r} has no function {function!r}")
+    return factory
+
+
+SOURCE_TYPES = {
+    "grid": grid_sweep,
+    "random": random_points,
+    "tail": tail_file,
+}
+
+
+class ClickSource:
+    """A re-openable generated sequence of click rows.
+
+    factory(**params) is called on each open() and must return an iterable
+    of rows; with repeat it is called again whenever it runs out, until a
+    pass produces no rows. Rows may be None to mean "nothing yet" (see
+    tail_file).
+    """
+
+    def __init__(self, factory, name=None, repeat=False, spec=None, **params):
+        self.factory = factory
+        self.name = name or getattr(factory, "__name__", "source")
+        self.repeat = repeat
+        self.spec = spec
+        self.params = params
+
+    @classmethod
+    def from_dict(cls, spec):
+        """Build a source from a job file entry, e.g. {"type": "grid", "left": 0, ...}
+        or {"type": "plugin", "plugin": "my_points:sweep", ...} (other keys are passed on)"""
+        params = {key: value for key, value in spec.items() if key not in ("type", "plugin", "repeat")}
+        kind = spec.get("type")
+        if kind == "plugin":
+            factory = load_plugin(spec.get("plugin", ""))
+            name = spec["plugin"]
+        elif kind in SOURCE_TYPES:
+            factory = SOURCE_TYPES[kind]
+            name = kind
+        else:
+            raise ValueError(f"Unknown source type {kind!r} (choose from {', '.join([*SOURCE_TYPES, 'plugin'])})")
+        return cls(factory, name=name, repeat=bool(spec.get("repeat")), spec=dict(spec), **params)
+
+    def to_dict(self):
+        if self.spec is None:
+            raise ValueError(f"Source '{self.name}' was built in code and has no job file form")
+        return dict(self.spec)
+
+    def describe(self):
+        return f"{self.name}{' (repeating)' if self.repeat else ''}"
+
+    def open(self):
+        """Return a fresh iterator over the rows"""
+        try:
+            rows = iter(self.factory(**self.params))
+        except TypeError as e:
+            raise ValueError(f"Invalid parameters for source '{self.name}': {e}")
+        return self._repeat(rows) if self.repeat else rows
+
+    def _repeat(self, rows):
+        # A pass without rows would make the next one empty too (and spin forever), so stop there
+        while True:
+            empty = True
+            for row in rows:
+                empty = False
+                yield row
+            if empty:
+                return
+            rows = self.factory(**self.params)
+
+
+class Prefetcher:
+    """Iterates rows generated on a background thread, at most size ahead.
+
+    Rows are handed over in chunks of up to PREFETCH_CHUNK while the
+    producer is ahead, and one by one while the consumer is waiting, so
+    the queue costs little per row without delaying slow sources.
+    Iteration ends when the rows run out, when close() is called or when
+    stop_event is set; an exception in the generator is re-raised to the
+    consumer as SourceError. None rows are dropped.
+    """
+
+    def __init__(self, rows, size=PREFETCH, stop_event=None):
+        self.rows = rows
+        self.chunk_size = max(1, min(PREFETCH_CHUNK, int(size)))
+        self.queue = queue.Queue(maxsize=max(1, int(size) // self.chunk_size))
+        self.stop_event = stop_event
+        self.closed = threading.Event()
+        self.chunk = iter(())
+        self.thread = threading.Thread(target=self._produce, name="click-source", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _put(self, item):
+        while not self.closed.is_set():
+            try:
+                self.queue.put(item, timeout=PREFETCH_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _produce(self):
+        chunk = []
+        try:
+            for row in self.rows:
+                if self.closed.is_set():
+                    return
+                if row is not None:
+                    chunk.append(row)
+                if chunk and (len(chunk) >= self.chunk_size or row is None or self.queue.empty()):
+                    if not self._put(chunk):
+                        return
+                    chunk = []
+        except BaseException as e:
+            if chunk:
+                self._put(chunk)
+            self._put(SourceError(f"{type(e).__name__}: {e}"))
+            return
+        if chunk:
+            self._put(chunk)
+        self._put(_END)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        for row in self.chunk:
+            return row
+        while True:
+            if self.closed.is_set() or (self.stop_event is not None and self.stop_event.is_set()):
+                raise StopIteration
+            try:
+                item = self.queue.get(timeout=PREFETCH_POLL)
+                break
+            except queue.Empty:
+                pass
+        if item is _END:
+            self.closed.set()
+            raise StopIteration
+        if isinstance(item, SourceError):
+            self.closed.set()
+            raise item
+        self.chunk = iter(item)
+        return next(self.chunk)
+
+    def close(self):
+        """Stop the producer (it exits at its next row)"""
+        self.closed.set()
+        close = getattr(self.rows, "close", None)
+        if close and not self.thread.is_alive():
+            close()
@@ -0,0 +1,245 @@
+import time
+
+from screen import color_matches, find_template, format_color, load_image, parse_color
+from screen_change import BLOCK_SIZE, BLOCK_TOLERANCE, MAX_POLL, ChangeDetector, BlockHasher
+
+# Condition kinds
+PIXEL = "pixel"
+IMAGE = "image"
+CHANGE = "change"
+STABLE = "stable"
+CONDITION_KINDS = (PIXEL, IMAGE, CHANGE, STABLE)
+
+DEFAULT_TIMEOUT = 5.0  # Seconds to wait for a condition before giving up on the point
+DEFAULT_POLL = 0.05  # Seconds between screen checks
+DEFAULT_PIXEL_TOLERANCE = 10  # Per-channel color difference a pixel may have
+DEFAULT_SETTLE = 0.25  # Seconds a region must stay unchanged to count as stable
+MAX_TIMEOUT = 3600.0
+
+
+class ConditionTimeout(Exception):
+    """A condition was not met in time; the point is skipped"""
+
+
+class Condition:
+    """When a point may fire, from a job's {"when": ...} entry.
+
+    pixel: wait until the pixel at `pixel` (default: the point) is within
+           tolerance of color ("#rrggbb")
+    image: wait until the template image appears in region (default: the
+           whole screen) and fire at its center plus offset instead of
+           the point; tolerance is the RMS color difference allowed (NumPy)
+    change: wait until region looks different from when the wait began
+    stable: wait until region has not changed for settle seconds
+    change/stable compare block hashes (block pixels square, tolerance per
+    block average) with adaptive polling up to poll seconds apart, and
+    replace the click delay before the point: it fires as soon as the
+    screen allows.
+    """
+
+    def __init__(self, kind, color=None, pixel=None, image=None, region=None, offset=(0, 0),
+                 tolerance=None, timeout=DEFAULT_TIMEOUT, poll=None, block=BLOCK_SIZE, settle=DEFAULT_SETTLE):
+        self.kind = kind
+        self.color = parse_color(color) if color is not None else None
+        self.pixel = tuple(int(value) for value in pixel) if pixel is not None else None
+        self.image = image
+        self.region = tuple(int(value) for value in region) if region is not None else None
+        self.offset = tuple(int(value) for value in offset)
+        if tolerance is None:
+            tolerance = {PIXEL: DEFAULT_PIXEL_TOLERANCE, IMAGE: 0}.get(kind, BLOCK_TOLERANCE)
+        self.tolerance = float(tolerance)
+        self.timeout = float(timeout)
+        if poll is None:
+            poll = MAX_POLL if kind in (CHANGE, STABLE) else DEFAULT_POLL
+        self.poll = float(poll)
+        self.block = int(block)
+        self.settle = float(settle)
+        self.template = None
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        if IMAGE in data:
+            kind = IMAGE
+        elif "color" in data:
+            kind = PIXEL
+        elif CHANGE in data or STABLE in data:
+            # {"change": [left, top, width, height]}
+            kind = CHANGE if CHANGE in data else STABLE
+            data["region"] = data.pop(kind)
+        else:
+            raise ValueError("A condition needs a 'color' (pixel), an 'image', or a 'change'/'stable' region")
+        return cls(kind, **{key: data[key] for key in ("color", "pixel", "image", "region", "offset", "tolerance",
+                                                      "timeout", "poll", "block", "settle") if key in data})
+
+    def to_dict(self):
+        data = {"timeout": self.timeout}
+        if self.kind == PIXEL:
+            data.update(color=format_color(self.color), tolerance=self.tolerance)
+            if self.pixel is not None:
+                data["pixel"] = list(self.pixel)
+        elif self.kind in (CHANGE, STABLE):
+            data[self.kind] = list(self.region) if self.region is not None else None
+            if self.tolerance != BLOCK_TOLERANCE:
+                data["tolerance"] = self.tolerance
+            if self.block != BLOCK_SIZE:
+                data["block"] = self.block
+            if self.kind == STABLE:
+                data["settle"] = self.settle
+            if self.poll != MAX_POLL:
+                data["poll"] = self.poll
+            return data
+        else:
+            data.update(image=self.image, tolerance=self.tolerance)
+            if self.region is not None:
+                data["region"] = list(self.region)
+            if self.offset != (0, 0):
+                data["offset"] = list(self.offset)
+        if self.poll != DEFAULT_POLL:
+            data["poll"] = self.poll
+        return data
+
+    def __eq__(self, other):
+        return isinstance(other, Condition) and self.to_dict() == other.to_dict()
+
+    def validate(self):
+        """Raise ValueError if the condition cannot be checked"""
+        if self.kind not in CONDITION_KINDS:
+            raise ValueError(f"Unknown condition {self.kind!r} (choose from {', '.join(CONDITION_KINDS)})")
+        if self.kind == PIXEL and self.color is None:
+            raise ValueError("A pixel condition needs a color")
+        if self.kind == IMAGE and not self.image:
+            raise ValueError("An image condition needs an image file")
+        if self.region is not None and (len(self.region) != 4 or self.region[2] <= 0 or self.region[3] <= 0):
+            raise ValueError("Condition regions are [left, top, width, height]")
+        if not 0 <= self.timeout <= MAX_TIMEOUT:
+            raise ValueError(f"Condition timeouts must be 0-{MAX_TIMEOUT:g} seconds")
+        if self.poll <= 0:
+            raise ValueError("Condition poll intervals must be positive")
+        if not 0 <= self.tolerance <= 255:
+            raise ValueError("Condition tolerances must be 0-255")
+        if self.block <= 0 or self.settle < 0:
+            raise ValueError("Condition blocks must be positive and settle times non-negative")
+
+    def describe(self):
+        if self.kind == PIXEL:
+            return f"when {format_color(self.color)}"
+        if self.kind == CHANGE:
+            return "when changed"
+        if self.kind == STABLE:
+            return f"when stable {self.settle:g}s"
+        return f"when {self.image}"
+
+    def replaces_delay(self):
+        """Return True if the wait for this condition takes the place of the job's delay"""
+        return self.kind in (CHANGE, STABLE)
+
+    def watch_region(self, x, y):
+        """Return the screen region this condition checks for a point at x, y"""
+        if self.kind == PIXEL:
+            pixel_x, pixel_y = self.pixel or (x, y)
+            return pixel_x, pixel_y, 1, 1
+        return self.region
+
+    def load(self):
+        """Load the template image (once)"""
+        if self.kind == IMAGE and self.template is None:
+            try:
+                self.template = load_image(self.image)
+            except OSError as e:
+                raise ValueError(f"Cannot load template image {self.image}: {e}")
+        return self
+
+    def start(self, capture, x, y):
+        """Begin waiting: return a check for this wait (see ScreenCheck)"""
+        if self.kind in (CHANGE, STABLE):
+            return ChangeCheck(self, capture, x, y)
+        return ScreenCheck(self, capture, x, y)
+
+    def check(self, capture, x, y):
+        """Return where to fire if the condition holds now, else None"""
+        if self.kind == PIXEL:
+            pixel_x, pixel_y = self.pixel or (x, y)
+            frame = capture.grab((pixel_x, pixel_y, 1, 1))
+            return (x, y) if color_matches(frame.pixel(pixel_x, pixel_y), self.color, self.tolerance) else None
+        found = find_template(capture.grab(self.region), self.template, self.tolerance)
+        if found is None:
+            return None
+        return (found[0] + self.template.width // 2 + self.offset[0],
+                found[1] + self.template.height // 2 + self.offset[1])
+
+
+class ScreenCheck:
+    """One wait for a pixel or image condition: check() every poll seconds"""
+
+    def __init__(self, condition, capture, x, y):
+        self.condition = condition
+        self.capture = capture
+        self.x = x
+        self.y = y
+        self.poll = condition.poll
+
+    def check(self):
+        """Return where to fire if the condition holds now, else None"""
+        return self.condition.check(self.capture, self.x, self.y)
+
+
+class ChangeCheck:
+    """One wait for a change/stable condition; the baseline is captured when it starts"""
+
+    def __init__(self, condition, capture, x, y):
+        self.condition = condition
+        self.x = x
+        self.y = y
+        self.detector = ChangeDetector(capture, condition.region, BlockHasher(condition.block, condition.tolerance),
+                                       max_poll=condition.poll)
+
+    @property
+    def poll(self):
+        return self.detector.poll
+
+    def check(self):
+        if self.condition.kind == CHANGE:
+            done = self.detector.changed()
+        else:
+            done = self.detector.settled(self.condition.settle)
+        return (self.x, self.y) if done else None
+
+
+class ConditionalProgram:
+    """A point's action that first waits for its Condition.
+
+    run() polls the capture cache every poll seconds (sleeping on
+    stop_event) until the condition holds, then compiles the action at
+    the position the condition reports and performs it. It returns False
+    if stopped and raises ConditionTimeout if the condition never held.
+    """
+
+    def __init__(self, action, condition, capture, backend, x, y, button):
+        self.action = action
+        self.condition = condition.load()
+        self.capture = capture
+        self.backend = backend
+        self.x = x
+        self.y = y
+        self.button = button
+        capture.watch(condition.watch_region(x, y))
+
+    def run(self, perform, stop_event=None, clock=time.monotonic):
+        condition = self.condition
+        deadline = clock() + condition.timeout
+        check = condition.start(self.capture, self.x, self.y)
+        while True:
+            target = check.check()
+            if target is not None:
+                break
+            remaining = deadline - clock()
+            if remaining <= 0:
+                raise ConditionTimeout(f"{condition.kind} condition not met within {condition.timeout:g}s")
+            pause = min(check.poll, remaining)
+            if stop_event is None:
+                time.sleep(pause)
+            elif stop_event.wait(pause):
+                return False
+        program = self.action.compile_steps(self.backend, *target, self.button)
+        return perform(program, stop_event)
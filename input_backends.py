@@ -0,0 +1,492 @@
+import ctypes
+import os
+import sys
+import time
+from collections import deque
+
+BUTTONS = ("left", "middle", "right")
+
+# Named keys every backend understands (pyautogui names); any single
+# character is also a key
+KEY_NAMES = ("enter", "esc", "tab", "space", "backspace", "delete", "insert", "home", "end",
+             "pageup", "pagedown", "up", "down", "left", "right", "shift", "ctrl", "alt", "win",
+             "capslock") + tuple(f"f{number}" for number in range(1, 13))
+
+
+def check_key(key):
+    """Raise ValueError unless key is a KEY_NAMES name or a single character"""
+    if len(key) != 1 and key not in KEY_NAMES:
+        raise ValueError(f"Unknown key: {key!r}")
+
+# Mouse inside this square at the top-left corner aborts clicking, like
+# pyautogui's FAILSAFE (native backends check it themselves)
+FAILSAFE_MARGIN = 5
+
+
+class FailSafeError(Exception):
+    """Raised by a backend when the mouse failsafe fires"""
+
+
+def validate_batch(actions):
+    """Check a burst action list of (offset_ns, x, y, button) before submitting it"""
+    previous = 0
+    for offset, x, y, button in actions:
+        if offset < previous:
+            raise ValueError("Burst offsets must be non-decreasing")
+        if button not in BUTTONS:
+            raise ValueError(f"Unknown mouse button: {button}")
+        if not (-2**31 <= x < 2**31 and -2**31 <= y < 2**31):
+            raise ValueError(f"Coordinates out of range: ({x}, {y})")
+        previous = offset
+
+
+class InputBackend:
+    """Base class for the ways clicks are delivered to the system"""
+
+    name = "base"
+
+    def click(self, x, y, button="left"):
+        """Move to (x, y) and click once"""
+        raise NotImplementedError
+
+    def move(self, x, y):
+        """Move the pointer to (x, y)"""
+        raise NotImplementedError
+
+    def press(self, x, y, button="left"):
+        """Move to (x, y) and press a button without releasing it"""
+        raise NotImplementedError
+
+    def release(self, x, y, button="left"):
+        """Move to (x, y) and release a button"""
+        raise NotImplementedError
+
+    def key_down(self, key):
+        """Press a key (a KEY_NAMES name or single character)"""
+        raise NotImplementedError
+
+    def key_up(self, key):
+        """Release a key"""
+        raise NotImplementedError
+
+    def position(self):
+        """Return the current pointer position as (x, y)"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any native resources"""
+        pass
+
+    def click_batch(self, actions, clock=time.perf_counter_ns):
+        """Click a validated list of (offset_ns, x, y, button) actions.
+
+        Offsets are relative to the call. Actions sharing an offset are sent
+        together through click_group (one native call where the backend
+        supports it); the gaps between groups are waited out here.
+        """
+        start = clock()
+        index = 0
+        while index < len(actions):
+            offset = actions[index][0]
+            end = index + 1
+            while end < len(actions) and actions[end][0] == offset:
+                end += 1
+            deadline = start + offset
+            remaining = deadline - clock()
+            if remaining > 1_000_000:
+                time.sleep((remaining - 1_000_000) / 1e9)
+            while clock() < deadline:
+                pass
+            self.click_group(actions[index:end])
+            index = end
+
+    def click_group(self, group):
+        """Click several actions that are due at the same moment"""
+        for _, x, y, button in group:
+            self.click(x, y, button)
+
+    def check_failsafe(self):
+        """Raise FailSafeError if the pointer is in the top-left corner"""
+        x, y = self.position()
+        if x <= FAILSAFE_MARGIN and y <= FAILSAFE_MARGIN:
+            raise FailSafeError("Mouse moved to the top-left corner")
+
+
+class PyAutoGuiBackend(InputBackend):
+    """pyautogui clicks; pause=None keeps pyautogui's default 0.1 s PAUSE after each call"""
+
+    name = "pyautogui"
+
+    def __init__(self, pause=None, failsafe=True):
+        import pyautogui
+        self.pyautogui = pyautogui
+        pyautogui.FAILSAFE = failsafe
+        if pause is not None:
+            pyautogui.PAUSE = pause
+
+    def click(self, x, y, button="left"):
+        try:
+            self.pyautogui.click(x, y, button=button)
+        except self.pyautogui.FailSafeException as e:
+            raise FailSafeError(str(e))
+
+    def move(self, x, y):
+        self.pyautogui.moveTo(x, y)
+
+    def press(self, x, y, button="left"):
+        try:
+            self.pyautogui.mouseDown(x, y, button=button)
+        except self.pyautogui.FailSafeException as e:
+            raise FailSafeError(str(e))
+
+    def release(self, x, y, button="left"):
+        self.pyautogui.mouseUp(x, y, button=button, _pause=False)
+
+    def key_down(self, key):
+        try:
+            self.pyautogui.keyDown(key)
+        except self.pyautogui.FailSafeException as e:
+            raise FailSafeError(str(e))
+
+    def key_up(self, key):
+        self.pyautogui.keyUp(key, _pause=False)
+
+    def position(self):
+        return tuple(self.pyautogui.position())
+
+
+class XTestBackend(InputBackend):
+    """Low-overhead X11 backend: XTest fake events, one XFlush per click"""
+
+    name = "xtest"
+    BUTTON_CODES = {"left": 1, "middle": 2, "right": 3}
+    KEYSYMS = {"enter": "Return", "esc": "Escape", "tab": "Tab", "space": "space", "backspace": "BackSpace",
+               "delete": "Delete", "insert": "Insert", "home": "Home", "end": "End", "pageup": "Prior",
+               "pagedown": "Next", "up": "Up", "down": "Down", "left": "Left", "right": "Right",
+               "shift": "Shift_L", "ctrl": "Control_L", "alt": "Alt_L", "win": "Super_L",
+               "capslock": "Caps_Lock", **{f"f{number}": f"F{number}" for number in range(1, 13)}}
+
+    def __init__(self, display=None, failsafe=True):
+        import ctypes.util  # Only needed here; importing it costs more than the rest of this module
+        xlib_path = ctypes.util.find_library("X11")
+        xtst_path = ctypes.util.find_library("Xtst")
+        if not xlib_path or not xtst_path:
+            raise OSError("libX11/libXtst not found")
+        self.xlib = ctypes.CDLL(xlib_path)
+        self.xtst = ctypes.CDLL(xtst_path)
+        self.xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self.xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        self.xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self.xlib.XFlush.argtypes = [ctypes.c_void_p]
+        self.xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.xtst.XTestFakeMotionEvent.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                                                   ctypes.c_int, ctypes.c_ulong]
+        self.xtst.XTestFakeButtonEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                                   ctypes.c_ulong]
+        self.xtst.XTestFakeKeyEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+        self.xlib.XStringToKeysym.restype = ctypes.c_ulong
+        self.xlib.XStringToKeysym.argtypes = [ctypes.c_char_p]
+        self.xlib.XKeysymToKeycode.restype = ctypes.c_ubyte
+        self.xlib.XKeysymToKeycode.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        self.keycodes = {}
+        # The corner watcher queries the pointer from another thread
+        self.xlib.XInitThreads()
+        self.display = self.xlib.XOpenDisplay(display.encode() if display else None)
+        if not self.display:
+            raise OSError("Cannot open X display")
+        self.root = self.xlib.XDefaultRootWindow(self.display)
+        self.failsafe = failsafe
+
+    def click(self, x, y, button="left"):
+        if self.failsafe:
+            self.check_failsafe()
+        code = self.BUTTON_CODES[button]
+        self.xtst.XTestFakeMotionEvent(self.display, -1, x, y, 0)
+        self.xtst.XTestFakeButtonEvent(self.display, code, 1, 0)
+        self.xtst.XTestFakeButtonEvent(self.display, code, 0, 0)
+        self.xlib.XFlush(self.display)
+
+    def click_batch(self, actions, clock=time.perf_counter_ns):
+        """Queue the whole burst with XTest's per-event delays and flush once"""
+        if self.failsafe:
+            self.check_failsafe()
+        previous_ms = 0
+        for offset, x, y, button in actions:
+            # XTest delays are whole milliseconds; round the absolute offset so
+            # rounding errors do not accumulate across the burst
+            offset_ms = int(round(offset / 1e6))
+            code = self.BUTTON_CODES[button]
+            self.xtst.XTestFakeMotionEvent(self.display, -1, x, y, offset_ms - previous_ms)
+            self.xtst.XTestFakeButtonEvent(self.display, code, 1, 0)
+            self.xtst.XTestFakeButtonEvent(self.display, code, 0, 0)
+            previous_ms = offset_ms
+        self.xlib.XFlush(self.display)
+
+    def move(self, x, y):
+        self.xtst.XTestFakeMotionEvent(self.display, -1, x, y, 0)
+        self.xlib.XFlush(self.display)
+
+    def press(self, x, y, button="left"):
+        if self.failsafe:
+            self.check_failsafe()
+        self.xtst.XTestFakeMotionEvent(self.display, -1, x, y, 0)
+        self.xtst.XTestFakeButtonEvent(self.display, self.BUTTON_CODES[button], 1, 0)
+        self.xlib.XFlush(self.display)
+
+    def release(self, x, y, button="left"):
+        # No failsafe check: a held button must always be released
+        self.xtst.XTestFakeMotionEvent(self.display, -1, x, y, 0)
+        self.xtst.XTestFakeButtonEvent(self.display, self.BUTTON_CODES[button], 0, 0)
+        self.xlib.XFlush(self.display)
+
+    def keycode(self, key):
+        code = self.keycodes.get(key)
+        if code is None:
+            check_key(key)
+            keysym = self.xlib.XStringToKeysym(self.KEYSYMS.get(key, key).encode())
+            code = self.xlib.XKeysymToKeycode(self.display, keysym) if keysym else 0
+            if not code:
+                raise ValueError(f"Key {key!r} is not on this keyboard layout")
+            self.keycodes[key] = code
+        return code
+
+    def key_down(self, key):
+        if self.failsafe:
+            self.check_failsafe()
+        self.xtst.XTestFakeKeyEvent(self.display, self.keycode(key), 1, 0)
+        self.xlib.XFlush(self.display)
+
+    def key_up(self, key):
+        self.xtst.XTestFakeKeyEvent(self.display, self.keycode(key), 0, 0)
+        self.xlib.XFlush(self.display)
+
+    def position(self):
+        root_return = ctypes.c_ulong()
+        child_return = ctypes.c_ulong()
+        root_x, root_y = ctypes.c_int(), ctypes.c_int()
+        win_x, win_y = ctypes.c_int(), ctypes.c_int()
+        mask = ctypes.c_uint()
+        self.xlib.XQueryPointer(ctypes.c_void_p(self.display), ctypes.c_ulong(self.root),
+                                ctypes.byref(root_return), ctypes.byref(child_return),
+                                ctypes.byref(root_x), ctypes.byref(root_y),
+                                ctypes.byref(win_x), ctypes.byref(win_y), ctypes.byref(mask))
+        return root_x.value, root_y.value
+
+    def close(self):
+        if self.display:
+            self.xlib.XCloseDisplay(self.display)
+            self.display = None
+
+
+class Win32Backend(InputBackend):
+    """Low-overhead Windows backend: SetCursorPos plus one SendInput call per click"""
+
+    name = "win32"
+    INPUT_MOUSE = 0
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_KEYUP = 0x0002
+    VK_CODES = {"enter": 0x0D, "esc": 0x1B, "tab": 0x09, "space": 0x20, "backspace": 0x08, "delete": 0x2E,
+                "insert": 0x2D, "home": 0x24, "end": 0x23, "pageup": 0x21, "pagedown": 0x22, "up": 0x26,
+                "down": 0x28, "left": 0x25, "right": 0x27, "shift": 0x10, "ctrl": 0x11, "alt": 0x12,
+                "win": 0x5B, "capslock": 0x14, **{f"f{number}": 0x6F + number for number in range(1, 13)}}
+    BUTTON_FLAGS = {"left": (0x0002, 0x0004), "right": (0x0008, 0x0010), "middle": (0x0020, 0x0040)}
+    MOUSEEVENTF_MOVE = 0x0001
+    MOUSEEVENTF_ABSOLUTE = 0x8000
+    MOUSEEVENTF_VIRTUALDESK = 0x4000
+    SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN = 76, 77, 78, 79
+
+    def __init__(self, failsafe=True):
+        from ctypes import wintypes
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [("dx", wintypes.LONG), ("dy", wintypes.LONG), ("mouseData", wintypes.DWORD),
+                        ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD),
+                        ("dwExtraInfo", ctypes.c_size_t)]
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [("wVk", wintypes.WORD), ("wScan", wintypes.WORD), ("dwFlags", wintypes.DWORD),
+                        ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+        class INPUTUNION(ctypes.Union):
+            _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _anonymous_ = ("u",)
+            _fields_ = [("type", wintypes.DWORD), ("u", INPUTUNION)]
+
+        self.INPUT = INPUT
+        self.user32 = ctypes.windll.user32
+        self.point = wintypes.POINT()
+        self.failsafe = failsafe
+
+    def click(self, x, y, button="left"):
+        if self.failsafe:
+            self.check_failsafe()
+        down, up = self.BUTTON_FLAGS[button]
+        inputs = (self.INPUT * 2)()
+        inputs[0].type = inputs[1].type = self.INPUT_MOUSE
+        inputs[0].mi.dwFlags = down
+        inputs[1].mi.dwFlags = up
+        self.user32.SetCursorPos(x, y)
+        self.user32.SendInput(2, inputs, ctypes.sizeof(self.INPUT))
+
+    def click_group(self, group):
+        """Send move/down/up for every action in the group with one SendInput call"""
+        if self.failsafe:
+            self.check_failsafe()
+        metrics = self.user32.GetSystemMetrics
+        left, top = metrics(self.SM_XVIRTUALSCREEN), metrics(self.SM_YVIRTUALSCREEN)
+        width = max(1, metrics(self.SM_CXVIRTUALSCREEN) - 1)
+        height = max(1, metrics(self.SM_CYVIRTUALSCREEN) - 1)
+        inputs = (self.INPUT * (3 * len(group)))()
+        for index, (_, x, y, button) in enumerate(group):
+            down, up = self.BUTTON_FLAGS[button]
+            move, press, release = inputs[3 * index], inputs[3 * index + 1], inputs[3 * index + 2]
+            move.type = press.type = release.type = self.INPUT_MOUSE
+            # Absolute coordinates are normalised to 0..65535 over the virtual desktop
+            move.mi.dx = (x - left) * 65535 // width
+            move.mi.dy = (y - top) * 65535 // height
+            move.mi.dwFlags = self.MOUSEEVENTF_MOVE | self.MOUSEEVENTF_ABSOLUTE | self.MOUSEEVENTF_VIRTUALDESK
+            press.mi.dwFlags = down
+            release.mi.dwFlags = up
+        self.user32.SendInput(len(inputs), inputs, ctypes.sizeof(self.INPUT))
+
+    def move(self, x, y):
+        self.user32.SetCursorPos(x, y)
+
+    def send_mouse(self, x, y, flags):
+        event = self.INPUT()
+        event.type = self.INPUT_MOUSE
+        event.mi.dwFlags = flags
+        self.user32.SetCursorPos(x, y)
+        self.user32.SendInput(1, ctypes.byref(event), ctypes.sizeof(self.INPUT))
+
+    def press(self, x, y, button="left"):
+        if self.failsafe:
+            self.check_failsafe()
+        self.send_mouse(x, y, self.BUTTON_FLAGS[button][0])
+
+    def release(self, x, y, button="left"):
+        # No failsafe check: a held button must always be released
+        self.send_mouse(x, y, self.BUTTON_FLAGS[button][1])
+
+    def virtual_key(self, key):
+        check_key(key)
+        if key in self.VK_CODES:
+            return self.VK_CODES[key]
+        code = self.user32.VkKeyScanW(ord(key))
+        if code == -1 or code == 0xFFFF:
+            raise ValueError(f"Key {key!r} is not on this keyboard layout")
+        return code & 0xFF
+
+    def send_key(self, key, flags):
+        event = self.INPUT()
+        event.type = self.INPUT_KEYBOARD
+        event.ki.wVk = self.virtual_key(key)
+        event.ki.dwFlags = flags
+        self.user32.SendInput(1, ctypes.byref(event), ctypes.sizeof(self.INPUT))
+
+    def key_down(self, key):
+        if self.failsafe:
+            self.check_failsafe()
+        self.send_key(key, 0)
+
+    def key_up(self, key):
+        self.send_key(key, self.KEYEVENTF_KEYUP)
+
+    def position(self):
+        self.user32.GetCursorPos(ctypes.byref(self.point))
+        return self.point.x, self.point.y
+
+
+class SimulatedBackend(InputBackend):
+    """In-memory backend that records clicks with timestamps (no display needed)"""
+
+    name = "simulated"
+
+    def __init__(self, clock=time.perf_counter_ns, max_records=None, click_cost_ns=0):
+        self.clock = clock
+        self.records = deque(maxlen=max_records)
+        self.click_count = 0
+        self.pointer = (100, 100)
+        self.click_cost_ns = click_cost_ns
+
+    def click(self, x, y, button="left"):
+        if self.click_cost_ns:
+            # Busy-wait to model the cost of a real input call
+            end = self.clock() + self.click_cost_ns
+            while self.clock() < end:
+                pass
+        self.pointer = (x, y)
+        self.click_count += 1
+        self.records.append((self.clock(), "click", x, y, button))
+
+    def click_batch(self, actions, clock=None):
+        """Record the burst with its precomputed timestamps in one pass"""
+        start = self.clock()
+        self.records.extend((start + offset, "click", x, y, button) for offset, x, y, button in actions)
+        self.click_count += len(actions)
+        if actions:
+            self.pointer = actions[-1][1:3]
+
+    def move(self, x, y):
+        self.pointer = (x, y)
+        self.records.append((self.clock(), "move", x, y, None))
+
+    def press(self, x, y, button="left"):
+        self.pointer = (x, y)
+        self.records.append((self.clock(), "press", x, y, button))
+
+    def release(self, x, y, button="left"):
+        self.pointer = (x, y)
+        self.records.append((self.clock(), "release", x, y, button))
+
+    def key_down(self, key):
+        check_key(key)
+        self.records.append((self.clock(), "key_down", None, None, key))
+
+    def key_up(self, key):
+        check_key(key)
+        self.records.append((self.clock(), "key_up", None, None, key))
+
+    def position(self):
+        return self.pointer
+
+    def clicks(self):
+        """Return recorded (timestamp_ns, x, y, button) click tuples"""
+        return [(t, x, y, button) for t, kind, x, y, button in self.records if kind == "click"]
+
+
+BACKENDS = {
+    PyAutoGuiBackend.name: PyAutoGuiBackend,
+    XTestBackend.name: XTestBackend,
+    Win32Backend.name: Win32Backend,
+    SimulatedBackend.name: SimulatedBackend,
+}
+BACKEND_NAMES = ("auto",) + tuple(BACKENDS)
+
+
+def create_backend(name="auto", **kwargs):
+    """Create an input backend by name.
+
+    "auto" picks the native backend for the platform (SendInput on Windows,
+    XTest on X11) and falls back to pyautogui with its per-call PAUSE
+    disabled. Use "pyautogui" for the original pyautogui behaviour.
+    """
+    if name != "auto":
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown input backend: {name}")
+        return BACKENDS[name](**kwargs)
+    if sys.platform == "win32":
+        candidates = [Win32Backend]
+    elif os.environ.get("DISPLAY"):
+        candidates = [XTestBackend]
+    else:
+        candidates = []
+    for backend_class in candidates:
+        try:
+            return backend_class(**kwargs)
+        except (OSError, AttributeError):
+            pass
+    return PyAutoGuiBackend(pause=0.0, **kwargs)
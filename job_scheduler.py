@@ -0,0 +1,343 @@
+import heapq
+import itertools
+import threading
+import time
+
+from actions import perform
+from click_engine import COMPLETED, FAILSAFE, STOPPED, NullLog, RunStats
+from input_backends import FailSafeError, create_backend
+from log_pipeline import OUTCOME_ERROR, OUTCOME_FAILSAFE
+from precision_timer import SPIN_THRESHOLD_NS, TimingStats
+from screen import CaptureCache, create_screen
+from stop_signal import StopSignal
+
+# Job states
+PENDING = "pending"
+RUNNING = "running"
+PAUSED = "paused"
+FINISHED = "finished"
+
+
+class ScheduledJob:
+    """A ClickJob's progress inside a JobScheduler"""
+
+    def __init__(self, job_id, job, name):
+        self.job_id = job_id
+        self.job = job
+        self.name = name
+        self.state = PENDING
+        self.stats = RunStats()
+        self.timing = TimingStats()
+        self.point_index = 0
+        self.deadline_ns = None
+        self.generation = 0  # Bumped to make queued heap entries stale
+        self.resume_in_ns = 0
+        self.active_ns = 0
+        self.running_since_ns = None
+        # Sequences (lists, or lazy views for streamed point files)
+        self.waits = job.points.delays_before(job.interval, job.point_delay)
+        self.buttons = job.points.button_names()
+        self.programs = None  # Compiled actions, once the scheduler has a backend
+
+    def next_delay_ns(self):
+        """Delay before the next point (the interval when a new cycle starts)"""
+        return int(self.waits[self.point_index] * 1e9)
+
+    def snapshot(self, now_ns):
+        """Return the job's state and RunStats as a dict"""
+        active_ns = self.active_ns
+        if self.running_since_ns is not None:
+            active_ns += now_ns - self.running_since_ns
+        self.stats.elapsed = active_ns / 1e9
+        self.stats.timing = self.timing.summary()
+        return dict(self.stats.to_dict(), id=self.job_id, name=self.name, state=self.state)
+
+
+class JobScheduler:
+    """Runs many ClickJobs at once on a single timing thread.
+
+    Every running job has one entry in a heap of next-fire deadlines. The
+    thread sleeps on a condition until the earliest deadline (busy-waiting
+    the final stretch like PrecisionScheduler), clicks that job's next point
+    and pushes its following deadline, so 50 jobs cost one thread and idle
+    jobs cost nothing. Pausing or stopping a job bumps its generation, which
+    turns its queued entry stale. Jobs run point by point (no burst mode) and
+    share the input backend, the log, the emergency stop_event and metrics.
+    """
+
+    def __init__(self, backend=None, stop_event=None, log=None, clock=time.perf_counter_ns,
+                 spin_ns=SPIN_THRESHOLD_NS, on_finish=None, metrics=None, tracer=None, screen=None):
+        self.backend = backend
+        self.screen = screen
+        self.capture = None
+        self.click = None
+        self.metrics = metrics
+        self.tracer = tracer
+        self.stop_event = stop_event if stop_event is not None else StopSignal()
+        self.log = log or NullLog()
+        self.clock = clock
+        self.spin_ns = spin_ns
+        self.on_finish = on_finish
+        self.jobs = {}
+        self.heap = []
+        self.seq = itertools.count()
+        self.ids = itertools.count(1)
+        self.cond = threading.Condition()
+        self.thread = None
+        self.closed = False
+        if hasattr(self.stop_event, "subscribe"):
+            self.stop_event.subscribe(self._on_stop)
+
+    def add(self, job, name=None, delay=0.0, start=True):
+        """Add a job (started after delay seconds unless start is False); return its id"""
+        job.validate()
+        if job.source is not None:
+            raise ValueError("Generated click sources run on the ClickEngine, not as concurrent jobs")
+        with self.cond:
+            if self.closed:
+                raise RuntimeError("Job scheduler is closed")
+            job_id = next(self.ids)
+            entry = ScheduledJob(job_id, job, name or f"job {job_id}")
+            if self.metrics:
+                # The histogram (not a cell): it is written from the timing thread
+                entry.timing.histogram = self.metrics.interval_error
+            self.jobs[job_id] = entry
+            if start:
+                self._start(entry, int(delay * 1e9))
+        return job_id
+
+    def start(self, job_id):
+        """Start a job that was added with start=False"""
+        with self.cond:
+            entry = self.jobs[job_id]
+            if entry.state == PENDING:
+                self._start(entry, 0)
+
+    def pause(self, job_id):
+        """Pause a running job, keeping its position and time to the next click"""
+        with self.cond:
+            entry = self.jobs[job_id]
+            if entry.state != RUNNING:
+                return
+            now = self.clock()
+            entry.generation += 1
+            entry.resume_in_ns = max(0, entry.deadline_ns - now)
+            entry.active_ns += now - entry.running_since_ns
+            entry.running_since_ns = None
+            entry.state = PAUSED
+            self.log.message(f"⏸ {entry.name} paused after {entry.stats.clicks} clicks")
+
+    def resume(self, job_id):
+        """Resume a paused job"""
+        with self.cond:
+            entry = self.jobs[job_id]
+            if entry.state != PAUSED:
+                return
+            now = self.clock()
+            entry.state = RUNNING
+            entry.running_since_ns = now
+            entry.deadline_ns = now + entry.resume_in_ns
+            self._push(entry)
+            self.log.message(f"▶ {entry.name} resumed")
+
+    def stop(self, job_id):
+        """Stop one job; the others keep running"""
+        with self.cond:
+            entry = self.jobs[job_id]
+            if entry.state != FINISHED:
+                self._finish(entry, STOPPED)
+
+    def stats(self, job_id=None):
+        """Return one job's stats dict, or a list for all jobs"""
+        with self.cond:
+            now = self.clock()
+            if job_id is not None:
+                return self.jobs[job_id].snapshot(now)
+            return [entry.snapshot(now) for entry in self.jobs.values()]
+
+    def active(self):
+        """Return True while any job is pending, running or paused"""
+        with self.cond:
+            return any(entry.state != FINISHED for entry in self.jobs.values())
+
+    def wait(self, timeout=None):
+        """Block until every job has finished; return False on timeout"""
+        with self.cond:
+            return self.cond.wait_for(lambda: not any(
+                entry.state in (RUNNING, PAUSED) for entry in self.jobs.values()), timeout)
+
+    def close(self):
+        """Stop all jobs and the timing thread, and let go of the stop_event"""
+        with self.cond:
+            self._finish_all(STOPPED)
+            self.closed = True
+            self.cond.notify_all()
+        if hasattr(self.stop_event, "unsubscribe"):
+            self.stop_event.unsubscribe(self._on_stop)
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def _start(self, entry, delay_ns):
+        if self.backend is None:
+            self.backend = create_backend()
+        if entry.programs is None:
+            capture = None
+            if entry.job.points.needs_screen():
+                if self.capture is None:
+                    self.capture = CaptureCache(self.screen or create_screen())
+                capture = self.capture
+            entry.programs = entry.job.points.compile_actions(self.backend, capture) or []
+        if self.metrics:
+            self.metrics.runs.inc()
+            self.metrics.active_jobs.inc()
+        now = self.clock()
+        entry.state = RUNNING
+        entry.running_since_ns = now
+        entry.deadline_ns = now + delay_ns
+        self._push(entry)
+        self.log.message(f"Starting {entry.name} - Mode: {entry.job.mode()}, Max: {entry.job.max_clicks}, "
+                         f"Interval: {entry.job.interval}s, Points: {len(entry.job.points)}")
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="job-scheduler", daemon=True)
+            self.thread.start()
+
+    def _push(self, entry):
+        heapq.heappush(self.heap, (entry.deadline_ns, next(self.seq), entry, entry.generation))
+        self.cond.notify_all()
+
+    def _finish(self, entry, reason):
+        if self.metrics and entry.state in (RUNNING, PAUSED):
+            self.metrics.active_jobs.inc(-1)
+        if entry.running_since_ns is not None:
+            entry.active_ns += self.clock() - entry.running_since_ns
+            entry.running_since_ns = None
+        entry.generation += 1
+        entry.state = FINISHED
+        entry.stats.stop_reason = reason
+        self.log.message(f"{entry.name} {reason} - {entry.stats.clicks} clicks")
+        self.cond.notify_all()
+        if self.on_finish:
+            self.on_finish(entry.job_id, entry.snapshot(self.clock()))
+
+    def _finish_all(self, reason):
+        for entry in self.jobs.values():
+            if entry.state != FINISHED:
+                self._finish(entry, reason)
+
+    def _on_stop(self, reason):
+        with self.cond:
+            self.cond.notify_all()
+
+    def _next_due(self):
+        """Return the earliest live heap entry (discarding stale ones) or None"""
+        heap = self.heap
+        while heap:
+            _, _, entry, generation = heap[0]
+            if entry.generation == generation and entry.state == RUNNING:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def _run(self):
+        # Instrumented here so the metrics cells belong to the timing thread
+        self.click = self.metrics.instrument(self.backend.click) if self.metrics else self.backend.click
+        self.perform = perform
+        fire = self._fire
+        if self.tracer:
+            # fire covers click, logging and the heap push
+            self.click = self.tracer.wrap("scheduler.click", self.click)
+            self.perform = self.tracer.wrap("scheduler.action", self.perform)
+            fire = self.tracer.wrap("scheduler.fire", fire)
+        with self.cond:
+            while not self.closed:
+                if self.stop_event.is_set():
+                    self._finish_all(STOPPED)
+                head = self._next_due()
+                if head is None:
+                    self.cond.wait()
+                    continue
+                deadline, _, entry, generation = head
+                remaining = deadline - self.clock()
+                if remaining > self.spin_ns:
+                    # Woken early by add/pause/resume/stop, or the deadline is near
+                    self.cond.wait((remaining - self.spin_ns) / 1e9)
+                    continue
+
+                heapq.heappop(self.heap)
+                # Final approach without the lock so other threads aren't held up
+                self.cond.release()
+                try:
+                    while self.clock() < deadline and not self.stop_event.is_set():
+                        pass
+                finally:
+                    self.cond.acquire()
+                if entry.generation == generation and not self.stop_event.is_set():
+                    fire(entry, deadline)
+
+    def _fire(self, entry, deadline):
+        """Click the job's next point and queue its following deadline"""
+        job = entry.job
+        stats = entry.stats
+        log = self.log
+        point_index = entry.point_index
+        generation = entry.generation
+        x, y = job.points[point_index]
+        entry.timing.record(deadline, self.clock())
+        try:
+            program = entry.programs[point_index] if entry.programs else None
+            if program is None:
+                self.click(x, y, entry.buttons[point_index])
+            else:
+                # Holds and drags take a while: let other threads in meanwhile
+                self.cond.release()
+                try:
+                    completed = self.perform(program, self.stop_event)
+                finally:
+                    self.cond.acquire()
+                if not completed:
+                    return
+                if self.metrics:
+                    self.metrics.clicks.inc()
+            stats.clicks += 1
+            log.click(point_index, x, y, stats.clicks)
+        except FailSafeError:
+            log.click(point_index, x, y, stats.clicks, OUTCOME_FAILSAFE)
+            log.message("🚨 Failsafe triggered - mouse moved to corner!")
+            # The mouse is shared, so the failsafe stops every job
+            self._finish_all(FAILSAFE)
+            return
+        except Exception as e:
+            stats.errors += 1
+            if self.metrics:
+                self.metrics.errors.inc()
+            log.click(point_index, x, y, stats.clicks, OUTCOME_ERROR)
+            log.message(f"Error clicking point ({x}, {y}) in {entry.name}: {str(e)}")
+
+        if entry.state == FINISHED:
+            return  # Stopped while an action ran
+        if job.max_clicks and stats.clicks >= job.max_clicks:
+            self._finish(entry, COMPLETED)
+            return
+        entry.point_index = (point_index + 1) % len(job.points)
+        if entry.point_index == 0:
+            stats.cycles += 1
+            log.cycle(stats.clicks)
+            if job.max_cycles and stats.cycles >= job.max_cycles:
+                self._finish(entry, COMPLETED)
+                return
+        if entry.generation != generation:
+            return  # Paused while an action ran
+
+        # Advance from the previous deadline; re-anchor if a full delay behind
+        delay_ns = entry.next_delay_ns()
+        next_deadline = deadline + delay_ns
+        now = self.clock()
+        if now - next_deadline > delay_ns:
+            if delay_ns > 0:
+                entry.timing.overruns += 1
+            next_deadline = now
+        if job.duration and entry.active_ns + next_deadline - entry.running_since_ns > job.duration * 1e9:
+            self._finish(entry, COMPLETED)
+            return
+        entry.deadline_ns = next_deadline
+        self._push(entry)
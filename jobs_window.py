@@ -0,0 +1,89 @@
+import tkinter as tk
+from tkinter import ttk
+
+from job_scheduler import PAUSED, RUNNING
+
+JOBS_REFRESH_MS = 500  # How often the list updates while a job is active
+
+
+class JobsWindow:
+    """Toplevel listing the concurrent jobs of a JobScheduler.
+
+    "Add current" hands the current points and settings to add_job(),
+    which snapshots them into a new job, so the point list can then be
+    changed for the next one. The selected job can be paused, resumed or
+    stopped on its own. get_scheduler() returns the scheduler, or None
+    before the first job was added.
+    """
+
+    def __init__(self, parent, ui, get_scheduler, add_job):
+        self.ui = ui
+        self.get_scheduler = get_scheduler
+        self.add_job = add_job
+        self.shown = []
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("🗂 Concurrent Jobs")
+        self.window.geometry("480x300")
+        self.window.columnconfigure(0, weight=1)
+        self.window.rowconfigure(0, weight=1)
+        self.window.bind("<Destroy>", self.on_destroy)
+
+        self.listbox = tk.Listbox(self.window, font=('Consolas', 8), activestyle="none")
+        scrollbar = ttk.Scrollbar(self.window, orient="vertical", command=self.listbox.yview)
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+        self.listbox.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(5, 0), pady=(5, 0))
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S), pady=(5, 0))
+
+        button_frame = ttk.Frame(self.window, padding="5")
+        button_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E))
+        ttk.Button(button_frame, text="➕ Add current", style="Primary.TButton",
+                   command=self.add, width=14).grid(row=0, column=0, padx=(0, 3))
+        ttk.Button(button_frame, text="⏸", command=lambda: self.control("pause"), width=4).grid(row=0, column=1, padx=(0, 3))
+        ttk.Button(button_frame, text="▶", command=lambda: self.control("resume"), width=4).grid(row=0, column=2, padx=(0, 3))
+        ttk.Button(button_frame, text="⏹", command=lambda: self.control("stop"), width=4).grid(row=0, column=3, padx=(0, 3))
+        ttk.Button(button_frame, text="Close", command=self.window.destroy, width=8).grid(row=0, column=4)
+
+        self.ui.every("jobs", JOBS_REFRESH_MS, self.refresh, active=self.any_active)
+
+    def any_active(self):
+        scheduler = self.get_scheduler()
+        return scheduler is not None and scheduler.active()
+
+    def refresh(self):
+        """List every job with its state and counts, keeping the selection"""
+        scheduler = self.get_scheduler()
+        selected = self.selected_id()
+        self.listbox.delete(0, tk.END)
+        self.shown = []
+        for job in scheduler.stats() if scheduler else []:
+            self.listbox.insert(tk.END, f"{job['id']:>3} {job['name'][:22]:<22} {job['state']:<9}"
+                                        f"{job['clicks']:>8} clicks {job['errors']:>4} err")
+            self.shown.append(job["id"])
+            if job["state"] in (RUNNING, PAUSED):
+                self.listbox.itemconfig(tk.END, foreground='#2563eb' if job["state"] == RUNNING else '#d97706')
+        if selected in self.shown:
+            self.listbox.selection_set(self.shown.index(selected))
+
+    def selected_id(self):
+        selection = self.listbox.curselection()
+        return self.shown[selection[0]] if selection else None
+
+    def add(self):
+        if self.add_job(parent=self.window):
+            self.refresh()
+            self.ui.resume()
+
+    def control(self, action):
+        """Pause, resume or stop the selected job"""
+        job_id = self.selected_id()
+        scheduler = self.get_scheduler()
+        if job_id is None or scheduler is None:
+            return
+        getattr(scheduler, action)(job_id)
+        self.refresh()
+        self.ui.resume()
+
+    def on_destroy(self, event):
+        if event.widget is self.window:
+            self.ui.cancel("jobs")
@@ -0,0 +1,414 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime
+
+LOG_FILE = "autoclicker_log.txt"
+LOG_FORMAT = '%(asctime)s - %(message)s'
+LOG_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+# Rotation defaults: roll at 10 MB or daily, keep 5 gzip'd files for 30 days
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+DEFAULT_ROTATE_SECONDS = 24 * 60 * 60
+DEFAULT_RETENTION_DAYS = 30
+
+# Compact event kinds enqueued by the click loop instead of formatted messages
+CLICK_EVENT = "click"
+CYCLE_EVENT = "cycle"
+BURST_EVENT = "burst"
+
+# Click outcomes recorded with each click event
+OUTCOME_OK = 0
+OUTCOME_ERROR = 1
+OUTCOME_FAILSAFE = 2
+OUTCOME_NAMES = {OUTCOME_OK: "ok", OUTCOME_ERROR: "error", OUTCOME_FAILSAFE: "failsafe"}
+
+# Click event file formats: "text" keeps clicks in the main log, the others
+# write them to a separate compact file next to it
+CLICK_FORMATS = ("text", "jsonl", "binary")
+CLICK_FILES = {"jsonl": "autoclicker_clicks.jsonl", "binary": "autoclicker_clicks.bin"}
+
+# Binary click record: timestamp_ns, point index, x, y, outcome
+BINARY_MAGIC = b"ACLK\x01"
+BINARY_RECORD = struct.Struct("<qiiiB")
+
+_STOP = object()
+
+
+def rotate_file(path, backup_count, retention_days=None):
+    """Gzip path to path.1.gz, shifting older backups and applying retention"""
+    if not os.path.exists(path):
+        return
+    for index in range(backup_count - 1, 0, -1):
+        source = f"{path}.{index}.gz"
+        if os.path.exists(source):
+            os.replace(source, f"{path}.{index + 1}.gz")
+    # Only needed when a file rolls over, so not imported at startup
+    import gzip
+    import shutil
+    with open(path, 'rb') as source, gzip.open(f"{path}.1.gz", 'wb') as dest:
+        shutil.copyfileobj(source, dest)
+    os.remove(path)
+
+    cutoff = time.time() - retention_days * 86400 if retention_days else None
+    for index, backup in rotated_files(path):
+        if index > backup_count or (cutoff and os.path.getmtime(backup) < cutoff):
+            os.remove(backup)
+
+
+def rotated_files(path):
+    """Return the gzip'd backups of path as [(index, file)], newest (path.1.gz) first"""
+    backups = []
+    for backup in glob.glob(f"{glob.escape(path)}.*.gz"):
+        try:
+            backups.append((int(backup[len(path) + 1:-3]), backup))
+        except ValueError:
+            continue
+    return sorted(backups)
+
+
+class RotationPolicy:
+    """Size/time based rollover decision shared by the log and click files"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+                 rotate_seconds=DEFAULT_ROTATE_SECONDS, retention_days=DEFAULT_RETENTION_DAYS):
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rotate_seconds = rotate_seconds
+        self.retention_days = retention_days
+
+    def next_rollover(self):
+        """Return the wall-clock time of the next time-based rollover"""
+        return time.time() + self.rotate_seconds if self.rotate_seconds else None
+
+    def due(self, size, rollover_at):
+        """Return True if a file of this size/age should be rolled over"""
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        return rollover_at is not None and time.time() >= rollover_at
+
+
+class RecordQueueHandler(logging.Handler):
+    """Puts log records on a queue for the writer thread.
+
+    Like logging.handlers.QueueHandler, without importing that module
+    (sockets, pickle) at startup; messages are formatted by the writer.
+    """
+
+    def __init__(self, record_queue):
+        super().__init__()
+        self.queue = record_queue
+
+    def emit(self, record):
+        self.queue.put(record)
+
+
+class BatchFileHandler(logging.FileHandler):
+    """FileHandler that writes without flushing; the writer flushes once per batch.
+
+    With a RotationPolicy the file is gzip-rolled when it grows too large or
+    too old. Size is tracked in characters written, which is close enough to
+    bytes for a rollover threshold and avoids a tell() per record.
+    """
+
+    def __init__(self, filename, policy=None, encoding='utf-8'):
+        super().__init__(filename, delay=True, encoding=encoding)
+        self.policy = policy
+        self.size = 0
+        self.rollover_at = None
+
+    def _open(self):
+        stream = super()._open()
+        self.size = os.path.getsize(self.baseFilename)
+        if self.policy:
+            self.rollover_at = self.policy.next_rollover()
+        return stream
+
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            text = self.format(record) + self.terminator
+            self.stream.write(text)
+            self.size += len(text)
+            if self.policy and self.policy.due(self.size, self.rollover_at):
+                self.rollover()
+        except Exception:
+            self.handleError(record)
+
+    def rollover(self):
+        """Close, compress and restart the log file"""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        rotate_file(self.baseFilename, self.policy.backup_count, self.policy.retention_days)
+
+
+class ClickRecordFile:
+    """Compact click event file (JSON lines or fixed-size binary records)"""
+
+    def __init__(self, filename, fmt, policy=None):
+        self.filename = filename
+        self.fmt = fmt
+        self.policy = policy
+        self.stream = None
+        self.size = 0
+        self.rollover_at = None
+
+    def write(self, time_ns, point_index, x, y, outcome):
+        """Append one click record"""
+        if self.stream is None:
+            self.stream = open(self.filename, 'ab')
+            self.size = self.stream.tell()
+            if self.size == 0 and self.fmt == "binary":
+                self.stream.write(BINARY_MAGIC)
+                self.size = len(BINARY_MAGIC)
+            if self.policy:
+                self.rollover_at = self.policy.next_rollover()
+        if self.fmt == "binary":
+            data = BINARY_RECORD.pack(time_ns, point_index, x, y, outcome)
+        else:
+            data = (json.dumps({"t_ns": time_ns, "point": point_index, "x": x, "y": y,
+                                "outcome": OUTCOME_NAMES.get(outcome, outcome)},
+                               separators=(',', ':')) + "\n").encode('utf-8')
+        self.stream.write(data)
+        self.size += len(data)
+        if self.policy and self.policy.due(self.size, self.rollover_at):
+            self.close()
+            rotate_file(self.filename, self.policy.backup_count, self.policy.retention_days)
+
+    def flush(self):
+        if self.stream:
+            self.stream.flush()
+
+    def close(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+
+def read_click_records(path):
+    """Yield click records as dicts from a .jsonl/.bin click file (optionally .gz)"""
+    import gzip
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, 'rb') as f:
+        if f.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+            while True:
+                chunk = f.read(BINARY_RECORD.size)
+                if len(chunk) < BINARY_RECORD.size:
+                    break
+                time_ns, point_index, x, y, outcome = BINARY_RECORD.unpack(chunk)
+                yield {"t_ns": time_ns, "point": point_index, "x": x, "y": y,
+                       "outcome": OUTCOME_NAMES.get(outcome, outcome)}
+            return
+        f.seek(0)
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_logging_config(settings_file):
+    """Return the optional "logging" section of the settings file as LogPipeline kwargs"""
+    try:
+        with open(settings_file, 'r') as f:
+            return logging_config(json.load(f))
+    except Exception:
+        return {}
+
+
+def logging_config(settings):
+    """Return the "logging" section of an already loaded settings dict as LogPipeline kwargs"""
+    config = settings.get("logging", {})
+    kwargs = {}
+    if config.get("click_format") in CLICK_FORMATS:
+        kwargs["click_format"] = config["click_format"]
+    policy_keys = ("max_bytes", "backup_count", "rotate_seconds", "retention_days")
+    if any(key in config for key in policy_keys):
+        kwargs["policy"] = RotationPolicy(**{key: config[key] for key in policy_keys if key in config})
+    return kwargs
+
+
+class LogPipeline:
+    """Queue-backed logging shared by the GUI and the click worker.
+
+    Callers only enqueue: regular messages go through a RecordQueueHandler and
+    click/cycle events are pushed as plain tuples. A background writer
+    thread formats them, writes the log file in batches and forwards a
+    coalesced view to the GUI queue. on_gui, if given, is called from the
+    writer thread after each batch that queued GUI lines, so the GUI can
+    drain them without polling.
+    """
+
+    def __init__(self, filename=LOG_FILE, flush_interval=0.25, batch_size=1000, gui=True,
+                 policy=None, click_format="text", on_gui=None):
+        if click_format not in CLICK_FORMATS:
+            raise ValueError(f"Unknown click log format: {click_format}")
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.queue = queue.SimpleQueue()
+        self.gui_queue = queue.SimpleQueue() if gui else None
+        self.on_gui = on_gui
+
+        policy = policy or RotationPolicy()
+        self.file_handler = BatchFileHandler(filename, policy)
+        self.file_handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATEFMT))
+        self.click_file = None
+        if click_format != "text":
+            click_path = os.path.join(os.path.dirname(filename), CLICK_FILES[click_format])
+            self.click_file = ClickRecordFile(click_path, click_format, policy)
+
+        self.logger = logging.getLogger("autoclicker")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.queue_handler = RecordQueueHandler(self.queue)
+        self.logger.addHandler(self.queue_handler)
+
+        self.closed = False
+        self.writer_thread = threading.Thread(target=self._writer, name="log-writer", daemon=True)
+        self.writer_thread.start()
+        atexit.register(self.close)
+
+    def message(self, text):
+        """Log a regular message"""
+        self.logger.info(text)
+
+    def click(self, point_index, x, y, total, outcome=OUTCOME_OK):
+        """Record a click from the hot loop (no formatting, no I/O)"""
+        self.queue.put((CLICK_EVENT, time.time_ns(), point_index, x, y, total, outcome))
+
+    def burst(self, actions, point_indexes, first_total):
+        """Record a whole burst of (offset_ns, x, y, button) clicks with one enqueue"""
+        self.queue.put((BURST_EVENT, time.time_ns(), actions, point_indexes, first_total))
+
+    def cycle(self, total):
+        """Record the end of a click cycle"""
+        self.queue.put((CYCLE_EVENT, time.time_ns(), total))
+
+    def close(self):
+        """Flush everything still queued and stop the writer thread"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(_STOP)
+        self.writer_thread.join(timeout=5)
+        self.logger.removeHandler(self.queue_handler)
+        self.file_handler.close()
+        if self.click_file:
+            self.click_file.close()
+
+    def _writer(self):
+        """Collect records for up to flush_interval, then write them in one batch"""
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(self.queue.get(timeout=remaining))
+                    else:
+                        batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            running = self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        """Write one batch to the file and forward it to the GUI; False on stop"""
+        running = True
+        pending_clicks = 0
+        last_click = None
+        queued = False
+        for item in self._expand_bursts(batch):
+            if item is _STOP:
+                running = False
+                continue
+            if type(item) is tuple:
+                if item[0] == CLICK_EVENT:
+                    pending_clicks += 1
+                    last_click = item
+                    if self.click_file:
+                        self.click_file.write(*item[1:5], item[6])
+                        continue
+                record = self._event_record(item)
+            else:
+                record = item
+                if self.gui_queue is not None:
+                    if pending_clicks:
+                        self.gui_queue.put((CLICK_EVENT, last_click[1], pending_clicks, last_click[5]))
+                        pending_clicks = 0
+                    self.gui_queue.put(("message", record.created, record.getMessage()))
+                    queued = True
+            self.file_handler.handle(record)
+        if pending_clicks and self.gui_queue is not None:
+            self.gui_queue.put((CLICK_EVENT, last_click[1], pending_clicks, last_click[5]))
+            queued = True
+        self.file_handler.flush()
+        if self.click_file:
+            self.click_file.flush()
+        if queued and self.on_gui is not None:
+            self.on_gui()
+        return running
+
+    def _expand_bursts(self, batch):
+        """Yield the batch with each burst event unpacked into click events"""
+        for item in batch:
+            if type(item) is tuple and item[0] == BURST_EVENT:
+                _, time_ns, actions, point_indexes, first_total = item
+                for number, ((offset, x, y, _), point_index) in enumerate(zip(actions, point_indexes)):
+                    yield (CLICK_EVENT, time_ns + offset, point_index, x, y, first_total + number, OUTCOME_OK)
+            else:
+                yield item
+
+    def _event_record(self, event):
+        """Build a LogRecord for a compact click/cycle event"""
+        if event[0] == CLICK_EVENT:
+            _, time_ns, point_index, x, y, total, outcome = event
+            if outcome == OUTCOME_OK:
+                text = f"Clicked point {point_index + 1}: ({x}, {y}) - Total clicks: {total}"
+            else:
+                text = f"Click {OUTCOME_NAMES.get(outcome, outcome)} at point {point_index + 1}: ({x}, {y})"
+        else:
+            _, time_ns, total = event
+            text = f"Completed click cycle, total clicks: {total}"
+        created = time_ns / 1e9
+        return logging.makeLogRecord({
+            "name": self.logger.name, "levelno": logging.INFO, "levelname": "INFO",
+            "msg": text, "created": created, "msecs": (created % 1) * 1000,
+        })
+
+    def drain_gui(self, max_items=5000):
+        """Return pending GUI log lines, merging consecutive click summaries"""
+        lines = []
+        clicks = 0
+        click_time = total = None
+        for _ in range(max_items):
+            try:
+                item = self.gui_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] == CLICK_EVENT:
+                _, click_time, count, total = item
+                clicks += count
+                continue
+            if clicks:
+                lines.append(self._click_summary(click_time, clicks, total))
+                clicks = 0
+            _, created, text = item
+            lines.append(f"[{datetime.fromtimestamp(created).strftime('%H:%M:%S')}] {text}\n")
+        if clicks:
+            lines.append(self._click_summary(click_time, clicks, total))
+        return lines
+
+    def _click_summary(self, time_ns, clicks, total):
+        """Format a coalesced 'N clicks since last update' GUI line"""
+        timestamp = datetime.fromtimestamp(time_ns / 1e9).strftime("%H:%M:%S")
+        noun = "click" if clicks == 1 else "clicks"
+        return f"[{timestamp}] 🖱 {clicks:,} {noun} since last update - Total clicks: {total:,}\n"
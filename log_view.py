@@ -0,0 +1,205 @@
+import os
+import tkinter as tk
+from array import array
+from collections import deque
+from tkinter import ttk
+
+from log_pipeline import rotated_files
+
+DEFAULT_MAX_LINES = 1000  # Lines kept in the Activity Log (older ones stay on disk)
+HISTORY_PAGE_LINES = 500  # Lines per page in the full history viewer
+
+
+class ActivityLogView:
+    """Fixed-capacity Activity Log: a ring buffer of lines mirrored into a Text widget"""
+
+    def __init__(self, text_widget, max_lines=DEFAULT_MAX_LINES):
+        self.text = text_widget
+        self.max_lines = max_lines
+        self.lines = deque(maxlen=max_lines)
+        self.widget_lines = 0
+
+    def append(self, lines):
+        """Append newline-terminated lines, trimming the widget in bulk"""
+        if not lines:
+            return
+        self.lines.extend(lines)
+        if len(lines) >= self.max_lines:
+            # The batch alone overflows the buffer - just show its tail
+            self.text.delete('1.0', tk.END)
+            self.text.insert(tk.END, "".join(self.lines))
+            self.widget_lines = len(self.lines)
+        else:
+            self.text.insert(tk.END, "".join(lines))
+            self.widget_lines += len(lines)
+            # Trim only once we are 10% over the cap so deletes stay rare
+            excess = self.widget_lines - self.max_lines
+            if excess > max(1, self.max_lines // 10):
+                self.text.delete('1.0', f"{excess + 1}.0")
+                self.widget_lines -= excess
+        self.text.see(tk.END)
+
+    def clear(self):
+        """Clear the buffer and the widget"""
+        self.lines.clear()
+        self.text.delete('1.0', tk.END)
+        self.widget_lines = 0
+
+    def set_max_lines(self, max_lines):
+        """Change the line cap, re-rendering the buffered tail"""
+        max_lines = max(10, int(max_lines))
+        if max_lines == self.max_lines:
+            return
+        self.max_lines = max_lines
+        self.lines = deque(self.lines, maxlen=max_lines)
+        self.text.delete('1.0', tk.END)
+        self.text.insert(tk.END, "".join(self.lines))
+        self.widget_lines = len(self.lines)
+        self.text.see(tk.END)
+
+
+class LogFilePager:
+    """Random access to pages of a (possibly huge) log file without loading it.
+
+    The index grows with the file and starts over when the file is
+    replaced or truncated (rotation). Gzip'd backups (.gz) are indexed
+    once, as they never change.
+    """
+
+    def __init__(self, path, page_lines=HISTORY_PAGE_LINES):
+        self.path = path
+        self.page_lines = page_lines
+        self.compressed = path.endswith(".gz")
+        self.reset(None)
+
+    def reset(self, identity):
+        self.identity = identity
+        self.page_offsets = array('q')
+        self.indexed_bytes = 0
+        self.indexed_lines = 0
+        self.complete = False
+
+    def open(self):
+        if self.compressed:
+            import gzip
+            return gzip.open(self.path, 'rb')
+        return open(self.path, 'rb')
+
+    def refresh(self):
+        """Extend the page index over bytes appended since the last call"""
+        try:
+            info = os.stat(self.path)
+        except FileNotFoundError:
+            self.reset(None)
+            return 0
+        identity = (info.st_dev, info.st_ino)
+        if identity != self.identity or (not self.compressed and info.st_size < self.indexed_bytes):
+            self.reset(identity)
+        elif self.complete:
+            return self.page_count()
+        try:
+            with self.open() as f:
+                f.seek(self.indexed_bytes)
+                offset = self.indexed_bytes
+                for line in f:
+                    if self.indexed_lines % self.page_lines == 0:
+                        self.page_offsets.append(offset)
+                    offset += len(line)
+                    self.indexed_lines += 1
+                self.indexed_bytes = offset
+        except FileNotFoundError:
+            pass
+        self.complete = self.compressed
+        return self.page_count()
+
+    def page_count(self):
+        """Return the number of pages indexed so far"""
+        return len(self.page_offsets)
+
+    def read_page(self, page):
+        """Return the text of the given page (0-based)"""
+        if not 0 <= page < len(self.page_offsets):
+            return ""
+        lines = []
+        try:
+            with self.open() as f:
+                f.seek(self.page_offsets[page])
+                for _ in range(self.page_lines):
+                    line = f.readline()
+                    if not line:
+                        break
+                    lines.append(line.decode('utf-8', errors='replace'))
+        except FileNotFoundError:
+            pass
+        return "".join(lines)
+
+
+class LogHistoryWindow:
+    """Toplevel that pages through the full on-disk log and its rotated backups"""
+
+    def __init__(self, parent, path, page_lines=HISTORY_PAGE_LINES):
+        self.path = path
+        self.page_lines = page_lines
+        self.pager = LogFilePager(path, page_lines)
+        self.page = 0
+        self.segments = {}
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("📜 Full Log History")
+        self.window.geometry("700x500")
+        self.window.columnconfigure(0, weight=1)
+        self.window.rowconfigure(1, weight=1)
+
+        nav_frame = ttk.Frame(self.window, padding="5")
+        nav_frame.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        nav_frame.columnconfigure(5, weight=1)
+
+        ttk.Button(nav_frame, text="⏮", width=4, command=lambda: self.show_page(0)).grid(row=0, column=0)
+        ttk.Button(nav_frame, text="◀", width=4, command=lambda: self.show_page(self.page - 1)).grid(row=0, column=1, padx=(3, 0))
+        ttk.Button(nav_frame, text="▶", width=4, command=lambda: self.show_page(self.page + 1)).grid(row=0, column=2, padx=(3, 0))
+        ttk.Button(nav_frame, text="⏭", width=4, command=self.show_last_page).grid(row=0, column=3, padx=(3, 0))
+        self.segment_var = tk.StringVar()
+        self.segment_combo = ttk.Combobox(nav_frame, textvariable=self.segment_var, state="readonly", width=28,
+                                          postcommand=self.list_segments)
+        self.segment_combo.grid(row=0, column=4, padx=(10, 0))
+        self.segment_combo.bind("<<ComboboxSelected>>", self.select_segment)
+        self.page_label = ttk.Label(nav_frame, text="", font=('Segoe UI', 8))
+        self.page_label.grid(row=0, column=5, sticky=tk.E)
+
+        self.text = tk.Text(self.window, wrap=tk.NONE, font=('Consolas', 8), bg='#f8fafc')
+        scrollbar = ttk.Scrollbar(self.window, orient="vertical", command=self.text.yview)
+        self.text.configure(yscrollcommand=scrollbar.set)
+        self.text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+
+        self.list_segments()
+        self.segment_var.set(os.path.basename(path))
+        self.show_last_page()
+
+    def list_segments(self):
+        """Offer the current log and its rotated backups (newest first)"""
+        self.segments = {os.path.basename(self.path): self.path}
+        for _, backup in rotated_files(self.path):
+            self.segments[os.path.basename(backup)] = backup
+        self.segment_combo.config(values=list(self.segments))
+
+    def select_segment(self, event=None):
+        path = self.segments.get(self.segment_var.get(), self.path)
+        if path != self.pager.path:
+            self.pager = LogFilePager(path, self.page_lines)
+        self.show_last_page()
+
+    def show_last_page(self):
+        """Re-index new log output and jump to the newest page"""
+        self.show_page(self.pager.refresh() - 1)
+
+    def show_page(self, page):
+        """Display one page of the log file"""
+        # Re-index first: the file may have been rotated since the last page
+        count = self.pager.refresh()
+        self.page = max(0, min(page, count - 1))
+        self.text.config(state="normal")
+        self.text.delete('1.0', tk.END)
+        self.text.insert(tk.END, self.pager.read_page(self.page))
+        self.text.config(state="disabled")
+        self.page_label.config(text=f"Page {self.page + 1 if count else 0} of {count}")
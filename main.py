@@ -1,13 +1,35 @@
+import sys
+
+if __name__ == "__main__" and sys.argv[1:2] in (["run"], ["convert"]):
+    # Headless job runner: dispatch before tkinter/plyer are imported
+    import cli
+    sys.exit(cli.main(sys.argv[1:]))
+
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import pyautogui
+from tkinter import ttk, messagebox
 import threading
-import time
 import json
 import os
-from datetime import datetime, timedelta
-import logging
-from plyer import notification
+from datetime import datetime
+from click_engine import ClickEngine, ClickJob, COMPLETED, FAILSAFE
+from input_backends import create_backend
+from log_pipeline import LogPipeline, LOG_FILE, logging_config
+from metrics import Metrics, MetricsServer, RateMeter, metrics_port
+from notifier import Notifier, notifier_name
+from point_list import PointListView
+from point_store import PointStore
+from profiling import Profiler, PROFILE_ENV
+from recorder import MacroRecorder, PLAYBACK_SPEEDS, STOP_KEY, build_points, parse_speed, retime
+from log_view import ActivityLogView, LogHistoryWindow, DEFAULT_MAX_LINES
+from schedules import Schedule, REPEAT_MODES, wait_until
+from ui_dispatcher import UiDispatcher
+from stop_signal import (StopSignal, StopMonitor, MouseCornerWatcher, STOP_FILE,
+                         create_stop_file_watcher, default_hotkey_backend)
+
+CLOCK_REFRESH_MS = 1000  # How often the header clock updates while busy (once a minute when idle)
+FOCUS_REFRESH_MS = 1000  # How often a running job takes the keyboard focus back
+METRICS_REFRESH_MS = 1000  # How often the live metrics panel updates while a job runs
+STARTUP_FALLBACK_MS = 1000  # Load the settings by then even if the window hasn't been drawn
 
 class AutoClickerApp:
     def __init__(self, root):
@@ -20,27 +42,72 @@ class AutoClickerApp:
         self.setup_modern_style()
         
         # Initialize variables
-        self.click_points = []
+        self.click_points = PointStore()
         self.is_running = False
         self.click_thread = None
         self.scheduled_time = None
         self.settings_file = "autoclicker_settings.json"
         self.emergency_stop = False
+        self.stop_event = StopSignal()
+        self.input_backend_name = "auto"
+        self.input_backend = None
+        self.job_scheduler = None  # Concurrent jobs from the Jobs window, created with the first one
+        self.jobs_window = None
         
-        # Setup emergency stop mechanisms
-        self.setup_emergency_stops()
+        # Every GUI update from other threads goes through the dispatcher,
+        # which applies them on the main thread (coalesced, capped rate)
+        self.ui = UiDispatcher(self.root)
+        self.recorder = MacroRecorder(on_stop=lambda: self.ui.call(self.finish_recording))
+        
+        # The settings file is read once; the services below take their
+        # sections from it and finish_startup() applies the rest
+        self.startup_settings = self.read_settings()
         
-        # Setup logging
-        self.setup_logging()
+        # Setup logging (first, so early messages are queued for the log view)
+        self.setup_logging(self.startup_settings)
         
-        # Disable pyautogui fail-safe (optional)
-        pyautogui.FAILSAFE = True
+        # Desktop notifications, sent from a background thread
+        self.setup_notifications(self.startup_settings)
+        
+        # Live metrics (the panel now, the optional endpoint after the first frame)
+        self.setup_metrics()
+        
+        # Opt-in click loop profiling (AUTOCLICKER_PROFILE)
+        self.setup_profiling()
+        
+        # Setup emergency stop mechanisms
+        self.setup_emergency_stops()
         
         # Create GUI
         self.create_gui()
         
+        # The profile store (and sqlite3) and the settings are loaded once
+        # the first frame is on screen, so they don't delay the window
+        self.current_profile = None
+        self.profile_store = None
+        self.startup_done = False
+        # One-shot on a frame of our own (the root's bindings also see every child's events)
+        self.map_binding = self.main_frame.bind("<Map>", lambda event: self.root.after_idle(self.finish_startup))
+        self.startup_fallback = self.root.after(STARTUP_FALLBACK_MS, self.finish_startup)
+    
+    def finish_startup(self):
+        """Open the profile store and load the settings (once; anything that needs them calls this first)"""
+        if self.startup_done:
+            return
+        self.startup_done = True
+        self.main_frame.unbind("<Map>", self.map_binding)
+        self.root.after_cancel(self.startup_fallback)
+        # Draw the first frame before the loading below holds up the main loop
+        self.root.update_idletasks()
+        
+        settings, self.startup_settings = self.startup_settings, None
+        self.start_metrics_server(settings)
+        
+        # Named profiles (points and job settings) live in the profile store
+        self.setup_profile_store()
+        
         # Load settings if they exist
-        self.load_settings()
+        self.load_settings(settings)
     
     def setup_modern_style(self):
         """Configure modern UI styling"""
@@ -64,15 +131,76 @@ class AutoClickerApp:
         style.configure('Success.TButton', font=('Segoe UI', 9))
         style.configure('Danger.TButton', font=('Segoe UI', 9))
     
-    def setup_logging(self):
+    def read_settings(self):
+        """Return the settings file as a dict ({} if it is missing; unreadable ones are logged later)"""
+        self.settings_error = None
+        try:
+            with open(self.settings_file, 'r') as f:
+                settings = json.load(f)
+            if not isinstance(settings, dict):
+                raise ValueError("expected a JSON object")
+            return settings
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.settings_error = str(e)
+            return {}
+    
+    def setup_logging(self, settings):
         """Setup logging for action tracking"""
-        logging.basicConfig(
-            filename='autoclicker_log.txt',
-            level=logging.INFO,
-            format='%(asctime)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        self.logger = logging.getLogger(__name__)
+        # Messages are queued and written/displayed in batches so the click
+        # loop never touches Tk widgets or the log file directly
+        # Rotation and click record format come from the settings file's
+        # optional "logging" section
+        self.log_pipeline = LogPipeline(LOG_FILE, on_gui=lambda: self.ui.post("log", self.drain_log_queue),
+                                        **logging_config(settings))
+        self.logger = self.log_pipeline.logger
+    
+    def setup_notifications(self, settings):
+        """Create the notifier ("notifier" in the settings file: auto, plyer, dbus or log)"""
+        # Sending happens on the notifier's thread, so the click start and
+        # the stop paths never wait for the notification daemon
+        self.notifier = Notifier(notifier_name(settings), log=self.log_message)
+    
+    def setup_metrics(self):
+        """Create the click metrics (the endpoint starts in finish_startup)"""
+        self.metrics = Metrics()
+        self.click_rate = RateMeter(self.metrics.clicks)
+        self.metrics_server = None
+    
+    def start_metrics_server(self, settings):
+        """Serve the metrics on localhost if "metrics_port" is set"""
+        port = metrics_port(settings)
+        if port:
+            try:
+                self.metrics_server = MetricsServer(self.metrics, port).start()
+                self.log_message(f"📈 Metrics at http://127.0.0.1:{port}/metrics (JSON: /metrics.json)")
+            except OSError as e:
+                self.log_message(f"Metrics endpoint unavailable on port {port}: {str(e)}")
+    
+    def setup_profiling(self):
+        """Enable phase tracing when AUTOCLICKER_PROFILE is set (spans, trace or cprofile)"""
+        try:
+            self.profiler = Profiler.from_env()
+        except ValueError as e:
+            self.profiler = None
+            self.log_message(f"Profiling disabled: {str(e)}")
+        if self.profiler:
+            # Tk timer callbacks compete with the click thread for the GIL
+            tracer = self.profiler.tracer
+            self.drain_log_queue = tracer.wrap("tk.log_drain", self.drain_log_queue)
+            self.update_metrics_panel = tracer.wrap("tk.metrics_panel", self.update_metrics_panel)
+            self.log_message(f"⏱ Profiling enabled ({PROFILE_ENV}={self.profiler.mode})")
+    
+    def setup_profile_store(self):
+        """Open the profile library, falling back to an in-memory one"""
+        import sqlite3
+        from profile_store import ProfileStore
+        try:
+            self.profile_store = ProfileStore()
+        except (OSError, sqlite3.Error, RuntimeError) as e:
+            self.log_message(f"Profile store unavailable ({str(e)}) - profiles will not be kept")
+            self.profile_store = ProfileStore(":memory:")
     
     def setup_emergency_stops(self):
         """Setup multiple emergency stop mechanisms"""
@@ -91,87 +219,59 @@ class AutoClickerApp:
         # Ensure the window can receive keyboard events
         self.root.focus_set()
         
-        # Make sure keyboard focus is maintained
+        # Make sure keyboard focus is maintained while a job runs (the
+        # timer is dropped when idle and resumed by begin_run)
         def maintain_focus():
             if self.is_running:
                 try:
                     self.root.focus_force()
                 except:
                     pass
-            self.root.after(1000, maintain_focus)  # Check every second
-        
-        maintain_focus()
         
-        # Enable pyautogui failsafe (move mouse to top-left corner)
-        pyautogui.FAILSAFE = True
+        self.ui.every("focus", FOCUS_REFRESH_MS, maintain_focus, active=lambda: self.is_running)
         
-        # Start emergency stop monitor thread with keyboard monitoring
-        self.start_emergency_monitor()
+        # Mouse corner, global hotkeys and the EMERGENCY_STOP file all feed
+        # stop_event; the sources are only armed while a job is active
+        self.stop_monitor = StopMonitor(self.stop_event, [
+            MouseCornerWatcher(self.mouse_position),
+            default_hotkey_backend(),
+            create_stop_file_watcher(STOP_FILE),
+        ], on_trigger=self.trigger_emergency_stop)
         
         self.log_message("🛡️ Emergency stops active: ESC, F12, Ctrl+C, Ctrl+Q, or mouse to top-left corner")
     
+    def get_input_backend(self):
+        """Return the input backend, creating it on first use"""
+        if self.input_backend is None or self.input_backend.name != self.input_backend_name:
+            if self.input_backend is not None:
+                self.input_backend.close()
+            self.input_backend = create_backend(self.input_backend_name)
+        return self.input_backend
+    
+    def mouse_position(self):
+        """Current mouse position, for the corner failsafe watcher"""
+        return self.input_backend.position() if self.input_backend else (100, 100)
+    
     def emergency_stop_handler(self, event=None):
         """Handle emergency stop from keyboard"""
         self.trigger_emergency_stop()
         return "break"
     
-    def start_emergency_monitor(self):
-        """Start monitoring for emergency conditions"""
-        def monitor():
-            while True:
-                try:
-                    if self.is_running:
-                        # Check mouse position for failsafe
-                        mouse_x, mouse_y = pyautogui.position()
-                        if mouse_x <= 5 and mouse_y <= 5:
-                            self.trigger_emergency_stop()
-                            
-                        # Check for keyboard state using Windows API if available
-                        try:
-                            import ctypes
-                            # Check ESC key (VK_ESCAPE = 0x1B)
-                            if ctypes.windll.user32.GetAsyncKeyState(0x1B) & 0x8000:
-                                self.trigger_emergency_stop()
-                            # Check F12 key (VK_F12 = 0x7B)  
-                            if ctypes.windll.user32.GetAsyncKeyState(0x7B) & 0x8000:
-                                self.trigger_emergency_stop()
-                            # Check Ctrl+C (Ctrl = 0x11, C = 0x43)
-                            if (ctypes.windll.user32.GetAsyncKeyState(0x11) & 0x8000) and (ctypes.windll.user32.GetAsyncKeyState(0x43) & 0x8000):
-                                self.trigger_emergency_stop()
-                        except:
-                            pass  # Fallback to other methods if ctypes not available
-                        
-                        # Check for emergency stop file
-                        if os.path.exists("EMERGENCY_STOP"):
-                            self.trigger_emergency_stop()
-                            try:
-                                os.remove("EMERGENCY_STOP")
-                            except:
-                                pass
-                    
-                    time.sleep(0.05)  # Check every 50ms for faster response
-                except:
-                    break
-        
-        monitor_thread = threading.Thread(target=monitor, daemon=True)
-        monitor_thread.start()
-    
-    def trigger_emergency_stop(self):
+    def trigger_emergency_stop(self, reason=None):
         """Trigger emergency stop from any source"""
-        if self.is_running:
+        if self.is_running or self.jobs_active():
             self.emergency_stop = True
             self.is_running = False
-            self.log_message("🚨 EMERGENCY STOP ACTIVATED!")
-            try:
-                self.root.after(0, self.force_stop_clicking)
-            except:
-                # If we can't schedule in main thread, force stop immediately
-                self.force_stop_clicking()
+            self.stop_event.trigger(reason or "emergency stop")
+            self.log_message(f"🚨 EMERGENCY STOP ACTIVATED! ({self.stop_event.reason})")
+            self.ui.call(self.force_stop_clicking)
     
     def force_stop_clicking(self):
         """Force stop all clicking operations immediately"""
         self.emergency_stop = True
         self.is_running = False
+        self.stop_event.trigger("emergency stop")
+        self.stop_monitor.stop()
         
         # Update UI immediately
         self.start_button.config(state="normal")
@@ -203,7 +303,7 @@ class AutoClickerApp:
         canvas.configure(yscrollcommand=scrollbar.set)
         
         # Main frame with modern padding
-        main_frame = ttk.Frame(scrollable_frame, padding="15")
+        main_frame = self.main_frame = ttk.Frame(scrollable_frame, padding="15")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Configure grid weights
@@ -252,7 +352,7 @@ class AutoClickerApp:
         self.current_time_label = ttk.Label(header_frame, text="", 
                                           font=('Segoe UI', 8), foreground=self.colors['secondary'])
         self.current_time_label.grid(row=1, column=0, columnspan=2, pady=(5, 0))
-        self.update_current_time()
+        self.ui.every("clock", self.clock_interval, self.update_current_time)
     
     def create_click_points_section(self, parent, row):
         """Create compact click points section"""
@@ -288,20 +388,48 @@ class AutoClickerApp:
         action_frame = ttk.Frame(controls_frame)
         action_frame.grid(row=0, column=2, sticky=tk.E)
         
+        ttk.Button(action_frame, text="Action", 
+                  command=self.edit_point_actions, width=7).grid(row=0, column=0, padx=(0, 3))
         ttk.Button(action_frame, text="Remove", 
-                  command=self.remove_click_point, width=8).grid(row=0, column=0, padx=(0, 3))
+                  command=self.remove_click_point, width=8).grid(row=0, column=1, padx=(0, 3))
         ttk.Button(action_frame, text="Clear", 
-                  command=self.clear_all_points, width=8).grid(row=0, column=1)
-        
-        # Compact points list
-        self.points_listbox = tk.Listbox(points_frame, height=4, font=('Consolas', 9),
-                                       selectmode=tk.SINGLE, activestyle='dotbox')
-        self.points_listbox.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
-        
-        # Points counter
-        self.points_counter = ttk.Label(points_frame, text="No points added", 
+                  command=self.clear_all_points, width=8).grid(row=0, column=2)
+        
+        # Macro recording and playback
+        macro_frame = ttk.Frame(points_frame)
+        macro_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(0, 8))
+        macro_frame.columnconfigure(2, weight=1)
+        
+        self.record_button = ttk.Button(macro_frame, text="⏺ Record", command=self.toggle_recording, width=14)
+        self.record_button.grid(row=0, column=0, padx=(0, 5))
+        self.record_moves_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(macro_frame, text="Moves", variable=self.record_moves_var).grid(row=0, column=1, sticky=tk.W)
+        
+        ttk.Label(macro_frame, text="Speed:", font=('Segoe UI', 8)).grid(row=0, column=3, padx=(0, 3))
+        self.playback_speed_var = tk.StringVar(value="1x")
+        ttk.Combobox(macro_frame, textvariable=self.playback_speed_var, values=PLAYBACK_SPEEDS,
+                     width=5, font=('Segoe UI', 8)).grid(row=0, column=4, padx=(0, 5))
+        ttk.Button(macro_frame, text="▶ Play", command=self.play_macro, width=8).grid(row=0, column=5)
+        
+        # Points list - only the visible rows are drawn, so large sets stay fast
+        self.points_view = PointListView(points_frame, self.click_points, colors=self.colors,
+                                         on_change=self.update_points_list, on_delete=self.remove_click_point,
+                                         on_activate=self.edit_point_actions)
+        self.points_view.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+        
+        # Points counter and search
+        footer_frame = ttk.Frame(points_frame)
+        footer_frame.grid(row=3, column=0, sticky=(tk.W, tk.E))
+        footer_frame.columnconfigure(0, weight=1)
+        
+        self.points_counter = ttk.Label(footer_frame, text="No points added", 
                                       font=('Segoe UI', 8), foreground=self.colors['secondary'])
-        self.points_counter.grid(row=2, column=0, sticky=tk.W)
+        self.points_counter.grid(row=0, column=0, sticky=tk.W)
+        
+        ttk.Label(footer_frame, text="🔍", font=('Segoe UI', 8)).grid(row=0, column=1, padx=(0, 2))
+        self.point_search_entry = ttk.Entry(footer_frame, width=12, font=('Segoe UI', 8))
+        self.point_search_entry.grid(row=0, column=2)
+        self.point_search_entry.bind('<Return>', lambda event: self.search_points())
     
     def create_settings_and_schedule_section(self, parent, row):
         """Create combined settings and schedule section"""
@@ -367,6 +495,28 @@ class AutoClickerApp:
         minute_spinbox = ttk.Spinbox(time_frame, from_=0, to=59, width=4, 
                                     textvariable=self.minute_var, format="%02.0f", font=('Segoe UI', 8))
         minute_spinbox.grid(row=0, column=3, padx=(2, 0))
+        
+        # Recurrence: repeat mode plus its value (minutes for "every", a cron expression for "cron")
+        repeat_frame = ttk.Frame(schedule_frame)
+        repeat_frame.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
+        
+        ttk.Label(repeat_frame, text="Repeat:", font=('Segoe UI', 8)).grid(row=0, column=0, sticky=tk.W)
+        self.schedule_repeat_var = tk.StringVar(value="once")
+        ttk.Combobox(repeat_frame, textvariable=self.schedule_repeat_var, values=REPEAT_MODES,
+                     state="readonly", width=6, font=('Segoe UI', 8)).grid(row=0, column=1, padx=(5, 2))
+        self.schedule_value_var = tk.StringVar(value="")
+        ttk.Entry(repeat_frame, textvariable=self.schedule_value_var, width=10,
+                  font=('Segoe UI', 8)).grid(row=0, column=2, padx=(2, 0))
+        
+        ttk.Label(repeat_frame, text="Run for (min):", font=('Segoe UI', 8)).grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=2)
+        self.run_for_var = tk.StringVar(value="")
+        ttk.Entry(repeat_frame, textvariable=self.run_for_var, width=10,
+                  font=('Segoe UI', 8)).grid(row=1, column=2, padx=(2, 0), pady=2)
+        
+        ttk.Label(repeat_frame, text="Stop at:", font=('Segoe UI', 8)).grid(row=2, column=0, columnspan=2, sticky=tk.W)
+        self.stop_at_var = tk.StringVar(value="")
+        ttk.Entry(repeat_frame, textvariable=self.stop_at_var, width=10,
+                  font=('Segoe UI', 8)).grid(row=2, column=2, padx=(2, 0))
     
     def create_control_section(self, parent, row):
         """Create compact control section"""
@@ -407,9 +557,22 @@ class AutoClickerApp:
         ttk.Button(settings_button_frame, text="💾", 
                   command=self.save_settings, width=4).grid(row=0, column=0, padx=(0, 3))
         ttk.Button(settings_button_frame, text="📂", 
-                  command=self.load_settings, width=4).grid(row=0, column=1, padx=(0, 3))
+                  command=self.open_profiles, width=4).grid(row=0, column=1, padx=(0, 3))
         ttk.Button(settings_button_frame, text="🔄", 
-                  command=self.reset_settings, width=4).grid(row=0, column=2)
+                  command=self.reset_settings, width=4).grid(row=0, column=2, padx=(0, 3))
+        ttk.Button(settings_button_frame, text="📥", 
+                  command=self.import_points, width=4).grid(row=0, column=3, padx=(0, 3))
+        ttk.Button(settings_button_frame, text="📤", 
+                  command=self.export_points, width=4).grid(row=0, column=4, padx=(0, 3))
+        ttk.Button(settings_button_frame, text="🗂", 
+                  command=self.open_jobs, width=4).grid(row=0, column=5)
+        
+        # Live metrics panel, refreshed from the lock-free counters while a job runs
+        self.metrics_label = ttk.Label(control_frame, text="", font=('Consolas', 8),
+                                       foreground=self.colors['secondary'])
+        self.metrics_label.grid(row=3, column=0, pady=(8, 0))
+        self.ui.every("metrics", METRICS_REFRESH_MS, self.update_metrics_panel,
+                      active=lambda: self.is_running or self.jobs_active())
     
     def create_log_section(self, parent, row):
         """Create compact log section"""
@@ -427,8 +590,10 @@ class AutoClickerApp:
                                   font=('Segoe UI', 8), foreground=self.colors['secondary'])
         self.log_status.grid(row=0, column=0, sticky=tk.W)
         
+        ttk.Button(log_header, text="History", 
+                  command=self.show_log_history, width=8).grid(row=0, column=1, sticky=tk.E, padx=(0, 3))
         ttk.Button(log_header, text="Clear", 
-                  command=self.clear_log, width=8).grid(row=0, column=1, sticky=tk.E)
+                  command=self.clear_log, width=8).grid(row=0, column=2, sticky=tk.E)
         
         # Compact log text
         log_text_frame = ttk.Frame(log_frame)
@@ -443,12 +608,34 @@ class AutoClickerApp:
         
         self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         log_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        
+        # Only the newest lines are kept in memory; the rest is in the log file
+        self.log_view = ActivityLogView(self.log_text, DEFAULT_MAX_LINES)
+        self.drain_log_queue()
+    
+    def clock_busy(self):
+        return self.is_running or self.recorder.recording or self.jobs_active()
+    
+    def clock_interval(self):
+        """Every second while a job runs, is scheduled or input is recorded, else at the next minute"""
+        if self.clock_busy():
+            return CLOCK_REFRESH_MS
+        now = datetime.now()
+        return (60 - now.second) * 1000 - now.microsecond // 1000 + 5
     
     def update_current_time(self):
-        """Update the current time display"""
-        current_time = datetime.now().strftime("%H:%M:%S - %b %d")
+        """Update the current time display (seconds only while busy)"""
+        current_time = datetime.now().strftime("%H:%M:%S - %b %d" if self.clock_busy() else "%H:%M - %b %d")
         self.current_time_label.config(text=current_time)
-        self.root.after(1000, self.update_current_time)
+    
+    def update_metrics_panel(self):
+        """Update the live clicks/s and jitter panel"""
+        rate = self.click_rate.poll()
+        jitter = self.metrics.interval_error.quantiles((0.5, 0.99))
+        latency = self.metrics.click_latency.quantiles((0.5,))
+        self.metrics_label.config(text=f"📈 {rate:.1f} clicks/s • {self.metrics.clicks.value()} total • "
+                                       f"jitter p50 {jitter[0.5] / 1e6:.2f} / p99 {jitter[0.99] / 1e6:.2f} ms • "
+                                       f"click {latency[0.5] / 1e3:.0f} µs")
     
     def add_click_point(self):
         """Add a click point with visual confirmation"""
@@ -583,8 +770,9 @@ class AutoClickerApp:
         button_frame.pack(pady=20)
         
         def confirm_add():
-            self.click_points.append((x, y))
-            self.update_points_listbox()
+            index = self.click_points.append(x, y)
+            self.update_points_list()
+            self.points_view.see(index)
             self.log_message(f"✅ Added click point: ({x}, {y})")
             confirm_window.destroy()
         
@@ -667,8 +855,9 @@ class AutoClickerApp:
         try:
             x = int(self.x_entry.get())
             y = int(self.y_entry.get())
-            self.click_points.append((x, y))
-            self.update_points_listbox()
+            index = self.click_points.append(x, y)
+            self.update_points_list()
+            self.points_view.see(index)
             self.log_message(f"Added manual click point: ({x}, {y})")
             self.x_entry.delete(0, tk.END)
             self.y_entry.delete(0, tk.END)
@@ -676,25 +865,111 @@ class AutoClickerApp:
             messagebox.showerror("Error", "Please enter valid integer coordinates")
     
     def remove_click_point(self):
-        """Remove selected click point"""
-        selection = self.points_listbox.curselection()
-        if selection:
-            index = selection[0]
-            removed_point = self.click_points.pop(index)
-            self.update_points_listbox()
+        """Remove the selected click points"""
+        selection = self.points_view.selection()
+        if len(selection) == 1:
+            removed_point = self.click_points[selection[0]]
+            self.points_view.delete_selected()
             self.log_message(f"Removed click point: {removed_point}")
+        elif selection:
+            self.log_message(f"Removed {self.points_view.delete_selected()} click points")
+    
+    def edit_point_actions(self):
+        """Set the button, action and own delay of the selected points"""
+        selection = self.points_view.selection()
+        if not selection:
+            messagebox.showinfo("Point Action", "Select one or more click points first")
+            return
+        first = selection[0]
+        points = self.click_points
+        
+        def apply(button, delay, action):
+            for index in selection:
+                points.set_button(index, button)
+                points.set_delay(index, delay)
+                points.set_action(index, action)
+            self.update_points_list()
+            description = "click" if action.is_plain() else action.describe()
+            self.log_message(f"🖱 {len(selection)} point(s) set to {button} {description}")
+        
+        from action_editor import ActionEditor  # Loaded on first use, like the other dialogs
+        ActionEditor(self.root, apply, len(selection), points.button(first), points.delay(first), points.action(first))
+    
+    def toggle_recording(self):
+        """Start recording input, or stop and add the recording to the points"""
+        if self.recorder.recording:
+            # Leave out the click on this button
+            self.finish_recording(drop_last_click=True)
+            return
+        if self.is_running:
+            messagebox.showerror("Error", "Stop clicking before recording")
+            return
+        try:
+            self.recorder.start()
+        except RuntimeError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.ui.restart("clock")
+        self.record_button.config(text=f"⏹ Stop ({STOP_KEY.upper()})")
+        self.update_status("Recording...", "danger")
+        self.log_message(f"⏺ Recording mouse and keyboard - press {STOP_KEY.upper()} to stop")
+    
+    def finish_recording(self, drop_last_click=False):
+        """Turn the recorded events into points (main thread)"""
+        if not self.recorder.recording:
+            return
+        events = self.recorder.stop(drop_last_click)
+        self.record_button.config(text="⏺ Record")
+        self.update_status("Ready", "success")
+        try:
+            recorded = build_points(events, record_moves=self.record_moves_var.get())
+        except ValueError as e:
+            self.log_message(f"Error building the recording: {str(e)}")
+            messagebox.showerror("Error", f"Failed to build the recording: {str(e)}")
+            return
+        first = len(self.click_points)
+        self.click_points.extend(recorded.to_rows())
+        self.update_points_list()
+        if recorded:
+            self.points_view.see(first)
+        self.log_message(f"⏺ Recorded {len(recorded)} points from {len(events)} input events")
+    
+    def play_macro(self):
+        """Play the points once at the chosen speed"""
+        if not self.click_points:
+            messagebox.showerror("Error", "Please add at least one click point")
+            return
+        try:
+            speed = parse_speed(self.playback_speed_var.get())
+            point_delay = float(self.point_delay_var.get())
+            # One pass over the points, even if some clicks fail
+            job = ClickJob(retime(self.click_points, speed), max_cycles=1, interval=0,
+                           point_delay=0.0 if speed is None else point_delay / speed)
+            job.validate()
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid playback settings: {str(e)}")
+            return
+        if self.begin_run():
+            self.update_status(f"Playing at {self.playback_speed_var.get()}...", "primary")
+            self.click_thread = threading.Thread(target=self.click_worker, args=(job,), daemon=True)
+            self.click_thread.start()
+    
+    def search_points(self):
+        """Jump to the point number or coordinates typed in the search box"""
+        text = self.point_search_entry.get().strip()
+        if text and self.points_view.search(text) is None:
+            self.log_message(f"🔍 No click point matches '{text}'")
     
     def clear_all_points(self):
         """Clear all click points"""
         self.click_points.clear()
-        self.update_points_listbox()
+        self.points_view.set_points(self.click_points)
+        self.update_points_list()
         self.log_message("Cleared all click points")
     
-    def update_points_listbox(self):
-        """Update the points listbox display"""
-        self.points_listbox.delete(0, tk.END)
-        for i, (x, y) in enumerate(self.click_points, 1):
-            self.points_listbox.insert(tk.END, f"{i:2d}. ({x:4d}, {y:4d})")
+    def update_points_list(self):
+        """Redraw the visible point rows and the counter"""
+        self.points_view.refresh()
         
         # Update counter
         count = len(self.click_points)
@@ -705,6 +980,27 @@ class AutoClickerApp:
         else:
             self.points_counter.config(text=f"{count} points added")
     
+    def build_job(self):
+        """Snapshot the GUI settings into a ClickJob (main thread only)"""
+        return ClickJob.from_dict({
+            "click_points": self.click_points,
+            "click_mode": self.click_mode.get(),
+            "click_count": self.click_count_var.get(),
+            "interval": self.interval_var.get(),
+            "point_delay": self.point_delay_var.get(),
+        })
+    
+    def build_schedule(self):
+        """Snapshot the schedule settings into a Schedule (main thread only)"""
+        return Schedule.from_dict({
+            "hour": self.hour_var.get(),
+            "minute": self.minute_var.get(),
+            "schedule_repeat": self.schedule_repeat_var.get(),
+            "schedule_value": self.schedule_value_var.get(),
+            "run_for": self.run_for_var.get(),
+            "stop_at": self.stop_at_var.get(),
+        })
+    
     def start_clicking(self):
         """Start the clicking process"""
         if not self.click_points:
@@ -712,71 +1008,152 @@ class AutoClickerApp:
             return
         
         try:
-            # Validate settings
-            if self.click_mode.get() == "limited":
-                click_count = int(self.click_count_var.get())
-                if click_count <= 0:
-                    raise ValueError("Click count must be positive")
-            
-            interval = float(self.interval_var.get())
-            point_delay = float(self.point_delay_var.get())
-            
-            if interval < 0 or point_delay < 0:
-                raise ValueError("Intervals must be non-negative")
-                
+            # Validate settings - the worker only ever sees this snapshot
+            job = self.build_job()
+            job.validate()
         except ValueError as e:
             messagebox.showerror("Error", f"Invalid settings: {str(e)}")
             return
         
-        self.is_running = True
-        self.emergency_stop = False  # Reset emergency stop flag
-        self.start_button.config(state="disabled")
-        self.stop_button.config(state="normal")
+        if not self.begin_run():
+            return
         
         if self.schedule_mode.get() == "immediate":
             self.update_status("Running...", "primary")
-            self.click_thread = threading.Thread(target=self.click_worker)
+            self.click_thread = threading.Thread(target=self.click_worker, args=(job,))
             self.click_thread.daemon = True
             self.click_thread.start()
         else:
-            # Schedule for specific time
+            # Schedule for specific time(s)
             try:
-                hour = int(self.hour_var.get())
-                minute = int(self.minute_var.get())
+                schedule = self.build_schedule()
+                upcoming = schedule.upcoming(datetime.now())
+                if not upcoming:
+                    raise ValueError("the schedule never fires")
                 
-                now = datetime.now()
-                scheduled_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+                self.scheduled_time = upcoming[0]
+                self.update_status(f"Scheduled for {self.scheduled_time.strftime('%H:%M')}", "warning")
+                self.log_message(f"⏰ Schedule: {schedule.describe()} - next: "
+                                 f"{', '.join(t.strftime('%a %H:%M') for t in upcoming)}")
                 
-                # If the time is in the past, schedule for tomorrow
-                if scheduled_time <= now:
-                    scheduled_time += timedelta(days=1)
-                
-                self.scheduled_time = scheduled_time
-                self.update_status(f"Scheduled for {scheduled_time.strftime('%H:%M')}", "warning")
-                
-                self.click_thread = threading.Thread(target=self.scheduled_click_worker)
+                self.click_thread = threading.Thread(target=self.scheduled_click_worker, args=(job, schedule))
                 self.click_thread.daemon = True
                 self.click_thread.start()
                 
                 # Show notification
                 self.show_notification("Auto Clicker Scheduled", 
-                                     f"Clicking will start at {scheduled_time.strftime('%H:%M:%S')}")
+                                     f"Clicking will start at {self.scheduled_time.strftime('%H:%M:%S')}")
                 
-            except ValueError:
-                messagebox.showerror("Error", "Invalid time format")
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid schedule: {str(e)}")
                 self.stop_clicking()
     
+    def begin_run(self):
+        """Open the input backend and switch the GUI to running; return False if it can't start"""
+        self.finish_startup()
+        if self.recorder.recording:
+            messagebox.showerror("Error", "Stop recording first")
+            return False
+        try:
+            self.get_input_backend()
+        except Exception as e:
+            messagebox.showerror("Error", f"Input backend '{self.input_backend_name}' unavailable: {str(e)}")
+            return False
+        
+        self.is_running = True
+        self.emergency_stop = False  # Reset emergency stop flag
+        self.stop_event.clear()
+        self.stop_monitor.start()
+        self.start_button.config(state="disabled")
+        self.stop_button.config(state="normal")
+        self.ui.resume()
+        self.ui.restart("clock")
+        return True
+    
     def stop_clicking(self):
         """Stop the clicking process"""
         self.is_running = False
         self.emergency_stop = True  # Set emergency flag for immediate stop
+        self.stop_event.trigger("stopped by user")  # Wake any waiting worker immediately
+        self.stop_monitor.stop()
         self.start_button.config(state="normal")
         self.stop_button.config(state="disabled")
         self.update_status("Stopped", "danger")
         self.log_message("⏹ Clicking stopped by user")
     
+    def jobs_active(self):
+        """Return True while a concurrent job from the Jobs window is running or paused"""
+        return self.job_scheduler is not None and self.job_scheduler.active()
+    
+    def release_stop_sources(self):
+        """Disarm the emergency stop sources once neither the main run nor a concurrent job is active"""
+        if not self.is_running and not self.jobs_active():
+            self.stop_monitor.stop()
+    
+    def open_jobs(self):
+        """Show the concurrent jobs window"""
+        if self.jobs_window is not None and self.jobs_window.window.winfo_exists():
+            self.jobs_window.window.lift()
+            return
+        from jobs_window import JobsWindow  # Loaded on first use, like the other dialogs
+        self.jobs_window = JobsWindow(self.root, self.ui, lambda: self.job_scheduler, self.add_concurrent_job)
+    
+    def add_concurrent_job(self, parent=None):
+        """Snapshot the points and settings into a job on the shared JobScheduler; return True if added.
+        
+        The job starts now, or at the next scheduled start time; schedule
+        repeats, run-for and stop-at only apply to the main run.
+        """
+        self.finish_startup()
+        if self.recorder.recording:
+            messagebox.showerror("Error", "Stop recording first", parent=parent)
+            return False
+        try:
+            job = self.build_job()
+            delay = 0.0
+            if self.schedule_mode.get() != "immediate":
+                upcoming = self.build_schedule().upcoming(datetime.now())
+                if not upcoming:
+                    raise ValueError("the schedule never fires")
+                delay = max(0.0, (upcoming[0] - datetime.now()).total_seconds())
+            backend = self.get_input_backend()
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid settings: {str(e)}", parent=parent)
+            return False
+        except Exception as e:
+            messagebox.showerror("Error", f"Input backend '{self.input_backend_name}' unavailable: {str(e)}",
+                                 parent=parent)
+            return False
+        
+        from job_scheduler import JobScheduler
+        if self.job_scheduler is None:
+            self.job_scheduler = JobScheduler(backend, self.stop_event, self.log_pipeline, metrics=self.metrics,
+                                              on_finish=lambda job_id, stats: self.ui.call(self.release_stop_sources))
+        elif not self.jobs_active():
+            self.job_scheduler.backend = backend  # The backend setting may have changed since
+        if not self.is_running and not self.jobs_active():
+            # Nothing is running, so a stop left over from the last run must not end the new job
+            self.emergency_stop = False
+            self.stop_event.clear()
+        name = f"{self.current_profile or 'points'} ({len(job.points)} pts)"
+        try:
+            self.job_scheduler.add(job, name=name, delay=delay)
+        except (ValueError, RuntimeError) as e:
+            messagebox.showerror("Error", f"Invalid settings: {str(e)}", parent=parent)
+            return False
+        self.stop_monitor.start()
+        self.ui.resume()
+        self.ui.restart("clock")
+        if delay:
+            self.log_message(f"⏰ Job '{name}' starts in {delay:.0f}s")
+        return True
+    
     def update_status(self, message, status_type="success"):
-        """Update status indicator and message"""
+        """Update status indicator and message (safe to call from any thread; the newest status wins)"""
+        self.ui.post("status", self.show_status, message, status_type)
+    
+    def show_status(self, message, status_type):
+        """Apply a status to the indicator and labels (main thread)"""
         color_map = {
             "success": self.colors['success'],
             "warning": self.colors['warning'], 
@@ -789,112 +1166,72 @@ class AutoClickerApp:
         self.status_indicator.config(fg=color)
         self.log_status.config(text=message)
     
-    def scheduled_click_worker(self):
-        """Worker thread for scheduled clicking"""
-        while self.is_running and self.scheduled_time:
-            current_time = datetime.now()
-            if current_time >= self.scheduled_time:
-                self.update_status("Running...", "primary")
-                self.log_message(f"Scheduled clicking started at {current_time.strftime('%H:%M:%S')}")
-                self.show_notification("Auto Clicker Started", "Scheduled clicking has begun!")
-                self.click_worker()
-                break
-            time.sleep(0.1)  # Check every 100ms for precision
-    
-    def click_worker(self):
-        """Worker thread for clicking with emergency stop checks"""
+    def scheduled_click_worker(self, job, schedule):
+        """Worker thread: sleep until each scheduled start, then run the job"""
+        total_clicks = 0
         try:
-            click_count = 0
-            max_clicks = None
-            
-            if self.click_mode.get() == "limited":
-                max_clicks = int(self.click_count_var.get())
-            
-            interval = float(self.interval_var.get())
-            point_delay = float(self.point_delay_var.get())
-            
-            self.log_message(f"Starting clicks - Mode: {self.click_mode.get()}, "
-                           f"Count: {self.click_count_var.get()}, Max: {max_clicks}, "
-                           f"Interval: {interval}s, Points: {len(self.click_points)}")
-            
-            while self.is_running and not self.emergency_stop:
-                # Check emergency stop before each cycle
-                if self.emergency_stop or not self.is_running:
-                    self.log_message(f"Stopping due to emergency_stop: {self.emergency_stop}, is_running: {self.is_running}")
+            while self.is_running:
+                run = schedule.next_run(datetime.now())
+                if run is None:
                     break
-                    
-                if max_clicks and click_count >= max_clicks:
-                    self.log_message(f"Stopping due to max_clicks reached: {click_count} >= {max_clicks}")
-                    break
-                
-                self.log_message(f"Starting click cycle {click_count + 1}, max_clicks: {max_clicks}")
+                start, duration = run
+                self.scheduled_time = start
+                self.update_status(f"Scheduled for {start.strftime('%a %H:%M')}", "warning")
                 
-                # Click each point
-                for point_index, (x, y) in enumerate(self.click_points):
-                    # Multiple emergency stop checks
-                    if self.emergency_stop or not self.is_running:
-                        break
-                    
-                    try:
-                        # Check emergency stop right before clicking
-                        if self.emergency_stop or not self.is_running:
-                            break
-                            
-                        pyautogui.click(x, y)
-                        click_count += 1
-                        self.log_message(f"Clicked point {point_index + 1}: ({x}, {y}) - Total clicks: {click_count}")
-                        
-                        if max_clicks and click_count >= max_clicks:
-                            break
-                        
-                        # Emergency stop check during delay
-                        if point_delay > 0 and point_index < len(self.click_points) - 1:
-                            # Split delay into smaller chunks for faster emergency response
-                            delay_chunks = max(1, int(point_delay * 10))  # 0.1s chunks
-                            for _ in range(delay_chunks):
-                                if self.emergency_stop or not self.is_running:
-                                    break
-                                time.sleep(point_delay / delay_chunks)
-                            
-                    except pyautogui.FailSafeException:
-                        self.emergency_stop = True
-                        self.log_message("🚨 PyAutoGUI Failsafe triggered - mouse moved to corner!")
-                        break
-                    except Exception as e:
-                        self.log_message(f"Error clicking point ({x}, {y}): {str(e)}")
+                # Blocks on the stop event (no polling) until the final approach
+                if not wait_until(start, self.stop_event):
+                    return
                 
-                if max_clicks and click_count >= max_clicks:
-                    self.log_message(f"Reached max clicks after point loop: {click_count} >= {max_clicks}")
+                self.update_status("Running...", "primary")
+                self.log_message(f"Scheduled clicking started at {datetime.now().strftime('%H:%M:%S')}")
+                self.show_notification("Auto Clicker Started", "Scheduled clicking has begun!")
+                run_job = ClickJob.from_dict(dict(job.to_dict(), duration=duration)) if duration else job
+                stats = self.run_engine(run_job)
+                total_clicks += stats.clicks
+                if stats.stop_reason != COMPLETED or not schedule.repeat:
                     break
-                
-                self.log_message(f"Completed click cycle, total clicks: {click_count}, waiting for interval: {interval}s")
-                
-                # Emergency stop check during main interval
-                if self.is_running and not self.emergency_stop and interval > 0:
-                    # Split interval into smaller chunks for faster emergency response
-                    interval_chunks = max(1, int(interval * 10))  # 0.1s chunks
-                    for _ in range(interval_chunks):
-                        if self.emergency_stop or not self.is_running:
-                            break
-                        time.sleep(interval / interval_chunks)
-            
-            # Finished (either completed or emergency stopped)
-            if self.emergency_stop:
-                self.root.after(0, self.force_stop_clicking)
-            else:
-                self.root.after(0, self.clicking_finished, click_count)
             
-        except pyautogui.FailSafeException:
-            self.emergency_stop = True
-            self.log_message("🚨 PyAutoGUI Failsafe triggered!")
-            self.root.after(0, self.force_stop_clicking)
+            self.finish_worker(total_clicks)
+        except Exception as e:
+            self.log_message(f"Error in click worker: {str(e)}")
+            self.ui.call(self.clicking_finished, total_clicks)
+    
+    def click_worker(self, job):
+        """Worker thread: run the job on the click engine"""
+        try:
+            stats = self.run_engine(job)
+            self.finish_worker(stats.clicks)
         except Exception as e:
             self.log_message(f"Error in click worker: {str(e)}")
-            self.root.after(0, self.clicking_finished, 0)
+            self.ui.call(self.clicking_finished, 0)
+    
+    def run_engine(self, job):
+        """Run one job on the click engine (worker thread)"""
+        if self.profiler is None:
+            engine = ClickEngine(self.input_backend, stop_event=self.stop_event, log=self.log_pipeline,
+                                 metrics=self.metrics)
+            stats = engine.run(job)
+        else:
+            engine = ClickEngine(self.input_backend, stop_event=self.stop_event, log=self.log_pipeline,
+                                 metrics=self.metrics, tracer=self.profiler.tracer)
+            stats = self.profiler.run(engine.run, job)
+            self.profiler.finish(self.log_message)
+        if stats.stop_reason == FAILSAFE:
+            self.emergency_stop = True
+        return stats
+    
+    def finish_worker(self, total_clicks):
+        """Hand the end of a run back to the main thread"""
+        # Finished (either completed or emergency stopped)
+        if self.emergency_stop:
+            self.ui.call(self.force_stop_clicking)
+        else:
+            self.ui.call(self.clicking_finished, total_clicks)
     
     def clicking_finished(self, total_clicks):
         """Called when clicking is finished"""
         self.is_running = False
+        self.release_stop_sources()
         self.start_button.config(state="normal")
         self.stop_button.config(state="disabled")
         self.update_status(f"Completed - {total_clicks} clicks", "success")
@@ -902,81 +1239,192 @@ class AutoClickerApp:
         self.show_notification("Auto Clicker Completed", f"Finished with {total_clicks} total clicks")
     
     def show_notification(self, title, message):
-        """Show system notification"""
-        try:
-            notification.notify(
-                title=title,
-                message=message,
-                app_name="Auto Clicker",
-                timeout=5
-            )
-        except Exception as e:
-            self.log_message(f"Notification error: {str(e)}")
+        """Show system notification (never blocks; repeats and floods are dropped)"""
+        self.notifier.notify(title, message)
     
     def log_message(self, message):
-        """Add message to log"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {message}\n"
-        
-        # Add to GUI log (if GUI is created)
-        try:
-            if hasattr(self, 'log_text') and self.log_text:
-                self.log_text.insert(tk.END, log_entry)
-                self.log_text.see(tk.END)
-        except:
-            pass  # GUI not ready yet
-        
-        # Add to file log
-        try:
-            self.logger.info(message)
-        except:
-            pass  # Logger not ready yet
+        """Add message to log (safe to call from any thread)"""
+        self.log_pipeline.message(message)
+    
+    def drain_log_queue(self):
+        """Move queued log lines into the GUI log on the main thread"""
+        self.log_view.append(self.log_pipeline.drain_gui())
+        if not self.log_pipeline.gui_queue.empty():
+            # More than one drain's worth: continue next frame
+            self.ui.post("log", self.drain_log_queue)
     
     def clear_log(self):
         """Clear the log display"""
-        self.log_text.delete(1.0, tk.END)
+        self.log_view.clear()
     
-    def save_settings(self):
-        """Save current settings to file"""
-        settings = {
-            "click_points": self.click_points,
+    def show_log_history(self):
+        """Open the full history viewer, paging from the log file on disk"""
+        LogHistoryWindow(self.root, LOG_FILE)
+    
+    def profile_settings(self):
+        """Return the job and schedule settings stored with a profile"""
+        return {
             "click_mode": self.click_mode.get(),
             "click_count": self.click_count_var.get(),
             "interval": self.interval_var.get(),
             "point_delay": self.point_delay_var.get(),
             "schedule_mode": self.schedule_mode.get(),
             "hour": self.hour_var.get(),
-            "minute": self.minute_var.get()
+            "minute": self.minute_var.get(),
+            "schedule_repeat": self.schedule_repeat_var.get(),
+            "schedule_value": self.schedule_value_var.get(),
+            "run_for": self.run_for_var.get(),
+            "stop_at": self.stop_at_var.get(),
+        }
+    
+    def apply_profile_settings(self, settings):
+        """Set the job and schedule fields (missing keys get their defaults)"""
+        self.click_mode.set(settings.get("click_mode", "unlimited"))
+        self.click_count_var.set(settings.get("click_count", "100"))
+        self.interval_var.set(settings.get("interval", "1.0"))
+        self.point_delay_var.set(settings.get("point_delay", "0.1"))
+        self.schedule_mode.set(settings.get("schedule_mode", "immediate"))
+        self.hour_var.set(settings.get("hour", "20"))
+        self.minute_var.set(settings.get("minute", "00"))
+        self.schedule_repeat_var.set(settings.get("schedule_repeat", "once"))
+        self.schedule_value_var.set(settings.get("schedule_value", ""))
+        self.run_for_var.set(settings.get("run_for", ""))
+        self.stop_at_var.set(settings.get("stop_at", ""))
+    
+    def save_settings(self):
+        """Save the current points and settings as a named profile"""
+        from profile_picker import ProfilePicker
+        self.finish_startup()
+        ProfilePicker(self.root, self.profile_store, self.save_profile, mode="save",
+                      current_name=self.current_profile or "default")
+    
+    def save_profile(self, name):
+        """Write a profile to the store (returns False to keep the picker open on error)"""
+        import sqlite3
+        try:
+            profile = self.profile_store.save(name, self.profile_settings(), self.click_points)
+        except (ValueError, sqlite3.Error) as e:
+            self.log_message(f"Error saving profile: {str(e)}")
+            messagebox.showerror("Error", f"Failed to save profile: {str(e)}")
+            return False
+        self.current_profile = profile.name
+        self.save_preferences()
+        self.log_message(f"💾 Profile '{profile.name}' saved ({profile.point_count} points)")
+    
+    def open_profiles(self):
+        """Pick a saved profile to load"""
+        from profile_picker import ProfilePicker
+        self.finish_startup()
+        ProfilePicker(self.root, self.profile_store, self.load_profile)
+    
+    def load_profile(self, name):
+        """Load a profile's settings and points into the GUI"""
+        import sqlite3
+        try:
+            profile = self.profile_store.get(name)
+            points = profile.points
+        except (KeyError, sqlite3.Error) as e:
+            self.log_message(f"Error loading profile '{name}': {str(e)}")
+            return False
+        self.apply_profile_settings(profile.settings)
+        self.click_points = points
+        self.current_profile = profile.name
+        self.points_view.set_points(points)
+        self.update_points_list()
+        self.save_preferences()
+        self.log_message(f"📂 Profile '{profile.name}' loaded ({profile.point_count} points)")
+    
+    def import_points(self):
+        """Append the points of a CSV, .npy or .acseq file"""
+        from tkinter import filedialog
+        from point_files import POINT_FILE_TYPES, load_points
+        path = filedialog.askopenfilename(title="Import Click Points", filetypes=POINT_FILE_TYPES)
+        if not path:
+            return
+        try:
+            points = load_points(path)
+        except (OSError, ValueError) as e:
+            self.log_message(f"Error importing points: {str(e)}")
+            messagebox.showerror("Error", f"Failed to import points: {str(e)}")
+            return
+        first = len(self.click_points)
+        self.click_points.extend(points.to_rows())
+        self.update_points_list()
+        if points:
+            self.points_view.see(first)
+        self.log_message(f"📥 Imported {len(points)} points from {os.path.basename(path)}")
+    
+    def export_points(self):
+        """Write the points to a CSV, .npy or .acseq file (format from the extension)"""
+        if not self.click_points:
+            messagebox.showerror("Error", "There are no click points to export")
+            return
+        from tkinter import filedialog
+        from point_files import POINT_FILE_TYPES, save_points
+        path = filedialog.asksaveasfilename(title="Export Click Points", filetypes=POINT_FILE_TYPES,
+                                            defaultextension=".csv")
+        if not path:
+            return
+        try:
+            count = save_points(self.click_points, path)
+        except (OSError, ValueError) as e:
+            self.log_message(f"Error exporting points: {str(e)}")
+            messagebox.showerror("Error", f"Failed to export points: {str(e)}")
+            return
+        self.log_message(f"📤 Exported {count} points to {os.path.basename(path)}")
+    
+    def save_preferences(self):
+        """Write application preferences (not profiles) to the settings file"""
+        from profile_store import PROFILE_KEYS, write_json_atomic
+        preferences = {
+            "log_max_lines": self.log_view.max_lines,
+            "input_backend": self.input_backend_name,
+            "last_profile": self.current_profile,
         }
         
+        # Keep hand-edited sections the GUI doesn't manage (e.g. "logging"),
+        # dropping job settings that now live in profiles
+        try:
+            with open(self.settings_file, 'r') as f:
+                existing = json.load(f)
+            preferences = {**{key: value for key, value in existing.items()
+                              if key not in PROFILE_KEYS and key != "click_points"}, **preferences}
+        except Exception:
+            pass
+        
         try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(settings, f, indent=2)
-            self.log_message("Settings saved successfully")
-            messagebox.showinfo("Success", "Settings saved successfully")
+            write_json_atomic(self.settings_file, preferences)
         except Exception as e:
             self.log_message(f"Error saving settings: {str(e)}")
-            messagebox.showerror("Error", f"Failed to save settings: {str(e)}")
     
-    def load_settings(self):
-        """Load settings from file"""
-        if not os.path.exists(self.settings_file):
+    def load_settings(self, settings):
+        """Apply the preferences read at startup and reopen the last profile"""
+        if self.settings_error:
+            self.log_message(f"Error loading settings: {self.settings_error}")
+            return
+        if not settings:
             return
         
         try:
-            with open(self.settings_file, 'r') as f:
-                settings = json.load(f)
+            self.log_view.set_max_lines(settings.get("log_max_lines", DEFAULT_MAX_LINES))
+            self.input_backend_name = settings.get("input_backend", "auto")
+            profile_name = settings.get("last_profile")
             
-            self.click_points = settings.get("click_points", [])
-            self.click_mode.set(settings.get("click_mode", "unlimited"))
-            self.click_count_var.set(settings.get("click_count", "1"))
-            self.interval_var.set(settings.get("interval", "1.0"))
-            self.point_delay_var.set(settings.get("point_delay", "0.1"))
-            self.schedule_mode.set(settings.get("schedule_mode", "immediate"))
-            self.hour_var.set(settings.get("hour", "20"))
-            self.minute_var.set(settings.get("minute", "00"))
+            # Settings files from before profiles carry the points and job
+            # settings themselves: import them once as a profile
+            if "click_points" in settings:
+                name = "default" if "default" not in self.profile_store else "imported"
+                profile = self.profile_store.import_settings_file(self.settings_file, name)
+                if profile:
+                    profile_name = profile.name
+                    self.log_message(f"Imported {self.settings_file} as profile '{profile.name}'")
+                else:
+                    self.apply_profile_settings(settings)
+                self.current_profile = profile_name
+                self.save_preferences()
             
-            self.update_points_listbox()
+            if profile_name in self.profile_store:
+                self.load_profile(profile_name)
             self.log_message("Settings loaded successfully")
             
         except Exception as e:
@@ -984,30 +1432,44 @@ class AutoClickerApp:
     
     def reset_settings(self):
         """Reset all settings to default"""
+        self.finish_startup()
         if messagebox.askyesno("Confirm Reset", "Are you sure you want to reset all settings?"):
             self.click_points.clear()
-            self.click_mode.set("unlimited")
-            self.click_count_var.set("100")
-            self.interval_var.set("1.0")
-            self.point_delay_var.set("0.1")
-            self.schedule_mode.set("immediate")
-            self.hour_var.set("20")
-            self.minute_var.set("00")
+            self.apply_profile_settings({})
+            self.log_view.set_max_lines(DEFAULT_MAX_LINES)
+            self.current_profile = None
             
-            self.update_points_listbox()
+            self.points_view.set_points(self.click_points)
+            self.update_points_list()
             self.log_message("Settings reset to default")
 
+    def close_services(self):
+        """Stop recording, notifications and the metrics endpoint, close the profile store and flush the log"""
+        if self.recorder.recording:
+            self.recorder.stop()
+        self.ui.close()
+        self.notifier.close()
+        if self.metrics_server:
+            self.metrics_server.close()
+        if self.job_scheduler is not None:
+            self.job_scheduler.close()
+        if self.profile_store is not None:
+            self.profile_store.close()
+        self.log_pipeline.close()
+
 def main():
     root = tk.Tk()
     app = AutoClickerApp(root)
     
     # Handle window close event
     def on_closing():
-        if app.is_running:
+        if app.is_running or app.jobs_active():
             if messagebox.askokcancel("Quit", "Auto clicker is running. Do you want to stop and quit?"):
                 app.stop_clicking()
+                app.close_services()
                 root.destroy()
         else:
+            app.close_services()
             root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
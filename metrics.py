@@ -0,0 +1,325 @@
+import json
+import threading
+import time
+import weakref
+
+DEFAULT_METRICS_PORT = 9464
+
+# Histogram precision: 2**SUB_BITS linear sub-buckets per power of two (~3%)
+SUB_BITS = 5
+SUB_BUCKETS = 1 << SUB_BITS
+# Largest value tracked exactly enough (~18 minutes in ns); above it values clamp
+MAX_VALUE_BITS = 40
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class PerThread:
+    """Base for lock-free metrics: each thread updates only its own cell.
+
+    The lock is only taken the first time a thread writes and by readers,
+    which combine all cells, so a value may lag a concurrent update
+    slightly. Cells of finished threads are folded into one retired cell,
+    so a worker thread per run doesn't make the metric grow.
+    """
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.local = threading.local()
+        self.cells = []  # (weakref to the owning thread, cell)
+        self.retired = self.new_cell()
+        self.lock = threading.Lock()
+
+    def new_cell(self):
+        raise NotImplementedError
+
+    def merge(self, into, cell):
+        raise NotImplementedError
+
+    def cell(self):
+        """Return this thread's cell (hot loops may hold on to it)"""
+        try:
+            return self.local.cell
+        except AttributeError:
+            cell = self.new_cell()
+            with self.lock:
+                self._retire()
+                self.cells.append((weakref.ref(threading.current_thread()), cell))
+            self.local.cell = cell
+            return cell
+
+    def _retire(self):
+        # A finished thread never writes its cell again, so it can be merged
+        alive = []
+        for owner, cell in self.cells:
+            thread = owner()
+            if thread is not None and thread.is_alive():
+                alive.append((owner, cell))
+            else:
+                self.merge(self.retired, cell)
+        self.cells = alive
+
+    def all_cells(self):
+        """Return the retired cell and the cells of running threads"""
+        with self.lock:
+            self._retire()
+            return [self.retired] + [cell for _, cell in self.cells]
+
+
+class Counter(PerThread):
+    """Counter (or gauge, when decremented) summed over per-thread [value] cells"""
+
+    def __init__(self, name, help_text, kind="counter"):
+        super().__init__(name, help_text)
+        self.kind = kind
+
+    def new_cell(self):
+        return [0]
+
+    def merge(self, into, cell):
+        into[0] += cell[0]
+
+    def inc(self, amount=1):
+        self.cell()[0] += amount
+
+    def value(self):
+        return sum(cell[0] for cell in self.all_cells())
+
+
+class HistogramCell:
+    """HDR-style log-linear histogram of non-negative integers (nanoseconds).
+
+    Values are bucketed by power of two with SUB_BUCKETS linear steps in
+    each, so recording is a few integer operations into a fixed array and
+    percentiles keep ~3% relative precision from 1 ns to minutes.
+    """
+
+    def __init__(self):
+        self.size = (MAX_VALUE_BITS - SUB_BITS + 1) * SUB_BUCKETS
+        self.counts = [0] * self.size
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        if value < 0:
+            value = 0
+        shift = value.bit_length() - SUB_BITS - 1
+        if shift <= 0:
+            index = value
+        else:
+            index = shift * SUB_BUCKETS + (value >> shift)
+            if index >= self.size:
+                index = self.size - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def add(self, other):
+        """Add another cell's values to this one"""
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+
+def bucket_value(index):
+    """Return the midpoint of a histogram bucket"""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return ((index - shift * SUB_BUCKETS) << shift) + (1 << shift) // 2
+
+
+class Histogram(PerThread):
+    """Per-thread HistogramCells merged on read"""
+
+    def new_cell(self):
+        return HistogramCell()
+
+    def merge(self, into, cell):
+        into.add(cell)
+
+    def record(self, value):
+        self.cell().record(value)
+
+    def snapshot(self):
+        """Return (merged counts, count, total, max)"""
+        counts = None
+        count = total = largest = 0
+        for cell in self.all_cells():
+            cell_counts = list(cell.counts)
+            counts = cell_counts if counts is None else [a + b for a, b in zip(counts, cell_counts)]
+            count += cell.count
+            total += cell.total
+            largest = max(largest, cell.max)
+        return counts or [], count, total, largest
+
+    def quantiles(self, qs=QUANTILES):
+        """Return {q: value} plus count, sum and max (all in recorded units)"""
+        counts, count, total, largest = self.snapshot()
+        result = {"count": count, "sum": total, "max": largest}
+        seen = sum(counts)
+        for q in qs:
+            target = q * seen
+            cumulative = 0
+            value = 0
+            for index, bucket_count in enumerate(counts):
+                cumulative += bucket_count
+                if bucket_count and cumulative >= target:
+                    value = min(bucket_value(index), largest)
+                    break
+            result[q] = value
+        return result
+
+
+class Metrics:
+    """Process-wide click metrics, shared by the engine, the GUI and the exporter"""
+
+    def __init__(self):
+        self.clicks = Counter("autoclicker_clicks_total", "Clicks sent to the input backend")
+        self.errors = Counter("autoclicker_click_errors_total", "Clicks that raised an error")
+        self.runs = Counter("autoclicker_runs_total", "Jobs started")
+        self.active_jobs = Counter("autoclicker_active_jobs", "Jobs currently running", kind="gauge")
+        self.click_latency = Histogram("autoclicker_click_latency_seconds",
+                                       "Time spent in the input backend per click")
+        self.interval_error = Histogram("autoclicker_interval_error_seconds",
+                                        "How late each click (or burst) fired after its deadline")
+        self.started = time.time()
+
+    def instrument(self, click):
+        """Wrap backend.click to time it and count successful clicks.
+
+        The wrapper writes to the calling thread's cells, so create it on
+        the thread that will click.
+        """
+        clock = time.perf_counter_ns
+        record = self.click_latency.cell().record
+        clicks = self.clicks.cell()
+
+        def timed_click(x, y, button="left"):
+            started = clock()
+            click(x, y, button)
+            record(clock() - started)
+            clicks[0] += 1
+
+        return timed_click
+
+    def counters(self):
+        return [self.clicks, self.errors, self.runs, self.active_jobs]
+
+    def histograms(self):
+        return [self.click_latency, self.interval_error]
+
+    def snapshot(self):
+        """Return all metrics as a JSON-friendly dict (latencies in ms)"""
+        data = {"uptime_seconds": time.time() - self.started}
+        for counter in self.counters():
+            data[counter.name.replace("autoclicker_", "")] = counter.value()
+        for histogram in self.histograms():
+            summary = histogram.quantiles()
+            data[histogram.name.replace("autoclicker_", "").replace("_seconds", "")] = {
+                "count": summary["count"],
+                "mean_ms": summary["sum"] / summary["count"] / 1e6 if summary["count"] else 0.0,
+                "p50_ms": summary[0.5] / 1e6,
+                "p90_ms": summary[0.9] / 1e6,
+                "p99_ms": summary[0.99] / 1e6,
+                "p999_ms": summary[0.999] / 1e6,
+                "max_ms": summary["max"] / 1e6,
+            }
+        return data
+
+    def prometheus(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        lines = []
+        for counter in self.counters():
+            lines += [f"# HELP {counter.name} {counter.help_text}",
+                      f"# TYPE {counter.name} {counter.kind}",
+                      f"{counter.name} {counter.value()}"]
+        for histogram in self.histograms():
+            summary = histogram.quantiles()
+            lines += [f"# HELP {histogram.name} {histogram.help_text}",
+                      f"# TYPE {histogram.name} summary"]
+            lines += [f'{histogram.name}{{quantile="{q}"}} {summary[q] / 1e9:.9f}' for q in QUANTILES]
+            lines += [f"{histogram.name}_sum {summary['sum'] / 1e9:.9f}",
+                      f"{histogram.name}_count {summary['count']}"]
+        lines += ["# HELP autoclicker_uptime_seconds Seconds since the metrics were created",
+                  "# TYPE autoclicker_uptime_seconds gauge",
+                  f"autoclicker_uptime_seconds {time.time() - self.started:.3f}"]
+        return "\n".join(lines) + "\n"
+
+
+class RateMeter:
+    """Clicks/s between successive polls of a counter (for the live panel)"""
+
+    def __init__(self, counter, clock=time.monotonic):
+        self.counter = counter
+        self.clock = clock
+        self.last = (clock(), counter.value())
+
+    def poll(self):
+        now, value = self.clock(), self.counter.value()
+        last_time, last_value = self.last
+        self.last = (now, value)
+        return (value - last_value) / (now - last_time) if now > last_time else 0.0
+
+
+def metrics_port(settings):
+    """Return the settings' "metrics_port" (None when absent, invalid or 0 = disabled)"""
+    try:
+        return int(settings.get("metrics_port") or 0) or None
+    except (TypeError, ValueError):
+        return None
+
+
+class MetricsServer:
+    """Serves /metrics (Prometheus text) and /metrics.json on localhost"""
+
+    def __init__(self, metrics, port=DEFAULT_METRICS_PORT, host="127.0.0.1"):
+        # http.server (with email/http.client) is only imported when the endpoint is enabled
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        self.metrics = metrics
+        handler = type("MetricsHandler", (MetricsHandler, BaseHTTPRequestHandler), {"metrics": metrics})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MetricsHandler:
+    """Request handling for MetricsServer (mixed into BaseHTTPRequestHandler)"""
+
+    metrics = None
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = self.metrics.prometheus().encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metrics.json":
+            body = json.dumps(self.metrics.snapshot(), indent=2).encode()
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep scrapes out of stderr
@@ -0,0 +1,206 @@
+"""Desktop notifications that never hold up the caller.
+
+Notifier.notify() only checks the rate limit and puts the notification on
+a small bounded queue; a background thread hands it to the backend. A
+slow or hung notification daemon therefore delays other notifications,
+never the click start or an emergency stop. Repeats of the same
+notification within DEDUP_WINDOW seconds are dropped, at most
+RATE_BURST notifications go out back to back (then one every
+RATE_INTERVAL seconds), and when the queue is full new ones are dropped.
+
+Backends: plyer (cross-platform), dbus (freedesktop notifications
+through gdbus, no Python packages needed) and log (the Activity Log
+only). "auto" picks the first that is available.
+"""
+import queue
+import sys
+import threading
+import time
+
+APP_NAME = "Auto Clicker"
+NOTIFIER_NAMES = ("auto", "plyer", "dbus", "log")
+
+NOTIFY_TIMEOUT = 5  # Seconds a notification stays on screen
+NOTIFY_QUEUE = 8  # Notifications waiting for the backend before new ones are dropped
+DEDUP_WINDOW = 10.0  # Seconds in which an identical notification is dropped
+RATE_BURST = 3  # Notifications that may go out back to back
+RATE_INTERVAL = 5.0  # Seconds per notification after a burst
+SEND_TIMEOUT = 5.0  # Seconds a D-Bus call may take
+
+_STOP = object()
+
+
+class PlyerBackend:
+    """Notifications through plyer"""
+
+    name = "plyer"
+
+    def __init__(self):
+        try:
+            from plyer import notification
+        except ImportError:
+            raise RuntimeError("Notifications need the plyer package (pip install plyer)")
+        self.notification = notification
+
+    def send(self, title, message):
+        self.notification.notify(title=title, message=message, app_name=APP_NAME, timeout=NOTIFY_TIMEOUT)
+
+
+class DbusBackend:
+    """freedesktop.org notifications on the session bus, sent with gdbus"""
+
+    name = "dbus"
+
+    def __init__(self):
+        import shutil
+        self.gdbus = shutil.which("gdbus")
+        if self.gdbus is None:
+            raise RuntimeError("D-Bus notifications need gdbus (GLib)")
+
+    def send(self, title, message):
+        # Notify(app_name, replaces_id, icon, summary, body, actions, hints, expire_timeout)
+        import subprocess
+        arguments = [_gvariant_string(APP_NAME), "uint32 0", "''", _gvariant_string(title),
+                     _gvariant_string(message), "@as []", "@a{sv} {}", f"int32 {NOTIFY_TIMEOUT * 1000}"]
+        try:
+            subprocess.run([self.gdbus, "call", "--session", "--dest", "org.freedesktop.Notifications",
+                            "--object-path", "/org/freedesktop/Notifications",
+                            "--method", "org.freedesktop.Notifications.Notify", *arguments],
+                           check=True, capture_output=True, timeout=SEND_TIMEOUT)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(e.stderr.decode(errors="replace").strip() or f"gdbus exited with {e.returncode}")
+
+
+def _gvariant_string(text):
+    # gdbus parses its arguments as GVariant text; quote so any text stays a string
+    return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+class LogBackend:
+    """Writes notifications to the log instead of the desktop"""
+
+    name = "log"
+
+    def __init__(self, log=None):
+        self.log = log or (lambda text: None)
+
+    def send(self, title, message):
+        self.log(f"🔔 {title}: {message}")
+
+
+def create_notifier_backend(name="auto", log=None):
+    """Return a notification backend by name ("auto": plyer, then D-Bus on Linux, then the log)"""
+    if name not in NOTIFIER_NAMES:
+        raise ValueError(f"Unknown notifier {name!r} (choose from {', '.join(NOTIFIER_NAMES)})")
+    if name == "plyer":
+        return PlyerBackend()
+    if name == "dbus":
+        return DbusBackend()
+    if name == "log":
+        return LogBackend(log)
+    candidates = [PlyerBackend] + ([DbusBackend] if sys.platform.startswith("linux") else [])
+    for backend in candidates:
+        try:
+            return backend()
+        except RuntimeError:
+            pass
+    return LogBackend(log)
+
+
+def notifier_name(settings):
+    """Return the settings' "notifier" ("auto" when absent)"""
+    return str(settings.get("notifier", "auto"))
+
+
+class Notifier:
+    """Sends notifications on a background thread with deduplication and rate limiting.
+
+    The backend is created on the worker thread the first time something
+    is sent, so importing plyer doesn't slow down startup; if it can't be
+    created the notifications go to the log instead. log(text) receives
+    backend errors.
+    """
+
+    def __init__(self, backend="auto", log=None, size=NOTIFY_QUEUE, dedup=DEDUP_WINDOW,
+                 burst=RATE_BURST, interval=RATE_INTERVAL, clock=time.monotonic):
+        self.backend = backend
+        self.log = log or (lambda text: None)
+        self.queue = queue.Queue(maxsize=max(1, int(size)))
+        self.dedup = dedup
+        self.burst = burst
+        self.interval = interval
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.tokens = float(burst)
+        self.refilled = clock()
+        self.recent = {}  # (title, message): when it was last accepted
+        self.sent = 0
+        self.dropped = 0
+        self.thread = None
+        self.closed = False
+
+    def notify(self, title, message):
+        """Queue a notification; return False if it was dropped. Never blocks."""
+        key = (title, message)
+        with self.lock:
+            if self.closed:
+                return False
+            now = self.clock()
+            last = self.recent.get(key)
+            if last is not None and now - last < self.dedup:
+                self.dropped += 1
+                return False
+            if self.interval > 0:
+                self.tokens = min(self.burst, self.tokens + (now - self.refilled) / self.interval)
+            self.refilled = now
+            if self.tokens < 1:
+                self.dropped += 1
+                return False
+            try:
+                self.queue.put_nowait(key)
+            except queue.Full:
+                self.dropped += 1
+                return False
+            self.tokens -= 1
+            self.recent = {item: when for item, when in self.recent.items() if now - when < self.dedup}
+            self.recent[key] = now
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._worker, name="notifier", daemon=True)
+                self.thread.start()
+        return True
+
+    def _open_backend(self):
+        if not isinstance(self.backend, str):
+            return self.backend
+        try:
+            return create_notifier_backend(self.backend, self.log)
+        except (RuntimeError, ValueError) as e:
+            self.log(f"Notifications unavailable ({str(e)}) - writing them to the log")
+            return LogBackend(self.log)
+
+    def _worker(self):
+        backend = self._open_backend()
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            try:
+                backend.send(*item)
+                self.sent += 1
+            except Exception as e:
+                self.log(f"Notification error: {str(e)}")
+
+    def close(self, timeout=1.0):
+        """Stop the worker, waiting at most timeout seconds for queued notifications"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            thread = self.thread
+        if thread is None:
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
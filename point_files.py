@@ -0,0 +1,463 @@
+"""Bulk import/export of click points: CSV, NumPy .npy and .acseq sequences.
+
+CSV and .npy files are read into a PointStore. An .acseq file is a flat
+binary sequence that PointSequence memory-maps, so jobs can stream
+millions of points through the click engine without loading them.
+NumPy itself is not needed for .npy files.
+"""
+import csv
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from input_backends import BUTTONS
+from point_store import DEFAULT_DELAY, PointStore, check_point, to_little_endian
+
+NPY_EXTENSION = ".npy"
+SEQUENCE_EXTENSION = ".acseq"
+POINT_FILE_TYPES = [("Point files", "*.csv *.npy *.acseq"), ("CSV", "*.csv"), ("NumPy array", "*.npy"),
+                    ("Click sequence", "*.acseq"), ("All files", "*.*")]
+
+CSV_COLUMNS = ("x", "y", "delay", "button", "action")
+
+# .npy: magic, version 1.0 header; dtypes readable without NumPy
+NPY_MAGIC = b"\x93NUMPY"
+NPY_TYPECODES = {"i2": "h", "u2": "H", "i4": "i", "u4": "I", "i8": "q", "f4": "f", "f8": "d"}
+
+# .acseq: 16-byte header (magic, version, flags, record count), then one
+# little-endian record per point: x, y int32 [, delay float64][, button uint8]
+SEQUENCE_MAGIC = b"ACSEQ\x00"
+SEQUENCE_VERSION = 1
+SEQUENCE_HEADER = struct.Struct("<6sBBQ")
+HAS_DELAYS = 1
+HAS_BUTTONS = 2
+WRITE_CHUNK = 65536  # Records packed per write
+
+
+def _number(text, line):
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"line {line}: not a number: {text!r}")
+
+
+def _coordinate(value, line):
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"line {line}: coordinates must be whole numbers: {value!r}")
+        value = int(value)
+    return value
+
+
+def iter_csv(path):
+    """Yield (x, y, delay, button, action) rows from a CSV file.
+
+    The header row is optional; without one the columns are x, y, delay,
+    button, action (all but x and y may be left out or blank). Actions are
+    JSON, as in job files.
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        columns = None
+        for line, row in enumerate(reader, 1):
+            cells = [cell.strip() for cell in row]
+            if not cells or not any(cells) or cells[0].startswith("#"):
+                continue
+            if columns is None:
+                columns = CSV_COLUMNS
+                try:
+                    float(cells[0])
+                except ValueError:
+                    columns = tuple(cell.lower() for cell in cells)
+                    if "x" not in columns or "y" not in columns:
+                        raise ValueError(f"{path}: the header needs x and y columns")
+                    continue
+            if len(cells) > len(columns):
+                raise ValueError(f"line {line}: {len(cells)} values for {len(columns)} columns")
+            values = dict(zip(columns, cells))
+            if not values.get("x") or not values.get("y"):
+                raise ValueError(f"line {line}: missing x or y")
+            x = _coordinate(_number(values["x"], line), line)
+            y = _coordinate(_number(values["y"], line), line)
+            delay = _number(values["delay"], line) if values.get("delay") else None
+            button = values.get("button") or "left"
+            try:
+                action = json.loads(values["action"]) if values.get("action") else None
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {line}: invalid action JSON: {e}")
+            yield x, y, delay, button, action
+
+
+def read_csv(path):
+    """Return the points of a CSV file as a PointStore"""
+    store = PointStore()
+    for line, row in enumerate(iter_csv(path), 1):
+        try:
+            store.append(*row)
+        except ValueError as e:
+            raise ValueError(f"{path}, point {line}: {e}")
+    return store
+
+
+def write_csv(points, path):
+    """Write a PointStore as CSV with only the columns it uses"""
+    rows = points.to_rows()
+    width = max((len(row) for row in rows), default=2)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS[:width])
+        for row in rows:
+            if width > 2:
+                row[2] = "" if row[2] is None else repr(row[2])
+            if width > 4:
+                row[4] = "" if row[4] is None else json.dumps(row[4], separators=(",", ":"))
+            writer.writerow(row)
+
+
+def _npy_header(f, path):
+    if f.read(6) != NPY_MAGIC:
+        raise ValueError(f"{path} is not a .npy file")
+    major = f.read(2)[0]
+    size_format = "<H" if major == 1 else "<I"
+    (size,) = struct.unpack(size_format, f.read(struct.calcsize(size_format)))
+    import ast  # Only .npy headers need it; it is slow to import
+    header = ast.literal_eval(f.read(size).decode("latin1"))
+    descr, shape = header["descr"], tuple(header["shape"])
+    if not isinstance(descr, str) or descr[0] not in "<>|=" or descr[1:] not in NPY_TYPECODES:
+        raise ValueError(f"{path}: unsupported dtype {descr!r} (use int32, int64 or float64)")
+    if len(shape) != 2 or shape[1] not in (2, 3):
+        raise ValueError(f"{path}: expected an (n, 2) or (n, 3) array, got shape {shape}")
+    big_endian = descr[0] == ">" or (descr[0] == "=" and sys.byteorder == "big")
+    return NPY_TYPECODES[descr[1:]], big_endian, header["fortran_order"], shape
+
+
+def read_npy(path):
+    """Return the points of an (n, 2) x, y or (n, 3) x, y, delay .npy array as a PointStore.
+
+    Delays are seconds; negative or NaN delays use the job's. Any integer
+    or float dtype NumPy writes by default is accepted.
+    """
+    with open(path, "rb") as f:
+        typecode, big_endian, fortran_order, (count, width) = _npy_header(f, path)
+        flat = array(typecode)
+        flat.frombytes(f.read(count * width * flat.itemsize))
+    if len(flat) != count * width:
+        raise ValueError(f"{path} is truncated")
+    if big_endian != (sys.byteorder == "big"):
+        flat.byteswap()
+    if fortran_order:
+        columns = [flat[column * count:(column + 1) * count] for column in range(width)]
+    else:
+        columns = [flat[column::width] for column in range(width)]
+    if width == 2 and typecode == "i":
+        store = PointStore()
+        store.xs, store.ys = columns
+        return store
+    store = PointStore()
+    delays = columns[2] if width == 3 else None
+    for index in range(count):
+        x = _coordinate(columns[0][index], index + 1)
+        y = _coordinate(columns[1][index], index + 1)
+        delay = delays[index] if delays is not None else None
+        if delay is not None and (math.isnan(delay) or delay < 0):
+            delay = None
+        store.append(int(x), int(y), delay)
+    return store
+
+
+def write_npy(points, path):
+    """Write a PointStore as an int32 (n, 2) array, or float64 (n, 3) with delays.
+
+    Buttons and actions have no place in a plain array, so points that
+    have them raise ValueError instead of being silently dropped.
+    """
+    if (points.buttons is not None and any(points.buttons)) or points.actions:
+        raise ValueError(".npy files only hold coordinates and delays; use CSV to keep buttons and actions")
+    if points.delays is None:
+        descr, width, data = "<i4", 2, points.to_bytes()
+    else:
+        flat = array("d", bytes(24 * len(points)))
+        flat[0::3] = array("d", points.xs)
+        flat[1::3] = array("d", points.ys)
+        flat[2::3] = points.delays
+        descr, width, data = "<f8", 3, to_little_endian(flat)
+    header = repr({"descr": descr, "fortran_order": False, "shape": (len(points), width)})
+    # Pad so the data starts on a 64-byte boundary, as NumPy does
+    padding = 64 - (len(NPY_MAGIC) + 2 + 2 + len(header) + 1) % 64
+    header = (header + " " * (padding % 64) + "\n").encode("latin1")
+    with open(path, "wb") as f:
+        f.write(NPY_MAGIC + b"\x01\x00" + struct.pack("<H", len(header)) + header)
+        f.write(data)
+
+
+def record_format(flags):
+    return "<ii" + ("d" if flags & HAS_DELAYS else "") + ("B" if flags & HAS_BUTTONS else "")
+
+
+def write_sequence(rows, path, delays=False, buttons=False):
+    """Write points to an .acseq file, streaming; return the number written.
+
+    rows is a PointStore or any iterable (e.g. a generator) of
+    (x, y[, delay[, button]]) rows; pass delays/buttons=True to keep those
+    columns for an iterable (a PointStore's own columns are detected).
+    Actions are not supported. The file is written under a temporary
+    name and renamed into place.
+    """
+    if isinstance(rows, PointStore):
+        if rows.actions:
+            raise ValueError(".acseq files cannot hold actions; use CSV or a profile to keep them")
+        delays = rows.has_custom_delays()
+        buttons = rows.buttons is not None and any(rows.buttons)
+        store = rows
+        rows = store.to_rows() if delays or buttons else None
+    else:
+        store = None
+    flags = (HAS_DELAYS if delays else 0) | (HAS_BUTTONS if buttons else 0)
+    record = struct.Struct(record_format(flags))
+    directory = os.path.dirname(os.path.abspath(path))
+    import tempfile
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=SEQUENCE_EXTENSION, dir=directory)
+    count = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(SEQUENCE_HEADER.pack(SEQUENCE_MAGIC, SEQUENCE_VERSION, flags, 0))
+            if rows is None:
+                # Plain points: the packed x, y pairs are the records
+                f.write(store.to_bytes())
+                count = len(store)
+            else:
+                chunk = []
+                for row in rows:
+                    if len(row) > 4 and row[4]:
+                        raise ValueError(".acseq files cannot hold actions; use CSV or a profile to keep them")
+                    x, y = row[0], row[1]
+                    check_point(x, y)
+                    values = [x, y]
+                    if delays:
+                        delay = row[2] if len(row) > 2 else None
+                        if delay is not None and delay < 0:
+                            raise ValueError("Point delays must be non-negative")
+                        values.append(DEFAULT_DELAY if delay is None else float(delay))
+                    if buttons:
+                        button = row[3] if len(row) > 3 else "left"
+                        if button not in BUTTONS:
+                            raise ValueError(f"Unknown mouse button {button!r}")
+                        values.append(BUTTONS.index(button))
+                    chunk.append(record.pack(*values))
+                    count += 1
+                    if len(chunk) >= WRITE_CHUNK:
+                        f.write(b"".join(chunk))
+                        chunk = []
+                f.write(b"".join(chunk))
+            f.seek(0)
+            f.write(SEQUENCE_HEADER.pack(SEQUENCE_MAGIC, SEQUENCE_VERSION, flags, count))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return count
+
+
+class PointSequence:
+    """Read-only points memory-mapped from an .acseq file.
+
+    Offers the parts of the PointStore interface the click engine and job
+    scheduler use (len, indexing, iteration, delays_before, button_names,
+    compile_actions), reading records from the map on demand: the OS
+    pages the file in as the job reaches it, so a sequence of millions of
+    points costs a few pages of memory, not a copy of the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.actions = {}
+        with open(path, "rb") as f:
+            header = f.read(SEQUENCE_HEADER.size)
+            if len(header) < SEQUENCE_HEADER.size:
+                raise ValueError(f"{path} is not a click sequence file")
+            magic, version, self.flags, self.count = SEQUENCE_HEADER.unpack(header)
+            if magic != SEQUENCE_MAGIC:
+                raise ValueError(f"{path} is not a click sequence file")
+            if version != SEQUENCE_VERSION:
+                raise ValueError(f"{path}: unsupported sequence version {version}")
+            self.record = struct.Struct(record_format(self.flags))
+            size = SEQUENCE_HEADER.size + self.count * self.record.size
+            if os.fstat(f.fileno()).st_size < size:
+                raise ValueError(f"{path} is truncated")
+            self.map = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) if self.count else None
+
+    def snapshot(self):
+        """The file is read-only, so a job can share it as it is"""
+        return self
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    def __len__(self):
+        return self.count
+
+    def records(self):
+        """Iterate over the raw (x, y[, delay][, button]) records"""
+        if not self.count:
+            return iter(())
+        view = memoryview(self.map)[SEQUENCE_HEADER.size:]
+        return self.record.iter_unpack(view)
+
+    def _record(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("point index out of range")
+        return self.record.unpack_from(self.map, SEQUENCE_HEADER.size + index * self.record.size)
+
+    def __getitem__(self, index):
+        return self._record(index)[:2]
+
+    def __iter__(self):
+        if self.flags:
+            return (record[:2] for record in self.records())
+        return self.records()
+
+    def delay(self, index):
+        if not self.flags & HAS_DELAYS:
+            return None
+        delay = self._record(index)[2]
+        return None if delay == DEFAULT_DELAY else delay
+
+    def button(self, index):
+        if not self.flags & HAS_BUTTONS:
+            return "left"
+        return BUTTONS[self._record(index)[-1]]
+
+    def action(self, index):
+        return None
+
+    def has_custom_delays(self):
+        return bool(self.flags & HAS_DELAYS)
+
+    def delays_before(self, interval, point_delay):
+        """Return the waits before each point as a lazy read-only sequence"""
+        return MappedWaits(self, float(interval), float(point_delay))
+
+    def button_names(self):
+        """Return each point's button name as a lazy read-only sequence"""
+        if not self.flags & HAS_BUTTONS:
+            return ConstantColumn("left", self.count)
+        return MappedButtons(self)
+
+    def needs_screen(self):
+        return False
+
+    def compile_actions(self, backend, capture=None):
+        return None
+
+    def to_store(self):
+        """Load the whole sequence into a PointStore"""
+        if not self.flags:
+            return PointStore.from_bytes(self.map[SEQUENCE_HEADER.size:] if self.count else b"")
+        store = PointStore()
+        for index, record in enumerate(self.records()):
+            store.append(record[0], record[1], self.delay(index), self.button(index))
+        return store
+
+
+class ConstantColumn:
+    """A read-only column with the same value for every point"""
+
+    def __init__(self, value, count):
+        self.value = value
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        return self.value
+
+    def __iter__(self):
+        return (self.value for _ in range(self.count))
+
+
+class MappedWaits:
+    """PointSequence.delays_before(): the interval before the first point, then
+    the point delay, or the point's own delay where the file has one"""
+
+    def __init__(self, sequence, interval, point_delay):
+        self.sequence = sequence
+        self.interval = interval
+        self.point_delay = point_delay
+
+    def __len__(self):
+        return len(self.sequence)
+
+    def __getitem__(self, index):
+        delay = self.sequence.delay(index)
+        if delay is not None:
+            return delay
+        return self.interval if index % len(self.sequence) == 0 else self.point_delay
+
+    def __iter__(self):
+        if not self.sequence.has_custom_delays():
+            return (self.interval if index == 0 else self.point_delay for index in range(len(self.sequence)))
+        return (record[2] if record[2] != DEFAULT_DELAY else self.interval if index == 0 else self.point_delay
+                for index, record in enumerate(self.sequence.records()))
+
+
+class MappedButtons:
+    """PointSequence.button_names() for files with a button column"""
+
+    def __init__(self, sequence):
+        self.sequence = sequence
+
+    def __len__(self):
+        return len(self.sequence)
+
+    def __getitem__(self, index):
+        return self.sequence.button(index)
+
+    def __iter__(self):
+        return (BUTTONS[record[-1]] for record in self.sequence.records())
+
+
+def load_points(path):
+    """Read a CSV, .npy or .acseq file into a PointStore"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == NPY_EXTENSION:
+        return read_npy(path)
+    if extension == SEQUENCE_EXTENSION:
+        sequence = PointSequence(path)
+        try:
+            return sequence.to_store()
+        finally:
+            sequence.close()
+    return read_csv(path)
+
+
+def open_points(path):
+    """Return points for a job: a memory-mapped PointSequence for .acseq files, else a PointStore"""
+    if os.path.splitext(path)[1].lower() == SEQUENCE_EXTENSION:
+        return PointSequence(path)
+    return load_points(path)
+
+
+def save_points(points, path):
+    """Write a PointStore to a CSV, .npy or .acseq file (by extension); return the count"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == NPY_EXTENSION:
+        write_npy(points, path)
+    elif extension == SEQUENCE_EXTENSION:
+        write_sequence(points, path)
+    else:
+        write_csv(points, path)
+    return len(points)
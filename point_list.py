@@ -0,0 +1,303 @@
+import re
+import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import ttk
+
+ROW_PADDING = 2  # Pixels between rows
+WHEEL_ROWS = 3  # Rows scrolled per mouse wheel notch
+AUTOSCROLL_MS = 60  # Scroll step while dragging above/below the list
+
+
+class PointListView:
+    """Virtualized list of the points in a PointStore, drawn on a Canvas.
+
+    Only as many rows as fit in the window exist as canvas items; scrolling
+    relabels them, so drawing, scrolling and selecting cost O(visible rows)
+    however many points there are. Supports Ctrl/Shift multi-select, Ctrl+A,
+    keyboard navigation, jumping to a point number or coordinates, and
+    dragging the selection to a new position. Edits go through
+    delete_selected()/move_selected() and are reported to on_change;
+    double-clicking a row calls on_activate.
+    """
+
+    def __init__(self, parent, points, height=5, font=('Consolas', 9), colors=None,
+                 on_change=None, on_delete=None, on_activate=None):
+        self.points = points
+        self.on_change = on_change
+        self.on_delete = on_delete
+        self.on_activate = on_activate
+        colors = colors or {}
+        self.select_color = colors.get('primary', '#2563eb')
+        self.text_color = colors.get('dark', '#1e293b')
+        self.drop_color = colors.get('warning', '#f59e0b')
+        self.font = tkfont.Font(font=font)
+        self.row_height = self.font.metrics("linespace") + ROW_PADDING
+
+        self.frame = ttk.Frame(parent)
+        self.frame.columnconfigure(0, weight=1)
+        self.canvas = tk.Canvas(self.frame, height=height * self.row_height, bg='white', takefocus=1,
+                                highlightthickness=1, highlightbackground='#cbd5e1', highlightcolor=self.select_color)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        self.canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+
+        self.top = 0
+        self.rows = []  # (background, text) canvas items, one per visible row
+        self.selected = set()
+        self.anchor = None
+        self.press_index = None
+        self.dragging = False
+        self.drop_index = None
+        self.autoscroll = None
+        self.drop_line = self.canvas.create_line(0, 0, 0, 0, fill=self.drop_color, width=2, state="hidden")
+
+        canvas = self.canvas
+        canvas.bind('<Configure>', self.on_configure)
+        canvas.bind('<Button-1>', self.on_press)
+        canvas.bind('<Control-Button-1>', self.on_toggle)
+        canvas.bind('<Shift-Button-1>', self.on_extend)
+        canvas.bind('<B1-Motion>', self.on_motion)
+        canvas.bind('<ButtonRelease-1>', self.on_release)
+        canvas.bind('<Double-Button-1>', lambda event: self.on_activate and self.selected and self.on_activate())
+        canvas.bind('<MouseWheel>', lambda event: self.yview("scroll", -WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS, "units"))
+        canvas.bind('<Button-4>', lambda event: self.yview("scroll", -WHEEL_ROWS, "units"))
+        canvas.bind('<Button-5>', lambda event: self.yview("scroll", WHEEL_ROWS, "units"))
+        canvas.bind('<Up>', lambda event: self.step(-1))
+        canvas.bind('<Down>', lambda event: self.step(1))
+        canvas.bind('<Prior>', lambda event: self.yview("scroll", -1, "pages"))
+        canvas.bind('<Next>', lambda event: self.yview("scroll", 1, "pages"))
+        canvas.bind('<Home>', lambda event: self.jump(0))
+        canvas.bind('<End>', lambda event: self.jump(len(self.points) - 1))
+        canvas.bind('<Control-a>', self.select_all)
+        canvas.bind('<Delete>', lambda event: self.on_delete and self.on_delete())
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def set_points(self, points):
+        """Show another PointStore (e.g. after loading a profile)"""
+        self.points = points
+        self.top = 0
+        self.selected.clear()
+        self.anchor = None
+        self.refresh()
+
+    # Drawing
+
+    @property
+    def visible(self):
+        return len(self.rows)
+
+    def on_configure(self, event):
+        """Create one row of canvas items per row that fits"""
+        for background, text in self.rows:
+            self.canvas.delete(background, text)
+        self.rows = []
+        for row in range(max(1, -(-event.height // self.row_height))):
+            y = row * self.row_height
+            background = self.canvas.create_rectangle(0, y, event.width, y + self.row_height, width=0, fill="")
+            text = self.canvas.create_text(4, y + self.row_height // 2, anchor=tk.W, font=self.font, text="")
+            self.rows.append((background, text))
+        self.canvas.tag_raise(self.drop_line)
+        self.refresh()
+
+    def row_text(self, index):
+        x, y = self.points[index]
+        text = f"{index + 1:>6}. ({x:5d}, {y:5d})"
+        button = self.points.button(index)
+        if button != "left":
+            text += f"  {button}"
+        action = self.points.action(index)
+        if action is not None:
+            text += f"  {action.describe()}"
+        delay = self.points.delay(index)
+        if delay is not None:
+            text += f"  +{delay:.3f}s"
+        return text
+
+    def refresh(self):
+        """Redraw the visible rows (call after the store changes)"""
+        count = len(self.points)
+        full_rows = max(1, self.canvas.winfo_height() // self.row_height)
+        self.top = max(0, min(self.top, count - full_rows))
+        itemconfigure = self.canvas.itemconfigure
+        for row, (background, text) in enumerate(self.rows):
+            index = self.top + row
+            if index < count:
+                selected = index in self.selected
+                itemconfigure(text, text=self.row_text(index), fill='white' if selected else self.text_color)
+                itemconfigure(background, fill=self.select_color if selected else "")
+            else:
+                itemconfigure(text, text="")
+                itemconfigure(background, fill="")
+        if count:
+            self.scrollbar.set(self.top / count, min(1.0, (self.top + full_rows) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def yview(self, *args):
+        """Scrollbar/wheel protocol: ("moveto", fraction) or ("scroll", n, "units"|"pages")"""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.points))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= max(1, self.visible - 1)
+            self.top += amount
+        self.refresh()
+
+    def see(self, index):
+        """Scroll so that index is visible"""
+        full_rows = max(1, self.canvas.winfo_height() // self.row_height)
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + full_rows:
+            self.top = index - full_rows + 1
+        self.refresh()
+
+    # Selection
+
+    def index_at(self, y):
+        return self.top + int(y // self.row_height)
+
+    def selection(self):
+        """Return the selected indexes in order"""
+        return sorted(self.selected)
+
+    def select(self, index):
+        self.selected = {index}
+        self.anchor = index
+        self.refresh()
+
+    def select_all(self, event=None):
+        self.selected = set(range(len(self.points)))
+        self.refresh()
+        return "break"
+
+    def jump(self, index):
+        """Select a point and scroll to it"""
+        if 0 <= index < len(self.points):
+            self.selected = {index}
+            self.anchor = index
+            self.see(index)
+
+    def step(self, offset):
+        if len(self.points):
+            current = self.anchor if self.anchor is not None else self.top - offset
+            self.jump(max(0, min(len(self.points) - 1, current + offset)))
+        return "break"
+
+    def search(self, text):
+        """Jump to a point number ("42", "#42") or the next point at "x, y"; return its index or None"""
+        numbers = [int(number) for number in re.findall(r"-?\d+", text)]
+        index = None
+        if len(numbers) == 1 and not text.strip().startswith("("):
+            if 1 <= numbers[0] <= len(self.points):
+                index = numbers[0] - 1
+        elif len(numbers) == 2:
+            start = self.anchor + 1 if self.anchor is not None else 0
+            index = self.points.find(numbers[0], numbers[1], start)
+        if index is not None:
+            self.jump(index)
+        return index
+
+    # Mouse
+
+    def on_press(self, event):
+        self.canvas.focus_set()
+        index = self.index_at(event.y)
+        self.dragging = False
+        if index >= len(self.points):
+            self.press_index = None
+            self.selected.clear()
+            self.refresh()
+            return
+        self.press_index = index
+        if index not in self.selected:
+            self.select(index)
+
+    def on_toggle(self, event):
+        self.canvas.focus_set()
+        index = self.index_at(event.y)
+        self.press_index = None
+        if index < len(self.points):
+            self.selected ^= {index}
+            self.anchor = index
+            self.refresh()
+
+    def on_extend(self, event):
+        self.canvas.focus_set()
+        index = min(self.index_at(event.y), len(self.points) - 1)
+        self.press_index = None
+        if index >= 0:
+            anchor = self.anchor if self.anchor is not None else index
+            self.selected = set(range(min(anchor, index), max(anchor, index) + 1))
+            self.refresh()
+
+    def on_motion(self, event):
+        if self.press_index is None:
+            return
+        if not self.dragging and self.index_at(event.y) == self.press_index:
+            return
+        self.dragging = True
+        height = self.canvas.winfo_height()
+        if event.y < 0 or event.y > height:
+            if self.autoscroll is None:
+                self.autoscroll = self.canvas.after(AUTOSCROLL_MS, self.scroll_drag, -1 if event.y < 0 else 1)
+        elif self.autoscroll is not None:
+            self.canvas.after_cancel(self.autoscroll)
+            self.autoscroll = None
+        # Drop between rows: before the row under the upper half of the pointer
+        y = min(max(event.y, 0), height)
+        self.drop_index = min(len(self.points), self.top + int(y / self.row_height + 0.5))
+        line_y = (self.drop_index - self.top) * self.row_height
+        self.canvas.coords(self.drop_line, 0, line_y, self.canvas.winfo_width(), line_y)
+        self.canvas.itemconfigure(self.drop_line, state="normal")
+
+    def scroll_drag(self, direction):
+        self.autoscroll = None
+        if self.dragging:
+            self.yview("scroll", direction, "units")
+            self.drop_index = max(0, min(len(self.points), self.drop_index + direction))
+            self.autoscroll = self.canvas.after(AUTOSCROLL_MS, self.scroll_drag, direction)
+
+    def on_release(self, event):
+        if self.autoscroll is not None:
+            self.canvas.after_cancel(self.autoscroll)
+            self.autoscroll = None
+        self.canvas.itemconfigure(self.drop_line, state="hidden")
+        if self.dragging and self.drop_index is not None:
+            self.move_selected(self.drop_index)
+        elif self.press_index is not None and len(self.selected) > 1:
+            # Plain click inside a multi-selection selects just that row
+            self.select(self.press_index)
+        self.dragging = False
+        self.press_index = None
+        self.drop_index = None
+
+    # Edits
+
+    def delete_selected(self):
+        """Delete the selected points; return how many were removed"""
+        indexes = self.selection()
+        removed = self.points.delete(indexes)
+        self.selected.clear()
+        self.anchor = None
+        if removed:
+            self.refresh()
+            if self.on_change:
+                self.on_change()
+        return removed
+
+    def move_selected(self, target):
+        """Move the selected points to before index target"""
+        indexes = self.selection()
+        contiguous = indexes and indexes[-1] - indexes[0] + 1 == len(indexes)
+        if not indexes or (contiguous and indexes[0] <= target <= indexes[-1] + 1):
+            return
+        first = self.points.move(indexes, target)
+        self.selected = set(range(first, first + len(indexes)))
+        self.anchor = first
+        self.see(first)
+        if self.on_change:
+            self.on_change()
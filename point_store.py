@@ -0,0 +1,390 @@
+import bisect
+import itertools
+import json
+import sys
+from array import array
+
+from actions import Action
+from input_backends import BUTTONS
+
+# Coordinates are int32 (packed little-endian in profiles and files)
+COORD_MIN = -2**31
+COORD_MAX = 2**31 - 1
+
+# Stored in the delay column for points that use the job's interval/point delay
+DEFAULT_DELAY = -1.0
+
+# Above this many scattered indexes, delete() rebuilds the columns in one pass
+DELETE_REBUILD_THRESHOLD = 64
+
+
+def check_point(x, y):
+    """Raise ValueError unless x, y are int32 integer coordinates"""
+    if not (isinstance(x, int) and isinstance(y, int)) or isinstance(x, bool) or isinstance(y, bool):
+        raise ValueError(f"Click point coordinates must be integers: {(x, y)!r}")
+    if not (COORD_MIN <= x <= COORD_MAX and COORD_MIN <= y <= COORD_MAX):
+        raise ValueError(f"Click point out of range: {(x, y)!r}")
+
+
+def to_little_endian(column):
+    """Return a column's bytes in little-endian order"""
+    if sys.byteorder != "little" and column.itemsize > 1:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def from_little_endian(typecode, data):
+    column = array(typecode)
+    column.frombytes(data)
+    if sys.byteorder != "little" and column.itemsize > 1:
+        column.byteswap()
+    return column
+
+
+class PointStore:
+    """Click points in compact columns instead of a list of tuples.
+
+    x and y are int32 arrays (8 bytes a point instead of ~120), so appends
+    are O(1) and large imports stay small. Per-point delays (seconds before
+    the point, DEFAULT_DELAY for the job's own) and buttons (indexes into
+    BUTTONS) are only allocated once a point needs them, and Actions
+    (multi-clicks, holds, drags, keys) are kept in a sparse {index: Action}
+    dict, so plain single clicks cost nothing extra. snapshot() shares
+    the columns with the copy; whichever side changes first copies them
+    (copy-on-write), so handing the points to the click engine is free.
+    Iterating yields (x, y) tuples.
+    """
+
+    def __init__(self):
+        self.xs = array('i')
+        self.ys = array('i')
+        self.delays = None
+        self.buttons = None
+        self.actions = {}
+        self.shared = False
+
+    @classmethod
+    def from_points(cls, points):
+        """Build a store from (x, y[, delay[, button[, action]]]) rows, or snapshot another store"""
+        if isinstance(points, PointStore):
+            return points.snapshot()
+        store = cls()
+        store.extend(points)
+        return store
+
+    @classmethod
+    def from_bytes(cls, data, delays=None, buttons=None, actions=None):
+        """Build a store from packed little-endian int32 x,y pairs (and optional columns)"""
+        flat = from_little_endian('i', data)
+        store = cls()
+        store.xs = flat[0::2]
+        store.ys = flat[1::2]
+        if delays:
+            store.delays = from_little_endian('d', delays)
+        if buttons:
+            store.buttons = array('B', buttons)
+        if actions:
+            store.actions = {int(index): Action.from_dict(action) for index, action in json.loads(actions).items()}
+        return store
+
+    def to_bytes(self):
+        """Return the points as packed little-endian int32 x,y pairs"""
+        flat = array('i', bytes(8 * len(self.xs)))
+        flat[0::2] = self.xs
+        flat[1::2] = self.ys
+        return to_little_endian(flat)
+
+    def delay_bytes(self):
+        """Return the packed delay column, or None if every point uses the job's"""
+        return to_little_endian(self.delays) if self.delays is not None else None
+
+    def button_bytes(self):
+        """Return the packed button column, or None if every point is a left click"""
+        return self.buttons.tobytes() if self.buttons is not None else None
+
+    def actions_json(self):
+        """Return the actions as JSON {index: action}, or None if every point is a single click"""
+        if not self.actions:
+            return None
+        return json.dumps({str(index): action.to_dict() for index, action in sorted(self.actions.items())})
+
+    def snapshot(self):
+        """Return a copy sharing this store's columns until either side changes"""
+        copy = PointStore()
+        copy.xs, copy.ys, copy.delays, copy.buttons = self.xs, self.ys, self.delays, self.buttons
+        copy.actions = self.actions
+        copy.shared = self.shared = True
+        return copy
+
+    def _own(self):
+        # Copy-on-write: take private copies of columns shared with a snapshot
+        if self.shared:
+            self.xs = array('i', self.xs)
+            self.ys = array('i', self.ys)
+            if self.delays is not None:
+                self.delays = array('d', self.delays)
+            if self.buttons is not None:
+                self.buttons = array('B', self.buttons)
+            self.actions = dict(self.actions)
+            self.shared = False
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __getitem__(self, index):
+        return self.xs[index], self.ys[index]
+
+    def __iter__(self):
+        return zip(self.xs, self.ys)
+
+    def __eq__(self, other):
+        if not isinstance(other, PointStore):
+            return NotImplemented
+        return self.to_rows() == other.to_rows()
+
+    @property
+    def nbytes(self):
+        """Memory used by the columns"""
+        total = (len(self.xs) + len(self.ys)) * self.xs.itemsize
+        if self.delays is not None:
+            total += len(self.delays) * self.delays.itemsize
+        if self.buttons is not None:
+            total += len(self.buttons)
+        return total
+
+    def append(self, x, y, delay=None, button="left", action=None):
+        """Add a point at the end; return its index"""
+        check_point(x, y)
+        if button not in BUTTONS:
+            raise ValueError(f"Unknown mouse button {button!r}")
+        if delay is not None and delay < 0:
+            raise ValueError("Point delays must be non-negative")
+        action = self._checked_action(action)
+        self._own()
+        index = len(self.xs)
+        self.xs.append(x)
+        self.ys.append(y)
+        if delay is not None and self.delays is None:
+            self.delays = array('d', [DEFAULT_DELAY]) * index
+        if self.delays is not None:
+            self.delays.append(DEFAULT_DELAY if delay is None else float(delay))
+        if button != "left" and self.buttons is None:
+            self.buttons = array('B', bytes(index))
+        if self.buttons is not None:
+            self.buttons.append(BUTTONS.index(button))
+        if action is not None:
+            self.actions[index] = action
+        return index
+
+    def extend(self, rows):
+        """Append (x, y[, delay[, button[, action]]]) rows (action: an Action or its dict)"""
+        rows = list(rows)
+        if rows and all(len(row) == 2 for row in rows):
+            # Plain x, y pairs: validate and convert whole columns at C speed
+            xs, ys = zip(*rows)
+            if set(map(type, xs)) | set(map(type, ys)) == {int}:
+                try:
+                    xs, ys = array('i', xs), array('i', ys)
+                except OverflowError:
+                    pass  # Report the offending point below
+                else:
+                    self._own()
+                    length = len(self.xs)
+                    self.xs += xs
+                    self.ys += ys
+                    if self.delays is not None:
+                        self.delays += array('d', [DEFAULT_DELAY]) * len(xs)
+                    if self.buttons is not None:
+                        self.buttons += array('B', bytes(len(self.xs) - length))
+                    return
+        for row in rows:
+            if not 2 <= len(row) <= 5:
+                raise ValueError(f"Invalid click point {row!r}")
+            self.append(*row)
+
+    def pop(self, index=-1):
+        """Remove a point; return its (x, y)"""
+        point = self[index]
+        self.delete([index % len(self.xs)])
+        return point
+
+    def delete(self, indexes):
+        """Remove the points at indexes; return how many were removed"""
+        indexes = sorted(set(indexes))
+        if not indexes:
+            return 0
+        if indexes[0] < 0 or indexes[-1] >= len(self.xs):
+            raise IndexError("point index out of range")
+        self._own()
+        if self.actions:
+            removed = set(indexes)
+            self.actions = {index - bisect.bisect_left(indexes, index): action
+                            for index, action in self.actions.items() if index not in removed}
+        columns = [column for column in (self.xs, self.ys, self.delays, self.buttons) if column is not None]
+        if len(indexes) <= DELETE_REBUILD_THRESHOLD:
+            for index in reversed(indexes):
+                for column in columns:
+                    del column[index]
+        else:
+            keep = bytearray(b"\x01") * len(self.xs)
+            for index in indexes:
+                keep[index] = 0
+            self.xs, self.ys = (array('i', itertools.compress(self.xs, keep)),
+                                array('i', itertools.compress(self.ys, keep)))
+            if self.delays is not None:
+                self.delays = array('d', itertools.compress(self.delays, keep))
+            if self.buttons is not None:
+                self.buttons = array('B', itertools.compress(self.buttons, keep))
+        return len(indexes)
+
+    def move(self, indexes, target):
+        """Move the points at indexes (keeping their order) to before index target.
+
+        target counts positions in the store as it was before the move.
+        Returns the new index of the first moved point.
+        """
+        indexes = sorted(set(indexes))
+        if not indexes:
+            return target
+        moving = bytearray(len(self.xs))
+        for index in indexes:
+            moving[index] = 1
+        before = [index for index in range(target) if not moving[index]]
+        after = [index for index in range(target, len(self.xs)) if not moving[index]]
+        order = before + indexes + after
+        self._own()
+        self.xs = array('i', map(self.xs.__getitem__, order))
+        self.ys = array('i', map(self.ys.__getitem__, order))
+        if self.delays is not None:
+            self.delays = array('d', map(self.delays.__getitem__, order))
+        if self.buttons is not None:
+            self.buttons = array('B', map(self.buttons.__getitem__, order))
+        if self.actions:
+            actions = self.actions
+            self.actions = {new: actions[old] for new, old in enumerate(order) if old in actions}
+        return len(before)
+
+    def find(self, x, y, start=0):
+        """Return the index of the next point at (x, y) from start on (wrapping around), or None"""
+        xs, ys = self.xs, self.ys
+        for index in itertools.chain(range(start, len(xs)), range(min(start, len(xs)))):
+            if xs[index] == x and ys[index] == y:
+                return index
+        return None
+
+    def clear(self):
+        self.xs = array('i')
+        self.ys = array('i')
+        self.delays = None
+        self.buttons = None
+        self.actions = {}
+        self.shared = False
+
+    def delay(self, index):
+        """Return a point's own delay in seconds, or None if it uses the job's"""
+        if self.delays is None or self.delays[index] == DEFAULT_DELAY:
+            return None
+        return self.delays[index]
+
+    def button(self, index):
+        return BUTTONS[self.buttons[index]] if self.buttons is not None else "left"
+
+    def action(self, index):
+        """Return a point's Action, or None for a single click"""
+        return self.actions.get(index)
+
+    def set_delay(self, index, delay):
+        """Give a point its own delay (None for the job's)"""
+        if delay is not None and delay < 0:
+            raise ValueError("Point delays must be non-negative")
+        self._own()
+        if self.delays is None:
+            if delay is None:
+                return
+            self.delays = array('d', [DEFAULT_DELAY]) * len(self.xs)
+        self.delays[index] = DEFAULT_DELAY if delay is None else float(delay)
+
+    def set_button(self, index, button):
+        if button not in BUTTONS:
+            raise ValueError(f"Unknown mouse button {button!r}")
+        self._own()
+        if self.buttons is None:
+            if button == "left":
+                return
+            self.buttons = array('B', bytes(len(self.xs)))
+        self.buttons[index] = BUTTONS.index(button)
+
+    def set_action(self, index, action):
+        """Set a point's Action (None or a single click removes it)"""
+        action = self._checked_action(action)
+        if not 0 <= index < len(self.xs):
+            raise IndexError("point index out of range")
+        self._own()
+        if action is None:
+            self.actions.pop(index, None)
+        else:
+            self.actions[index] = action
+
+    def _checked_action(self, action):
+        """Validate an Action or its dict; plain single clicks become None"""
+        if action is None:
+            return None
+        if isinstance(action, dict):
+            action = Action.from_dict(action)
+        action.validate()
+        return None if action.is_plain() else action
+
+    def needs_screen(self):
+        """Return True if any action waits for something on screen"""
+        return any(action.when is not None for action in self.actions.values())
+
+    def compile_actions(self, backend, capture=None):
+        """Return each point's compiled action program (None for single clicks), or None if there are none"""
+        if not self.actions:
+            return None
+        programs = [None] * len(self.xs)
+        for index, action in self.actions.items():
+            programs[index] = action.compile(backend, self.xs[index], self.ys[index], self.button(index), capture)
+        return programs
+
+    def has_custom_delays(self):
+        return self.delays is not None and any(delay != DEFAULT_DELAY for delay in self.delays)
+
+    def delays_before(self, interval, point_delay):
+        """Return the wait in seconds before each point of a cycle.
+
+        The wait after a point with an Action also covers the action's own
+        time, so delays count from when the action finishes. A point waiting
+        for the screen to change or settle skips the click delay: its
+        condition decides when it fires.
+        """
+        waits = [float(point_delay)] * len(self.xs)
+        for index, action in self.actions.items():
+            if action.when is not None and action.when.replaces_delay():
+                waits[index] = 0.0
+        if waits:
+            waits[0] = float(interval)
+        if self.delays is not None:
+            for index, delay in enumerate(self.delays):
+                if delay != DEFAULT_DELAY:
+                    waits[index] = delay
+        for index, action in self.actions.items():
+            waits[(index + 1) % len(waits)] += action.span()
+        return waits
+
+    def button_names(self):
+        """Return each point's button name"""
+        if self.buttons is None:
+            return ["left"] * len(self.xs)
+        return [BUTTONS[code] for code in self.buttons]
+
+    def to_rows(self):
+        """Return [x, y] rows, with delay, button and action only where the store has them"""
+        if self.actions:
+            return [[x, y, self.delay(index), self.button(index),
+                     self.actions[index].to_dict() if index in self.actions else None]
+                    for index, (x, y) in enumerate(self)]
+        if self.delays is None and self.buttons is None:
+            return [[x, y] for x, y in self]
+        return [[x, y, self.delay(index), self.button(index)] for index, (x, y) in enumerate(self)]
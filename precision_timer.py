@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import deque
+
+# Below this much remaining time the scheduler busy-waits instead of sleeping,
+# because OS sleeps routinely overshoot by a millisecond or more.
+SPIN_THRESHOLD_NS = 1_000_000
+
+# Number of timing samples kept for jitter percentiles (bounded for unlimited runs)
+MAX_TIMING_SAMPLES = 10_000
+
+
+def event_wait(event, timeout):
+    """Default waiter - block on the stop event for up to timeout seconds"""
+    return event.wait(timeout)
+
+
+class TimingStats:
+    """Rolling record of how late each deadline fired"""
+
+    def __init__(self, max_samples=MAX_TIMING_SAMPLES):
+        self.lateness_ns = deque(maxlen=max_samples)
+        self.fires = 0
+        self.overruns = 0
+        self.first_fire_ns = None
+        self.last_fire_ns = None
+        self.histogram = None  # Optional metrics histogram fed with every lateness
+
+    def record(self, deadline_ns, fired_ns):
+        """Record one deadline and the time it actually fired"""
+        if self.first_fire_ns is None:
+            self.first_fire_ns = fired_ns
+        self.last_fire_ns = fired_ns
+        self.fires += 1
+        self.lateness_ns.append(fired_ns - deadline_ns)
+        if self.histogram is not None:
+            self.histogram.record(fired_ns - deadline_ns)
+
+    def percentile(self, pct):
+        """Return the given lateness percentile in nanoseconds"""
+        if not self.lateness_ns:
+            return 0
+        ordered = sorted(self.lateness_ns)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def achieved_rate(self):
+        """Return fires per second between the first and last fire"""
+        if self.fires < 2 or self.last_fire_ns == self.first_fire_ns:
+            return 0.0
+        return (self.fires - 1) / ((self.last_fire_ns - self.first_fire_ns) / 1e9)
+
+    def summary(self):
+        """Return a dict of rate and jitter figures (jitter in milliseconds)"""
+        return {
+            "fires": self.fires,
+            "overruns": self.overruns,
+            "achieved_rate": self.achieved_rate(),
+            "jitter_p50_ms": self.percentile(50) / 1e6,
+            "jitter_p99_ms": self.percentile(99) / 1e6,
+            "jitter_max_ms": (max(self.lateness_ns) if self.lateness_ns else 0) / 1e6,
+        }
+
+
+class PrecisionScheduler:
+    """Absolute-deadline scheduler for the click loop.
+
+    Deadlines are advanced from the previous deadline rather than from "now",
+    so time spent clicking and logging is compensated instead of accumulating
+    as drift. Waiting happens on a threading.Event so a stop request wakes the
+    loop immediately, then the final stretch is busy-waited for precision.
+    """
+
+    def __init__(self, stop_event=None, clock=time.perf_counter_ns, waiter=event_wait,
+                 spin_ns=SPIN_THRESHOLD_NS):
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self.clock = clock
+        self.waiter = waiter
+        self.spin_ns = spin_ns
+        self.stats = TimingStats()
+        self.next_deadline = None
+        self.end_ns = None
+
+    def start(self):
+        """Anchor the deadline sequence at the current time"""
+        self.next_deadline = self.clock()
+        return self.next_deadline
+
+    def limit(self, seconds):
+        """End the sequence seconds after start(): wait() then returns False"""
+        self.end_ns = self.next_deadline + int(seconds * 1e9)
+
+    def stopped(self):
+        """Return True if a stop has been requested"""
+        return self.stop_event.is_set()
+
+    def wait(self, delay):
+        """Advance the deadline by delay seconds and wait for it.
+
+        Returns False if a stop was requested while waiting, or at once if
+        the deadline falls beyond the limit() end time. When the loop has
+        fallen more than a full delay behind, the sequence is re-anchored at
+        the current time instead of firing a burst of catch-up clicks.
+        """
+        if self.next_deadline is None:
+            self.start()
+        delay_ns = int(delay * 1e9)
+        self.next_deadline += delay_ns
+        now = self.clock()
+        if now - self.next_deadline > delay_ns:
+            if delay_ns > 0:
+                self.stats.overruns += 1
+            self.next_deadline = now
+        if self.end_ns is not None and self.next_deadline > self.end_ns:
+            return False
+        return self.wait_until(self.next_deadline)
+
+    def wait_until(self, deadline_ns):
+        """Block until the absolute deadline; return False if stopped"""
+        stop_event = self.stop_event
+        while True:
+            if stop_event.is_set():
+                return False
+            remaining = deadline_ns - self.clock()
+            if remaining <= 0:
+                break
+            if remaining > self.spin_ns:
+                if self.waiter(stop_event, (remaining - self.spin_ns) / 1e9):
+                    return False
+                continue
+            # Final approach: spin on the clock, still honouring stop requests
+            while self.clock() < deadline_ns:
+                if stop_event.is_set():
+                    return False
+            break
+        self.stats.record(deadline_ns, self.clock())
+        return True
+
+    def mark(self):
+        """Record an immediate fire (e.g. the first click of a run)"""
+        now = self.clock()
+        if self.next_deadline is None:
+            self.next_deadline = now
+        self.stats.record(self.next_deadline, now)
@@ -0,0 +1,97 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import datetime
+
+
+class ProfilePicker:
+    """Toplevel for choosing a profile to open, or a name to save under.
+
+    The list only shows names, point counts and dates; points are never
+    read until a profile is opened.
+    """
+
+    def __init__(self, parent, store, on_choose, mode="open", current_name=""):
+        self.store = store
+        self.on_choose = on_choose
+        self.mode = mode
+        self.shown = []
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("📂 Open Profile" if mode == "open" else "💾 Save Profile")
+        self.window.geometry("420x360")
+        self.window.columnconfigure(0, weight=1)
+        self.window.rowconfigure(1, weight=1)
+        self.window.transient(parent)
+
+        top_frame = ttk.Frame(self.window, padding="5")
+        top_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E))
+        top_frame.columnconfigure(1, weight=1)
+        ttk.Label(top_frame, text="Name:" if mode == "save" else "Filter:",
+                  font=('Segoe UI', 8)).grid(row=0, column=0, sticky=tk.W)
+        self.name_var = tk.StringVar(value=current_name if mode == "save" else "")
+        if mode == "open":
+            self.name_var.trace_add("write", lambda *args: self.refresh())
+        name_entry = ttk.Entry(top_frame, textvariable=self.name_var, font=('Segoe UI', 8))
+        name_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 0))
+        name_entry.bind('<Return>', lambda event: self.choose())
+        name_entry.focus_set()
+
+        self.listbox = tk.Listbox(self.window, font=('Consolas', 8), activestyle="none")
+        scrollbar = ttk.Scrollbar(self.window, orient="vertical", command=self.listbox.yview)
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+        self.listbox.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(5, 0))
+        scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.listbox.bind('<<ListboxSelect>>', self.on_select)
+        self.listbox.bind('<Double-Button-1>', lambda event: self.choose())
+
+        button_frame = ttk.Frame(self.window, padding="5")
+        button_frame.grid(row=2, column=0, columnspan=2, sticky=tk.E)
+        ttk.Button(button_frame, text="Delete", command=self.delete, width=8).grid(row=0, column=0, padx=(0, 3))
+        ttk.Button(button_frame, text="Open" if mode == "open" else "Save", style="Primary.TButton",
+                   command=self.choose, width=8).grid(row=0, column=1, padx=(0, 3))
+        ttk.Button(button_frame, text="Close", command=self.window.destroy, width=8).grid(row=0, column=2)
+
+        self.refresh()
+
+    def refresh(self):
+        """List the profiles matching the filter/name text"""
+        text = self.name_var.get().strip().lower()
+        self.listbox.delete(0, tk.END)
+        self.shown = []
+        for profile in self.store.list():
+            if self.mode == "open" and text and text not in profile.name.lower():
+                continue
+            updated = datetime.fromtimestamp(profile.updated).strftime("%Y-%m-%d %H:%M")
+            self.listbox.insert(tk.END, f"{profile.name:<24} {profile.point_count:>7} pts  {updated}")
+            self.shown.append(profile.name)
+
+    def selected_name(self):
+        selection = self.listbox.curselection()
+        return self.shown[selection[0]] if selection else None
+
+    def on_select(self, event=None):
+        name = self.selected_name()
+        if name and self.mode == "save":
+            self.name_var.set(name)
+
+    def choose(self):
+        if self.mode == "open":
+            name = self.selected_name() or (self.shown[0] if len(self.shown) == 1 else None)
+            if not name:
+                return
+        else:
+            name = self.name_var.get().strip()
+            if not name:
+                messagebox.showerror("Error", "Please enter a profile name", parent=self.window)
+                return
+            if name in self.store and not messagebox.askyesno(
+                    "Overwrite Profile", f"Replace profile '{name}'?", parent=self.window):
+                return
+        if self.on_choose(name) is not False:
+            self.window.destroy()
+
+    def delete(self):
+        name = self.selected_name()
+        if name and messagebox.askyesno("Delete Profile", f"Delete profile '{name}'?", parent=self.window):
+            self.store.delete(name)
+            self.refresh()
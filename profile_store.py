@@ -0,0 +1,207 @@
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from point_store import PointStore
+
+PROFILE_DB_ENV = "AUTOCLICKER_PROFILES"
+
+# Job and schedule settings stored with each profile; everything else in
+# autoclicker_settings.json (log size, backend, logging section, ...) is an
+# application preference
+PROFILE_KEYS = ("click_mode", "click_count", "interval", "point_delay", "schedule_mode", "hour", "minute",
+                "schedule_repeat", "schedule_value", "run_for", "stop_at")
+
+def default_store_path():
+    """Return the profile database path in the per-user data directory"""
+    if os.environ.get(PROFILE_DB_ENV):
+        return os.environ[PROFILE_DB_ENV]
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "AutoClickerPro", "profiles.db")
+    base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser(os.path.join("~", ".local", "share"))
+    return os.path.join(base, "autoclicker", "profiles.db")
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temporary file and rename it over path"""
+    directory = os.path.dirname(os.path.abspath(path))
+    import tempfile  # Only needed when saving (it pulls in random and shutil)
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def migrate_v1(conn):
+    conn.execute("""CREATE TABLE profiles (
+                        id INTEGER PRIMARY KEY,
+                        name TEXT NOT NULL UNIQUE,
+                        settings TEXT NOT NULL,
+                        point_count INTEGER NOT NULL,
+                        updated REAL NOT NULL)""")
+    conn.execute("""CREATE TABLE points (
+                        profile_id INTEGER PRIMARY KEY REFERENCES profiles(id) ON DELETE CASCADE,
+                        data BLOB NOT NULL)""")
+
+
+def migrate_v2(conn):
+    # Optional per-point delay (float64) and button columns; NULL when unused
+    conn.execute("ALTER TABLE points ADD COLUMN delays BLOB")
+    conn.execute("ALTER TABLE points ADD COLUMN buttons BLOB")
+
+
+def migrate_v3(conn):
+    # Per-point actions as JSON {index: action}; NULL when every point is a single click
+    conn.execute("ALTER TABLE points ADD COLUMN actions TEXT")
+
+
+# Schema migrations in order; PRAGMA user_version records how many have run
+MIGRATIONS = [migrate_v1, migrate_v2, migrate_v3]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+class Profile:
+    """A named profile; its points are only read from the store when first used"""
+
+    def __init__(self, store, profile_id, name, settings, point_count, updated):
+        self.store = store
+        self.profile_id = profile_id
+        self.name = name
+        self.settings = settings
+        self.point_count = point_count
+        self.updated = updated
+        self._points = None
+
+    @property
+    def points(self):
+        if self._points is None:
+            self._points = self.store.load_points(self.profile_id)
+        return self._points
+
+
+class ProfileStore:
+    """SQLite library of named click profiles.
+
+    Settings are a small JSON document per profile and points the packed
+    PointStore columns in a separate table, so listing or opening a
+    profile never reads its points until they are needed. Names map to row ids through
+    an in-memory index, and every save is a single transaction (WAL mode),
+    so a crash leaves either the old or the new profile, never a mix.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if self.path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.migrate()
+        self.index = {name: profile_id for profile_id, name in self.conn.execute("SELECT id, name FROM profiles")}
+
+    def migrate(self):
+        """Bring the schema up to SCHEMA_VERSION"""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"Profile store {self.path} is from a newer version (schema {version})")
+        for number in range(version, SCHEMA_VERSION):
+            with self.conn:
+                MIGRATIONS[number](self.conn)
+                self.conn.execute(f"PRAGMA user_version = {number + 1}")
+
+    def close(self):
+        self.conn.close()
+
+    def names(self):
+        return sorted(self.index, key=str.lower)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def list(self):
+        """Return all profiles (points not loaded), sorted by name"""
+        rows = self.conn.execute("SELECT id, name, settings, point_count, updated FROM profiles")
+        profiles = [self._profile(row) for row in rows]
+        return sorted(profiles, key=lambda profile: profile.name.lower())
+
+    def get(self, name):
+        """Return the named profile (points not loaded yet); KeyError if missing"""
+        profile_id = self.index[name]
+        row = self.conn.execute("SELECT id, name, settings, point_count, updated FROM profiles WHERE id = ?",
+                                (profile_id,)).fetchone()
+        return self._profile(row)
+
+    def load_points(self, profile_id):
+        """Return a profile's points as a PointStore"""
+        row = self.conn.execute("SELECT data, delays, buttons, actions FROM points WHERE profile_id = ?",
+                                (profile_id,)).fetchone()
+        return PointStore.from_bytes(*row) if row else PointStore()
+
+    def save(self, name, settings, points):
+        """Create or replace a profile atomically; return it"""
+        name = name.strip()
+        if not name:
+            raise ValueError("Profile name cannot be empty")
+        settings = {key: settings[key] for key in PROFILE_KEYS if key in settings}
+        points = PointStore.from_points(points)
+        updated = time.time()
+        with self.conn:
+            self.conn.execute("""INSERT INTO profiles (name, settings, point_count, updated) VALUES (?, ?, ?, ?)
+                                 ON CONFLICT(name) DO UPDATE SET settings = excluded.settings,
+                                     point_count = excluded.point_count, updated = excluded.updated""",
+                              (name, json.dumps(settings), len(points), updated))
+            profile_id = self.conn.execute("SELECT id FROM profiles WHERE name = ?", (name,)).fetchone()[0]
+            self.conn.execute("""INSERT OR REPLACE INTO points (profile_id, data, delays, buttons, actions)
+                                 VALUES (?, ?, ?, ?, ?)""",
+                              (profile_id, points.to_bytes(), points.delay_bytes(), points.button_bytes(),
+                               points.actions_json()))
+        self.index[name] = profile_id
+        profile = Profile(self, profile_id, name, settings, len(points), updated)
+        profile._points = points
+        return profile
+
+    def rename(self, old, new):
+        new = new.strip()
+        if not new:
+            raise ValueError("Profile name cannot be empty")
+        if new in self.index:
+            raise ValueError(f"Profile '{new}' already exists")
+        profile_id = self.index[old]
+        with self.conn:
+            self.conn.execute("UPDATE profiles SET name = ? WHERE id = ?", (new, profile_id))
+        self.index[new] = self.index.pop(old)
+
+    def delete(self, name):
+        profile_id = self.index[name]
+        with self.conn:
+            self.conn.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
+        del self.index[name]
+
+    def import_settings_file(self, path, name="default"):
+        """Import a legacy autoclicker_settings.json as a profile; return it (None if no points)"""
+        with open(path, 'r') as f:
+            settings = json.load(f)
+        points = [(int(x), int(y)) for x, y in settings.get("click_points", [])]
+        if not points:
+            return None
+        return self.save(name, settings, points)
+
+    def _profile(self, row):
+        profile_id, name, settings, point_count, updated = row
+        return Profile(self, profile_id, name, json.loads(settings), point_count, updated)
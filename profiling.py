@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+import time
+
+# Opt-in: AUTOCLICKER_PROFILE=spans|trace|cprofile (or --profile on the command line)
+PROFILE_ENV = "AUTOCLICKER_PROFILE"
+PROFILE_OUTPUT_ENV = "AUTOCLICKER_PROFILE_OUTPUT"
+PROFILE_MODES = ("spans", "trace", "cprofile")
+DEFAULT_OUTPUTS = {"trace": "autoclicker_trace.json", "cprofile": "autoclicker_profile.prof"}
+
+# Trace events kept per run (phase totals are always complete)
+MAX_TRACE_EVENTS = 1_000_000
+
+
+class SpanTracer:
+    """Times named phases with perf_counter_ns spans.
+
+    Call sites are wrapped (wrap()) only when profiling is enabled, so the
+    disabled path is the plain function call. Per-phase totals are always
+    kept; individual spans are kept for a Chrome trace if record_events.
+    """
+
+    def __init__(self, record_events=False, max_events=MAX_TRACE_EVENTS, clock=time.perf_counter_ns):
+        self.record_events = record_events
+        self.max_events = max_events
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started_ns = self.clock()
+            self.phases = {}  # name -> [count, total_ns, max_ns]
+            self.events = []
+            self.dropped = 0
+
+    def add(self, name, start_ns, end_ns):
+        """Record one span"""
+        duration = end_ns - start_ns
+        with self.lock:
+            phase = self.phases.get(name)
+            if phase is None:
+                self.phases[name] = [1, duration, duration]
+            else:
+                phase[0] += 1
+                phase[1] += duration
+                if duration > phase[2]:
+                    phase[2] = duration
+            if self.record_events:
+                if len(self.events) < self.max_events:
+                    self.events.append((name, start_ns, duration, threading.get_ident()))
+                else:
+                    self.dropped += 1
+
+    def wrap(self, name, fn):
+        """Return fn wrapped in a span named name"""
+        clock = self.clock
+        add = self.add
+
+        def traced(*args, **kwargs):
+            started = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                add(name, started, clock())
+
+        return traced
+
+    def summary(self):
+        """Return {phase: {count, total_ms, mean_us, max_us, share}} by total time"""
+        with self.lock:
+            phases = {name: list(values) for name, values in self.phases.items()}
+        wall_ns = max(1, self.clock() - self.started_ns)
+        return {name: {"count": count,
+                       "total_ms": total / 1e6,
+                       "mean_us": total / count / 1e3,
+                       "max_us": largest / 1e3,
+                       "share": total / wall_ns}
+                for name, (count, total, largest) in sorted(phases.items(), key=lambda item: -item[1][1])}
+
+    def format_summary(self):
+        """Return the summary as log lines"""
+        return [f"⏱ {name}: {p['count']} spans, {p['total_ms']:.1f} ms ({p['share']:.1%}), "
+                f"mean {p['mean_us']:.1f} µs, max {p['max_us']:.1f} µs"
+                for name, p in self.summary().items()]
+
+    def write_chrome_trace(self, path):
+        """Write recorded spans as Chrome trace / Perfetto JSON"""
+        pid = os.getpid()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        with self.lock:
+            events = list(self.events)
+            dropped = self.dropped
+        tids = {}
+        trace = []
+        for name, start_ns, duration, ident in events:
+            tid = tids.setdefault(ident, len(tids) + 1)
+            trace.append({"name": name, "cat": name.split(".")[0], "ph": "X", "pid": pid, "tid": tid,
+                          "ts": (start_ns - self.started_ns) / 1e3, "dur": duration / 1e3})
+        for ident, tid in tids.items():
+            trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                          "args": {"name": thread_names.get(ident, f"thread {ident}")}})
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ns",
+                       "otherData": {"dropped_events": dropped}}, f)
+
+
+class Profiler:
+    """One profiling mode for click runs: phase spans, a Chrome trace or cProfile"""
+
+    def __init__(self, mode, output=None):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r} (choose from {', '.join(PROFILE_MODES)})")
+        self.mode = mode
+        self.output = output or DEFAULT_OUTPUTS.get(mode)
+        # cProfile mode still gets phase totals; only the trace keeps every span
+        self.tracer = SpanTracer(record_events=mode == "trace")
+        self.profile = None
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        """Return a Profiler if AUTOCLICKER_PROFILE is set, else None"""
+        mode = environ.get(PROFILE_ENV, "").strip().lower()
+        if not mode:
+            return None
+        return cls(mode, environ.get(PROFILE_OUTPUT_ENV) or None)
+
+    def run(self, fn, *args, **kwargs):
+        """Call fn, under cProfile in cprofile mode (profiles the calling thread)"""
+        if self.mode != "cprofile":
+            return fn(*args, **kwargs)
+        if self.profile is None:
+            import cProfile
+            self.profile = cProfile.Profile()
+        return self.profile.runcall(fn, *args, **kwargs)
+
+    def finish(self, log):
+        """Write the trace/profile for the run so far and log the phase summary"""
+        for line in self.tracer.format_summary():
+            log(line)
+        if self.mode == "trace":
+            self.tracer.write_chrome_trace(self.output)
+            log(f"⏱ Chrome trace written to {self.output} (open in chrome://tracing or ui.perfetto.dev)")
+        elif self.mode == "cprofile" and self.profile is not None:
+            self.profile.dump_stats(self.output)
+            import io
+            import pstats
+            text = io.StringIO()
+            pstats.Stats(self.profile, stream=text).sort_stats("cumulative").print_stats(15)
+            for line in text.getvalue().splitlines():
+                if line.strip():
+                    log(line)
+            log(f"⏱ cProfile stats written to {self.output} (python -m pstats {self.output})")
+            self.profile = None
+        self.tracer.reset()
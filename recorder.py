@@ -0,0 +1,267 @@
+import math
+import threading
+import time
+
+from actions import CLICK, DRAG, HOLD, KEY, MAX_ACTION_SECONDS, MAX_CLICK_COUNT, MOVE, Action
+from input_backends import BUTTONS, KEY_NAMES
+from point_store import PointStore
+
+# Raw event kinds: (timestamp_ns, kind, x, y, button or key)
+MOVED = "move"
+PRESSED = "press"
+RELEASED = "release"
+KEY_PRESSED = "key_down"
+KEY_RELEASED = "key_up"
+
+STOP_KEY = "f9"  # Ends a recording; never recorded itself
+PLAYBACK_SPEEDS = ("1x", "2x", "5x", "10x", "max")
+MODIFIERS = ("ctrl", "shift", "alt", "win")
+
+DRAG_DISTANCE = 5  # Pixels between press and release that make a drag
+HOLD_SECONDS = 0.3  # A press held this long is a hold, not a click
+MULTI_CLICK_SECONDS = 0.4  # Clicks this close together on one spot merge into a multi-click
+MULTI_CLICK_DISTANCE = 3
+MIN_MOVE_DISTANCE = 10  # Recorded moves closer together than this are dropped
+MIN_MOVE_SECONDS = 0.05
+
+# pynput key names that differ from KEY_NAMES
+PYNPUT_KEYS = {"cmd": "win", "page_up": "pageup", "page_down": "pagedown", "caps_lock": "capslock"}
+
+
+def key_name(key):
+    """Return a pynput key as a KEY_NAMES name or character (None if unsupported)"""
+    char = getattr(key, "char", None)
+    if char:
+        return char.lower()
+    name = getattr(key, "name", None)
+    if not name:
+        return None
+    for suffix in ("_l", "_r", "_gr"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    name = PYNPUT_KEYS.get(name, name)
+    return name if name in KEY_NAMES else None
+
+
+class MacroBuilder:
+    """Turns raw input events into points and actions.
+
+    A press and release is a click, a hold (held HOLD_SECONDS or more) or a
+    drag (moved DRAG_DISTANCE or more); quick clicks on the same spot merge
+    into a multi-click. Key presses become key actions at the pointer, with
+    held modifiers folded into combos such as "ctrl+c". Pointer moves are
+    thinned out by distance and time, and a move straight before a press
+    there is dropped because the click moves the pointer anyway. Each
+    point's own delay is the time since the previous action finished,
+    capped at max_gap seconds if given (timing compression).
+    """
+
+    def __init__(self, record_moves=True, max_gap=None):
+        self.points = PointStore()
+        self.record_moves = record_moves
+        self.max_gap = max_gap
+        self.last_end = None
+        self.pointer = (0, 0)
+        self.pressed = {}
+        self.modifiers = []
+        self.last_move = None
+        self.pending_move = None
+        self.last_click = None  # (index, button, x, y, first press ns, count)
+        self.skipped = 0
+
+    def feed(self, events):
+        for event in events:
+            self.add(*event)
+        self.flush_move()
+        return self.points
+
+    def add(self, t, kind, x, y, detail):
+        if kind == MOVED:
+            self.pointer = (x, y)
+            if self.record_moves and not self.pressed:
+                self.move(t, x, y)
+        elif kind == PRESSED:
+            self.pointer = (x, y)
+            if self.pending_move and math.dist(self.pending_move[1:], (x, y)) < MIN_MOVE_DISTANCE:
+                self.pending_move = None
+            self.flush_move()
+            self.pressed[detail] = (t, x, y)
+        elif kind == RELEASED:
+            if detail in self.pressed:
+                self.release(t, x, y, detail)
+        elif kind == KEY_PRESSED:
+            if detail in MODIFIERS:
+                if detail not in self.modifiers:
+                    self.modifiers.append(detail)
+            elif detail is None or detail == "+" or (len(detail) != 1 and detail not in KEY_NAMES):
+                # "+" joins the keys of a combo, so it can't be one of them
+                self.skipped += 1
+            else:
+                self.flush_move()
+                self.last_click = None
+                self.point(t, t, *self.pointer, "left", Action(KEY, keys="+".join(self.modifiers + [detail]), gap=0))
+        elif kind == KEY_RELEASED and detail in self.modifiers:
+            self.modifiers.remove(detail)
+
+    def move(self, t, x, y):
+        # The latest position waits as pending_move until it is far enough
+        # (in space and time) from the last kept move, or something else happens
+        self.pending_move = (t, x, y)
+        last = self.last_move
+        if last is None or (math.dist(last[1:], (x, y)) >= MIN_MOVE_DISTANCE
+                            and t - last[0] >= MIN_MOVE_SECONDS * 1e9):
+            self.flush_move()
+
+    def flush_move(self):
+        if self.pending_move:
+            t, x, y = self.pending_move
+            self.pending_move = None
+            self.last_move = (t, x, y)
+            self.last_click = None
+            self.point(t, t, x, y, "left", Action(MOVE))
+
+    def release(self, t, x, y, button):
+        pressed_at, x0, y0 = self.pressed.pop(button)
+        held = min((t - pressed_at) / 1e9, MAX_ACTION_SECONDS)
+        self.pointer = (x, y)
+        if math.dist((x0, y0), (x, y)) >= DRAG_DISTANCE:
+            self.last_click = None
+            self.point(pressed_at, t, x0, y0, button, Action(DRAG, to=(x, y), duration=held))
+        elif held >= HOLD_SECONDS:
+            self.last_click = None
+            self.point(pressed_at, t, x0, y0, button, Action(HOLD, duration=held))
+        elif not self.merge_click(pressed_at, x0, y0, button):
+            index = self.point(pressed_at, pressed_at, x0, y0, button, None)
+            self.last_click = (index, button, x0, y0, pressed_at, 1)
+        self.last_move = (t, x, y)
+
+    def merge_click(self, t, x, y, button):
+        """Fold a click into the previous one as a multi-click; return True if merged"""
+        if self.last_click is None:
+            return False
+        index, last_button, last_x, last_y, first, count = self.last_click
+        if (button != last_button or count >= MAX_CLICK_COUNT
+                or math.dist((last_x, last_y), (x, y)) > MULTI_CLICK_DISTANCE
+                or t - self.last_end > MULTI_CLICK_SECONDS * 1e9):
+            return False
+        count += 1
+        gap = (t - first) / 1e9 / (count - 1)
+        self.points.set_action(index, Action(CLICK, count=count, gap=min(gap, MAX_ACTION_SECONDS)))
+        self.last_click = (index, button, last_x, last_y, first, count)
+        self.last_end = t
+        return True
+
+    def point(self, start, end, x, y, button, action):
+        delay = None
+        if self.last_end is not None:
+            delay = max(0.0, (start - self.last_end) / 1e9)
+            if self.max_gap is not None:
+                delay = min(delay, self.max_gap)
+        self.last_end = end
+        return self.points.append(x, y, delay, button, action)
+
+
+def build_points(events, record_moves=True, max_gap=None):
+    """Return the PointStore for a list of raw events (see MacroBuilder)"""
+    return MacroBuilder(record_moves, max_gap).feed(events)
+
+
+def parse_speed(text):
+    """Return the playback speed factor for "1x", "2.5x" or "max" (None)"""
+    text = str(text).strip().lower()
+    if text == "max":
+        return None
+    speed = float(text.rstrip("x"))
+    if speed <= 0:
+        raise ValueError("Playback speed must be positive")
+    return speed
+
+
+def retime(points, speed):
+    """Return a copy of points played speed times faster (None: no delays at all).
+
+    Action gaps and durations scale too, except at max speed, where only
+    the waits between points are removed.
+    """
+    store = PointStore()
+    for index, (x, y) in enumerate(points):
+        delay = points.delay(index)
+        action = points.action(index)
+        if delay is not None:
+            delay = 0.0 if speed is None else delay / speed
+        if action is not None and speed is not None:
+            action = Action(action.kind, action.count, action.gap / speed, action.duration / speed,
+                            action.to, action.keys, when=action.when)
+        store.append(x, y, delay, points.button(index), action)
+    return store
+
+
+class MacroRecorder:
+    """Records global mouse and keyboard input with perf_counter_ns timestamps.
+
+    Needs the optional pynput package. Listener callbacks run on pynput's
+    threads and only append to the event list; on_stop (if given) is called
+    from the listener thread when STOP_KEY is pressed.
+    """
+
+    def __init__(self, on_stop=None, clock=time.perf_counter_ns):
+        self.on_stop = on_stop
+        self.clock = clock
+        self.events = []
+        self.lock = threading.Lock()
+        self.listeners = []
+
+    @property
+    def recording(self):
+        return bool(self.listeners)
+
+    def start(self):
+        try:
+            from pynput import keyboard, mouse
+        except ImportError:
+            raise RuntimeError("Recording needs the pynput package (pip install pynput)")
+        self.events = []
+        self.listeners = [
+            mouse.Listener(on_move=self.on_move, on_click=self.on_click),
+            keyboard.Listener(on_press=self.on_press, on_release=self.on_release),
+        ]
+        for listener in self.listeners:
+            listener.start()
+
+    def stop(self, drop_last_click=False):
+        """Stop listening; return the events (without the final click if drop_last_click)"""
+        for listener in self.listeners:
+            listener.stop()
+        self.listeners = []
+        with self.lock:
+            events = list(self.events)
+        if drop_last_click:
+            # The click on the Stop button itself
+            kinds = [event[1] for event in events]
+            if PRESSED in kinds:
+                events = events[:len(kinds) - 1 - kinds[::-1].index(PRESSED)]
+        return events
+
+    def record(self, kind, x, y, detail):
+        with self.lock:
+            self.events.append((self.clock(), kind, x, y, detail))
+
+    def on_move(self, x, y):
+        self.record(MOVED, int(x), int(y), None)
+
+    def on_click(self, x, y, button, pressed):
+        if button.name in BUTTONS:
+            self.record(PRESSED if pressed else RELEASED, int(x), int(y), button.name)
+
+    def on_press(self, key):
+        name = key_name(key)
+        if name == STOP_KEY:
+            if self.on_stop:
+                self.on_stop()
+            return
+        self.record(KEY_PRESSED, None, None, name)
+
+    def on_release(self, key):
+        name = key_name(key)
+        if name != STOP_KEY:
+            self.record(KEY_RELEASED, None, None, name)
@@ -0,0 +1,221 @@
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from precision_timer import PrecisionScheduler
+
+# While waiting for a start time the wall clock is re-read at least this
+# often, so NTP corrections, DST changes and suspend/resume are picked up
+MAX_SLEEP = 60.0
+
+# The last stretch before a start time is timed on the monotonic clock
+FINAL_APPROACH = 1.0
+
+REPEAT_MODES = ("once", "daily", "every", "cron")
+
+MONTH_NAMES = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+WEEKDAY_NAMES = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+
+def parse_hhmm(text):
+    """Parse "HH:MM" into (hour, minute); empty text gives None"""
+    text = str(text or "").strip()
+    if not text:
+        return None
+    hour, _, minute = text.partition(":")
+    hour, minute = int(hour), int(minute or 0)
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"Invalid time {text!r}")
+    return hour, minute
+
+
+def parse_cron_field(text, low, high, names=None):
+    """Expand one cron field (*, a, a-b, */n, a-b/n, lists, names) to a sorted tuple"""
+    values = set()
+    for part in text.lower().split(","):
+        spec, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if spec == "*":
+            start, end = low, high
+        else:
+            first, _, last = spec.partition("-")
+            start = names.index(first) + low if names and first in names else int(first)
+            end = (names.index(last) + low if names and last in names else int(last)) if last else (
+                high if step > 1 else start)
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Invalid cron field {text!r}")
+        values.update(range(start, end + 1, step))
+    return tuple(sorted(values))
+
+
+class CronSchedule:
+    """Standard 5-field cron expression: minute hour day-of-month month day-of-week.
+
+    Each field is expanded once into a sorted tuple, so finding the next
+    fire time is a handful of bisect jumps rather than a minute-by-minute scan.
+    """
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes = parse_cron_field(fields[0], 0, 59)
+        self.hours = parse_cron_field(fields[1], 0, 23)
+        self.days = frozenset(parse_cron_field(fields[2], 1, 31))
+        self.months = parse_cron_field(fields[3], 1, 12, MONTH_NAMES)
+        # 7 is accepted as Sunday
+        self.weekdays = frozenset(day % 7 for day in parse_cron_field(fields[4], 0, 7, WEEKDAY_NAMES))
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def day_matches(self, day):
+        """Cron rule: if both day fields are restricted, either may match"""
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, after):
+        """Return the first matching minute strictly after `after` (None if never)"""
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        last_year = t.year + 8  # e.g. "0 0 30 2 *" never matches
+        while t.year <= last_year:
+            if t.month not in self.months:
+                i = bisect_left(self.months, t.month)
+                year = t.year if i < len(self.months) else t.year + 1
+                t = datetime(year, self.months[i % len(self.months)], 1)
+                continue
+            if not self.day_matches(t):
+                t = datetime(t.year, t.month, t.day) + timedelta(days=1)
+                continue
+            i = bisect_left(self.hours, t.hour)
+            if i == len(self.hours):
+                t = datetime(t.year, t.month, t.day) + timedelta(days=1)
+                continue
+            if self.hours[i] != t.hour:
+                t = t.replace(hour=self.hours[i], minute=0)
+            i = bisect_left(self.minutes, t.minute)
+            if i == len(self.minutes):
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            return t.replace(minute=self.minutes[i])
+        return None
+
+    def describe(self):
+        return f"cron '{self.expression}'"
+
+
+class IntervalSchedule:
+    """Every N minutes aligned to a start time, optionally only within a daily window"""
+
+    def __init__(self, minutes, start=(0, 0), end=None):
+        if minutes <= 0:
+            raise ValueError("Repeat interval must be positive")
+        if end is not None and end <= start:
+            raise ValueError("Window end must be after its start")
+        self.period = timedelta(minutes=minutes)
+        self.start = start
+        self.end = end
+
+    def next_after(self, after):
+        day = datetime(after.year, after.month, after.day)
+        while True:
+            window_start = day.replace(hour=self.start[0], minute=self.start[1])
+            if after < window_start and self.end is not None:
+                t = window_start
+            else:
+                t = window_start + self.period * ((after - window_start) // self.period + 1)
+            if self.end is None:
+                return t
+            if t <= day.replace(hour=self.end[0], minute=self.end[1]):
+                return t
+            day += timedelta(days=1)
+
+    def describe(self):
+        window = f" until {self.end[0]:02d}:{self.end[1]:02d}" if self.end else ""
+        return f"every {self.period.total_seconds() / 60:g} min from {self.start[0]:02d}:{self.start[1]:02d}{window}"
+
+
+class Schedule:
+    """When a scheduled job runs: start times from a trigger plus a limit on each run"""
+
+    def __init__(self, trigger, repeat=False, duration=None, stop_at=None):
+        self.trigger = trigger
+        self.repeat = repeat
+        self.duration = duration
+        self.stop_at = stop_at
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a schedule from the GUI settings (hour, minute, schedule_repeat, ...)"""
+        repeat = data.get("schedule_repeat", "once")
+        if repeat not in REPEAT_MODES:
+            raise ValueError(f"Unknown repeat mode {repeat!r}")
+        hour, minute = int(data.get("hour", 20)), int(data.get("minute", 0))
+        value = str(data.get("schedule_value", "")).strip()
+        stop_at = parse_hhmm(data.get("stop_at"))
+        run_for = float(data.get("run_for") or 0)
+        if run_for < 0:
+            raise ValueError("Run time must be positive")
+        if repeat == "cron":
+            trigger = CronSchedule(value)
+        elif repeat == "every":
+            # For interval repeats the stop time closes the daily window
+            trigger = IntervalSchedule(float(value or 0), (hour, minute), stop_at)
+        else:
+            trigger = CronSchedule(f"{minute} {hour} * * *")
+        return cls(trigger, repeat=repeat != "once", duration=run_for * 60 or None, stop_at=stop_at)
+
+    def next_run(self, after):
+        """Return (start, max_duration_seconds or None) for the next run, or None"""
+        start = self.trigger.next_after(after)
+        if start is None:
+            return None
+        duration = self.duration
+        if self.stop_at is not None:
+            stop = start.replace(hour=self.stop_at[0], minute=self.stop_at[1])
+            if stop <= start:
+                stop += timedelta(days=1)
+            until_stop = (stop - start).total_seconds()
+            duration = min(duration, until_stop) if duration else until_stop
+        return start, duration
+
+    def upcoming(self, after, count=3):
+        """Return the next count start times"""
+        times = []
+        while len(times) < count:
+            after = self.trigger.next_after(after)
+            if after is None:
+                break
+            times.append(after)
+            if not self.repeat:
+                break
+        return times
+
+    def describe(self):
+        text = self.trigger.describe() if self.repeat else "once"
+        if self.duration:
+            text += f", {self.duration / 60:g} min per run"
+        if self.stop_at and not isinstance(self.trigger, IntervalSchedule):
+            text += f", stop at {self.stop_at[0]:02d}:{self.stop_at[1]:02d}"
+        return text
+
+
+def wait_until(when, stop_event, max_sleep=MAX_SLEEP):
+    """Block until the local datetime `when`; return False if stop_event was set.
+
+    Sleeps on stop_event (no CPU, instant wake on stop) in chunks of at most
+    max_sleep so wall clock changes are noticed, then times the final
+    approach on the monotonic clock with a PrecisionScheduler.
+    """
+    target = when.timestamp()
+    while True:
+        remaining = target - time.time()
+        if remaining <= FINAL_APPROACH:
+            break
+        if stop_event.wait(min(remaining - FINAL_APPROACH, max_sleep)):
+            return False
+    deadline = time.perf_counter_ns() + max(0, int(remaining * 1e9))
+    return PrecisionScheduler(stop_event).wait_until(deadline)
@@ -0,0 +1,299 @@
+"""Screen capture for conditional clicks: frames, screen sources and matching.
+
+Frames are RGB bytes for one region of the screen. A screen source grabs
+them: PillowScreen from the real display (Pillow's ImageGrab), or
+SyntheticScreen from an in-memory picture, so conditions can be tested
+without a display. CaptureCache sits in front of a source and serves
+every region inside a recent grab from that grab. Exact template matches
+need nothing extra; matching with a tolerance uses NumPy.
+"""
+import time
+
+SCREEN_NAMES = ("auto", "pillow")
+
+CAPTURE_TTL = 0.05  # Seconds a grab answers the regions inside it
+MAX_SHARED_AREA = 1920 * 1080  # Largest watched box grabbed in one go for the cache
+
+
+def load_numpy():
+    """Return the numpy module, or None if it isn't installed"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def parse_color(color):
+    """Return an (r, g, b) tuple for "#rrggbb" or [r, g, b]"""
+    if isinstance(color, str):
+        text = color.strip().lstrip("#")
+        if len(text) != 6:
+            raise ValueError(f"Colors are #rrggbb, got {color!r}")
+        try:
+            return tuple(int(text[index:index + 2], 16) for index in (0, 2, 4))
+        except ValueError:
+            raise ValueError(f"Colors are #rrggbb, got {color!r}")
+    rgb = tuple(int(value) for value in color)
+    if len(rgb) != 3 or not all(0 <= value <= 255 for value in rgb):
+        raise ValueError(f"Colors are [r, g, b] with values 0-255, got {color!r}")
+    return rgb
+
+
+def format_color(rgb):
+    return "#%02x%02x%02x" % tuple(rgb)
+
+
+def color_matches(rgb, color, tolerance=0):
+    """Return True if every channel of rgb is within tolerance of color"""
+    return all(abs(a - b) <= tolerance for a, b in zip(rgb, color))
+
+
+def contains(outer, inner):
+    """Return True if region outer (left, top, width, height; None: everything) covers inner"""
+    if outer is None:
+        return True
+    if inner is None:
+        return False
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and inner[0] + inner[2] <= outer[0] + outer[2] and inner[1] + inner[3] <= outer[1] + outer[3])
+
+
+def bounding_box(regions):
+    """Return the smallest region covering all regions (None if any is the whole screen)"""
+    if any(region is None for region in regions):
+        return None
+    left = min(region[0] for region in regions)
+    top = min(region[1] for region in regions)
+    right = max(region[0] + region[2] for region in regions)
+    bottom = max(region[1] + region[3] for region in regions)
+    return left, top, right - left, bottom - top
+
+
+class Frame:
+    """RGB pixels of a screen region, rows top to bottom (3 bytes a pixel).
+
+    left/top place the frame on the screen; pixel() and crop() take
+    screen coordinates.
+    """
+
+    def __init__(self, left, top, width, height, data):
+        if len(data) != width * height * 3:
+            raise ValueError(f"Frame data is {len(data)} bytes, expected {width * height * 3}")
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.data = data
+        self.spectra = {}  # FFTs of this frame as a template, by search size
+
+    @classmethod
+    def from_image(cls, image, left=0, top=0):
+        """Build a frame from a Pillow image"""
+        image = image.convert("RGB")
+        return cls(left, top, image.width, image.height, image.tobytes())
+
+    @property
+    def region(self):
+        return self.left, self.top, self.width, self.height
+
+    def pixel(self, x, y):
+        x -= self.left
+        y -= self.top
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise ValueError(f"Pixel ({x + self.left}, {y + self.top}) is outside the captured region")
+        offset = (y * self.width + x) * 3
+        return tuple(self.data[offset:offset + 3])
+
+    def crop(self, region):
+        """Return the part of the frame in region (left, top, width, height)"""
+        if region is None or region == self.region:
+            return self
+        if not contains(self.region, region):
+            raise ValueError(f"Region {region} is outside the captured region {self.region}")
+        left, top, width, height = region
+        x = (left - self.left) * 3
+        stride = self.width * 3
+        data = bytearray()
+        for row in range(top - self.top, top - self.top + height):
+            start = row * stride + x
+            data += self.data[start:start + width * 3]
+        return Frame(left, top, width, height, bytes(data))
+
+    def to_array(self):
+        """Return the pixels as a (height, width, 3) uint8 NumPy array (no copy)"""
+        numpy = load_numpy()
+        if numpy is None:
+            raise RuntimeError("NumPy is not installed (pip install numpy)")
+        return numpy.frombuffer(self.data, dtype=numpy.uint8).reshape(self.height, self.width, 3)
+
+
+class PillowScreen:
+    """Grabs regions of the real screen with Pillow's ImageGrab"""
+
+    def __init__(self):
+        try:
+            from PIL import ImageGrab
+        except ImportError:
+            raise RuntimeError("Screen capture needs the Pillow package (pip install pillow)")
+        self.image_grab = ImageGrab
+
+    def grab(self, region=None):
+        """Return a Frame of region (left, top, width, height), or of the whole screen"""
+        if region is None:
+            return Frame.from_image(self.image_grab.grab(all_screens=True))
+        left, top, width, height = region
+        image = self.image_grab.grab(bbox=(left, top, left + width, top + height), all_screens=True)
+        return Frame.from_image(image, left, top)
+
+
+class SyntheticScreen:
+    """An in-memory screen for tests and benchmarks: draw on it, then grab regions"""
+
+    def __init__(self, width, height, color=(0, 0, 0)):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(bytes(parse_color(color)) * (width * height))
+        self.grabs = 0
+
+    def fill(self, region, color):
+        left, top, width, height = region
+        row = bytes(parse_color(color)) * width
+        for y in range(top, top + height):
+            offset = (y * self.width + left) * 3
+            self.pixels[offset:offset + len(row)] = row
+
+    def paste(self, frame, x, y):
+        """Draw a Frame (e.g. a template) with its top-left corner at x, y"""
+        stride = frame.width * 3
+        for row in range(frame.height):
+            offset = ((y + row) * self.width + x) * 3
+            self.pixels[offset:offset + stride] = frame.data[row * stride:(row + 1) * stride]
+
+    def grab(self, region=None):
+        self.grabs += 1
+        frame = Frame(0, 0, self.width, self.height, bytes(self.pixels))
+        return frame.crop(region) if region is not None else frame
+
+
+def create_screen(name="auto"):
+    """Return a screen source by name ("auto" and "pillow" grab the real screen)"""
+    if name not in SCREEN_NAMES:
+        raise ValueError(f"Unknown screen source {name!r} (choose from {', '.join(SCREEN_NAMES)})")
+    return PillowScreen()
+
+
+class CaptureCache:
+    """Serves screen regions from a grab made less than ttl seconds ago.
+
+    Regions registered with watch() (every condition of a job) are grabbed
+    together as their bounding box when it is at most MAX_SHARED_AREA
+    pixels, so all points checking the screen within one ttl share a
+    single capture instead of grabbing one by one.
+    """
+
+    def __init__(self, source, ttl=CAPTURE_TTL, clock=time.monotonic):
+        self.source = source
+        self.ttl = ttl
+        self.clock = clock
+        self.frame = None
+        self.captured_at = None
+        self.watched = []
+        self.shared = False
+        self.shared_region = None
+
+    def watch(self, region):
+        """Register a region that conditions will check"""
+        self.watched.append(region)
+        box = bounding_box(self.watched)
+        self.shared = box is None or box[2] * box[3] <= MAX_SHARED_AREA
+        self.shared_region = box
+
+    def grab(self, region=None, fresh=False):
+        """Return a Frame of region, from the cached grab if it is recent and covers it"""
+        now = self.clock()
+        if (not fresh and self.frame is not None and now - self.captured_at < self.ttl
+                and contains(self.frame.region, region)):
+            return self.frame.crop(region)
+        shared = self.shared and contains(self.shared_region, region)
+        self.frame = self.source.grab(self.shared_region if shared else region)
+        self.captured_at = now
+        return self.frame.crop(region)
+
+    def clear(self):
+        self.frame = None
+
+
+def find_template(frame, template, tolerance=0):
+    """Return the screen position of template's top-left corner in frame, or None.
+
+    Exact matches (tolerance 0) are found with a byte search. Otherwise
+    the best match wins if its RMS color difference is at most tolerance
+    (0-255); NumPy computes the sum of squared differences for every
+    position at once with FFTs.
+    """
+    if template.width > frame.width or template.height > frame.height:
+        return None
+    if not tolerance:
+        return _find_exact(frame, template)
+    numpy = load_numpy()
+    if numpy is None:
+        raise RuntimeError("Template matching with a tolerance needs NumPy (pip install numpy)")
+
+    image = frame.to_array().astype(numpy.float64)
+    pattern = template.to_array().astype(numpy.float64)
+    height, width = template.height, template.width
+    rows, columns = frame.height - height + 1, frame.width - width + 1
+    # SSD(y, x) = sum(I^2 over the window) - 2 * correlation(I, T) + sum(T^2)
+    squares = (image ** 2).sum(axis=2)
+    integral = numpy.zeros((frame.height + 1, frame.width + 1))
+    integral[1:, 1:] = squares.cumsum(axis=0).cumsum(axis=1)
+    window = (integral[height:, width:] - integral[:-height, width:]
+              - integral[height:, :-width] + integral[:-height, :-width])
+    shape = (frame.height, frame.width)
+    # Correlations add up across channels, so one inverse FFT covers all three
+    spectra = numpy.fft.rfft2(image, shape, axes=(0, 1))
+    kernels = template.spectra.get(shape)
+    if kernels is None:
+        # Polling the same region reuses the template's FFT
+        kernels = template.spectra[shape] = numpy.conj(numpy.fft.rfft2(pattern, shape, axes=(0, 1)))
+    correlation = numpy.fft.irfft2((spectra * kernels).sum(axis=2), shape)
+    ssd = window[:rows, :columns] - 2 * correlation[:rows, :columns] + (pattern ** 2).sum()
+    index = int(numpy.argmin(ssd))
+    y, x = divmod(index, columns)
+    rms = (max(float(ssd[y, x]), 0.0) / (width * height * 3)) ** 0.5
+    if rms > tolerance + 1e-6:
+        return None
+    return frame.left + x, frame.top + y
+
+
+def _find_exact(frame, template):
+    # Find the template's first row with bytes.find, then compare the rest
+    stride = frame.width * 3
+    row_bytes = template.width * 3
+    rows = [template.data[row * row_bytes:(row + 1) * row_bytes] for row in range(template.height)]
+    data = frame.data
+    start = 0
+    while True:
+        offset = data.find(rows[0], start)
+        if offset < 0:
+            return None
+        start = offset + 1
+        if offset % 3:
+            continue
+        y, x = divmod(offset // 3, frame.width)
+        if x + template.width > frame.width or y + template.height > frame.height:
+            continue
+        if all(data[offset + row * stride:offset + row * stride + row_bytes] == rows[row]
+               for row in range(1, template.height)):
+            return frame.left + x, frame.top + y
+
+
+def load_image(path):
+    """Load a template image file as a Frame (needs Pillow)"""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError("Image templates need the Pillow package (pip install pillow)")
+    with Image.open(path) as image:
+        return Frame.from_image(image)
@@ -0,0 +1,138 @@
+"""Waiting for a screen region to change or settle, without comparing whole frames.
+
+A region is summarised as the average color of each block (BLOCK_SIZE
+pixels square), a small perceptual hash that ignores single-pixel noise
+and compression dither. Comparing against a baseline stops at the first
+block that differs, so a change is usually spotted after hashing part of
+the frame. ChangeDetector polls fast while the region is moving and backs
+off while it is quiet, never spending more than a fraction of the time
+capturing.
+"""
+import time
+
+from screen import load_numpy
+
+BLOCK_SIZE = 16  # Pixels per block side
+BLOCK_TOLERANCE = 8  # Average channel difference that counts as a changed block
+MIN_POLL = 0.01  # Seconds between captures right after a change
+MAX_POLL = 0.2  # Slowest polling while nothing happens
+POLL_BACKOFF = 1.5  # Poll interval growth per quiet capture
+MAX_CAPTURE_SHARE = 0.5  # Polling never spends more than this share of the time capturing
+
+
+class BlockHasher:
+    """Block-average signatures of frames"""
+
+    def __init__(self, block=BLOCK_SIZE, tolerance=BLOCK_TOLERANCE):
+        if block <= 0:
+            raise ValueError("Block size must be positive")
+        self.block = int(block)
+        self.tolerance = tolerance
+
+    def blocks(self, frame):
+        """Yield the (r, g, b) average of each block, row by row"""
+        block = self.block
+        data = frame.data
+        stride = frame.width * 3
+        for top in range(0, frame.height, block):
+            rows = range(top, min(top + block, frame.height))
+            for left in range(0, frame.width, block):
+                width = min(block, frame.width - left)
+                red = green = blue = 0
+                for row in rows:
+                    start = row * stride + left * 3
+                    end = start + width * 3
+                    red += sum(data[start:end:3])
+                    green += sum(data[start + 1:end:3])
+                    blue += sum(data[start + 2:end:3])
+                count = width * len(rows)
+                yield red / count, green / count, blue / count
+
+    def signature(self, frame):
+        """Return the block averages of a frame (vectorized with NumPy when available)"""
+        numpy = load_numpy()
+        if numpy is None:
+            return list(self.blocks(frame))
+        pixels = frame.to_array().astype(numpy.float64)
+        row_starts = numpy.arange(0, frame.height, self.block)
+        column_starts = numpy.arange(0, frame.width, self.block)
+        sums = numpy.add.reduceat(numpy.add.reduceat(pixels, row_starts, axis=0), column_starts, axis=1)
+        heights = numpy.minimum(self.block, frame.height - row_starts)
+        widths = numpy.minimum(self.block, frame.width - column_starts)
+        averages = sums / (heights[:, None] * widths[None, :])[:, :, None]
+        return [tuple(block) for block in averages.reshape(-1, 3).tolist()]
+
+    def block_differs(self, a, b):
+        tolerance = self.tolerance
+        return abs(a[0] - b[0]) > tolerance or abs(a[1] - b[1]) > tolerance or abs(a[2] - b[2]) > tolerance
+
+    def differs(self, baseline, frame):
+        """Return True if any block of frame differs from the baseline signature.
+
+        Blocks are hashed one at a time and the first difference ends the
+        comparison, so an early change costs only part of the frame.
+        """
+        if len(baseline) != self.count(frame):
+            return True
+        block_differs = self.block_differs
+        return any(block_differs(a, b) for a, b in zip(baseline, self.blocks(frame)))
+
+    def count(self, frame):
+        return -(-frame.width // self.block) * -(-frame.height // self.block)
+
+
+class ChangeDetector:
+    """Polls a screen region through a CaptureCache until it changes or settles.
+
+    changed() compares each fresh capture with the first one; settled()
+    reports True once no block has changed for settle seconds. poll is
+    the time to wait before the next check: MIN_POLL after a change,
+    growing by POLL_BACKOFF up to max_poll while nothing happens, and
+    never less than the capture itself took divided by MAX_CAPTURE_SHARE.
+    """
+
+    def __init__(self, capture, region, hasher=None, min_poll=MIN_POLL, max_poll=MAX_POLL,
+                 clock=time.monotonic):
+        self.capture = capture
+        self.region = region
+        self.hasher = hasher or BlockHasher()
+        self.min_poll = min_poll
+        self.max_poll = max(min_poll, max_poll)
+        self.clock = clock
+        self.poll = min_poll
+        self.captures = 0
+        started = clock()
+        self.baseline = self.hasher.signature(self._grab())
+        self.last_change = started
+        self._adapt(False, clock() - started)
+
+    def _grab(self):
+        self.captures += 1
+        return self.capture.grab(self.region, fresh=True)
+
+    def _adapt(self, changed, cost):
+        self.poll = self.min_poll if changed else min(self.max_poll, self.poll * POLL_BACKOFF)
+        self.poll = max(self.poll, cost / MAX_CAPTURE_SHARE)
+
+    def changed(self):
+        """Return True if the region differs from how it looked at the start"""
+        started = self.clock()
+        changed = self.hasher.differs(self.baseline, self._grab())
+        self._adapt(changed, self.clock() - started)
+        return changed
+
+    def settled(self, settle):
+        """Return True once the region has not changed for settle seconds"""
+        started = self.clock()
+        signature = self.hasher.signature(self._grab())
+        hasher = self.hasher
+        changed = len(signature) != len(self.baseline) or any(
+            hasher.block_differs(a, b) for a, b in zip(self.baseline, signature))
+        now = self.clock()
+        if changed:
+            self.baseline = signature
+            self.last_change = now
+        self._adapt(changed, now - started)
+        # Check again right when the quiet period would be over
+        self.poll = max(min(self.poll, settle - (now - self.last_change)), self.min_poll)
+        return not changed and now - self.last_change >= settle
@@ -0,0 +1,145 @@
+"""Startup benchmark: python startup_benchmark.py [--runs N] [--output FILE] [--budget-import MS] [--budget-frame MS]
+
+Measures cold start in fresh interpreters:
+- import: `python -X importtime -c "import main"`. This reports the total
+  import time and the slowest top-level imports, so a new heavy import
+  shows up by name.
+- first frame: starts the GUI and records the time from process launch
+  until the window is first drawn, then until the deferred startup work
+  (settings, last profile, stop sources) has run. This needs a display
+  and is skipped without one.
+
+The GUI runs in a temporary directory with its own profile library, so
+your settings, log and profiles are not touched. Results are printed as
+JSON (medians over --runs). The exit code is 1 if a median exceeds its
+budget, so cold start can be checked in CI as features are added.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_BUDGET_MS = 150.0  # Median time to import main
+FRAME_BUDGET_MS = 600.0  # Median time from launch to the first drawn frame
+
+# Runs in the child: start the app, note when the window is first drawn
+# and when the deferred startup work is done, then quit
+FRAME_SCRIPT = """
+import json, sys, time
+import tkinter as tk
+import main
+try:
+    root = tk.Tk()
+except tk.TclError as e:
+    print(json.dumps({"error": str(e)}))
+    sys.exit(0)
+times = {}
+root.bind("<Expose>", lambda event: times.setdefault("frame", time.time()), add="+")
+app = main.AutoClickerApp(root)
+times["init"] = time.time()
+deadline = time.monotonic() + 10
+while "frame" not in times and time.monotonic() < deadline:
+    root.update()
+root.update()
+times["ready"] = time.time()
+app.close_services()
+root.destroy()
+print(json.dumps(times))
+"""
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us, depth)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # The header line
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def bench_import(runs):
+    totals = []
+    children = {}
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=HERE,
+                                capture_output=True, text=True, check=True)
+        modules = parse_importtime(result.stderr)
+        totals.append(modules["main"][1] / 1000)
+        # Imports made directly by main (and everything below them)
+        for name, (_, cumulative_us, depth) in modules.items():
+            if depth == 1:
+                children.setdefault(name, []).append(cumulative_us / 1000)
+    slowest = sorted(((statistics.median(values), name) for name, values in children.items()), reverse=True)
+    return {"main_ms": round(statistics.median(totals), 2),
+            "slowest_imports_ms": {name: round(ms, 2) for ms, name in slowest[:10]}}
+
+
+def bench_first_frame(runs):
+    frames, ready = [], []
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, PYTHONPATH=HERE + os.pathsep + os.environ.get("PYTHONPATH", ""),
+                   AUTOCLICKER_PROFILES=os.path.join(directory, "profiles.db"))
+        for _ in range(runs):
+            launched = time.time()
+            result = subprocess.run([sys.executable, "-c", FRAME_SCRIPT], cwd=directory, env=env,
+                                    capture_output=True, text=True, timeout=60)
+            if result.returncode != 0:
+                return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+            times = json.loads(result.stdout.strip().splitlines()[-1])
+            if "error" in times:
+                return {"skipped": times["error"]}
+            if "frame" not in times:
+                return {"error": "the window was not drawn within 10 s"}
+            frames.append((times["frame"] - launched) * 1000)
+            ready.append((times["ready"] - launched) * 1000)
+    return {"first_frame_ms": round(statistics.median(frames), 1), "ready_ms": round(statistics.median(ready), 1)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Auto Clicker startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--budget-import", type=float, default=IMPORT_BUDGET_MS,
+                        help="Median import time allowed for main.py (ms)")
+    parser.add_argument("--budget-frame", type=float, default=FRAME_BUDGET_MS,
+                        help="Median launch-to-first-frame time allowed (ms)")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "runs": args.runs,
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "import": bench_import(args.runs),
+        "first_frame": bench_first_frame(args.runs),
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    over = []
+    if results["import"]["main_ms"] > args.budget_import:
+        over.append(f"import main: {results['import']['main_ms']:.1f} ms > {args.budget_import:g} ms")
+    frame_ms = results["first_frame"].get("first_frame_ms")
+    if frame_ms is not None and frame_ms > args.budget_frame:
+        over.append(f"first frame: {frame_ms:.1f} ms > {args.budget_frame:g} ms")
+    for line in over:
+        print(f"OVER BUDGET {line}", file=sys.stderr)
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+import ctypes
+import os
+import select
+import struct
+import sys
+import threading
+
+STOP_FILE = "EMERGENCY_STOP"
+
+
+class StopSignal(threading.Event):
+    """threading.Event that remembers why it was set"""
+
+    def __init__(self):
+        super().__init__()
+        self.reason = None
+        self.listeners = []
+
+    def subscribe(self, callback):
+        """Call callback(reason) whenever the signal is triggered"""
+        self.listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stop calling a subscribed callback"""
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def trigger(self, reason="stop requested"):
+        """Set the signal (the first reason wins)"""
+        if not self.is_set():
+            self.reason = reason
+            self.set()
+            for callback in list(self.listeners):
+                callback(reason)
+
+    def clear(self):
+        self.reason = None
+        super().clear()
+
+
+class PollingStopFileWatcher:
+    """Fallback watcher: checks for the stop file every poll_interval seconds"""
+
+    def __init__(self, path=STOP_FILE, poll_interval=0.1):
+        self.path = os.path.abspath(path)
+        self.poll_interval = poll_interval
+        self.halt = None
+        self.thread = None
+
+    def start(self, on_trigger):
+        # A fresh Event per run: a thread still finishing the last run keeps its own (set) one
+        self.halt = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(on_trigger, self.halt),
+                                       name="stop-file-poll", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.halt:
+            self.halt.set()
+
+    def _run(self, on_trigger, halt):
+        while True:
+            if consume_stop_file(self.path):
+                on_trigger("emergency stop file")
+                return
+            if halt.wait(self.poll_interval):
+                return
+
+
+class InotifyStopFileWatcher:
+    """Linux watcher: blocks on inotify until the stop file is created"""
+
+    IN_CREATE = 0x100
+    IN_MOVED_TO = 0x80
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, path=STOP_FILE):
+        self.path = os.path.abspath(path)
+        # The interpreter's own symbols include libc (no find_library/ldconfig lookup)
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.libc.inotify_init1  # AttributeError here means no inotify support
+        self.wake_pipe = None
+        self.thread = None
+        self.fallback = None
+
+    def start(self, on_trigger):
+        fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        directory = os.path.dirname(self.path).encode()
+        if fd < 0 or self.libc.inotify_add_watch(fd, directory, self.IN_CREATE | self.IN_MOVED_TO) < 0:
+            # e.g. out of inotify watches - degrade to polling rather than fail
+            if fd >= 0:
+                os.close(fd)
+            self.fallback = PollingStopFileWatcher(self.path)
+            self.fallback.start(on_trigger)
+            return
+        self.wake_pipe = os.pipe()
+        self.thread = threading.Thread(target=self._run, args=(fd, self.wake_pipe[0], on_trigger),
+                                       name="stop-file-inotify", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.fallback:
+            self.fallback.stop()
+            self.fallback = None
+        if self.wake_pipe:
+            try:
+                os.write(self.wake_pipe[1], b"x")
+            except OSError:
+                pass  # Watcher thread already exited after triggering
+            os.close(self.wake_pipe[1])
+            self.wake_pipe = None
+
+    def _run(self, fd, wake_fd, on_trigger):
+        name = os.path.basename(self.path).encode()
+        try:
+            # The file may already exist (left over, or created before we started)
+            if consume_stop_file(self.path):
+                on_trigger("emergency stop file")
+                return
+            while True:
+                readable, _, _ = select.select([fd, wake_fd], [], [])
+                if wake_fd in readable:
+                    return
+                data = os.read(fd, 4096)
+                offset = 0
+                while offset < len(data):
+                    _, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                    offset += self.EVENT_HEADER.size
+                    event_name = data[offset:offset + length].rstrip(b"\0")
+                    offset += length
+                    if event_name == name and consume_stop_file(self.path):
+                        on_trigger("emergency stop file")
+                        return
+        finally:
+            os.close(fd)
+            os.close(wake_fd)
+
+
+def consume_stop_file(path):
+    """Return True (and delete the file) if the stop file exists"""
+    if not os.path.exists(path):
+        return False
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return True
+
+
+def create_stop_file_watcher(path=STOP_FILE):
+    """Return an inotify watcher where available, else a polling one"""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyStopFileWatcher(path)
+        except (OSError, AttributeError):
+            pass
+    return PollingStopFileWatcher(path)
+
+
+class NullHotkeyBackend:
+    """No global hotkeys (e.g. Linux test machines); Tk key bindings still apply"""
+
+    def start(self, on_trigger):
+        pass
+
+    def stop(self):
+        pass
+
+
+class SimulatedHotkeyBackend:
+    """Hotkey backend driven by code, for tests and benchmarks"""
+
+    def __init__(self):
+        self.on_trigger = None
+
+    def start(self, on_trigger):
+        self.on_trigger = on_trigger
+
+    def stop(self):
+        self.on_trigger = None
+
+    def press(self, name="ESC"):
+        """Simulate a global hotkey press"""
+        if self.on_trigger:
+            self.on_trigger(f"{name} hotkey")
+
+
+class WindowsHotkeyBackend:
+    """System-wide ESC / F12 / Ctrl+C via a low-level keyboard hook and a message loop thread.
+
+    The hook only watches: every key is passed on with CallNextHookEx, so
+    other applications still receive ESC, F12 and Ctrl+C (RegisterHotKey
+    would swallow them). Keys injected by software, such as this app's own
+    key actions, are ignored.
+    """
+
+    WH_KEYBOARD_LL = 13
+    HC_ACTION = 0
+    WM_KEYDOWN = 0x0100
+    WM_KEYUP = 0x0101
+    WM_SYSKEYDOWN = 0x0104
+    WM_SYSKEYUP = 0x0105
+    WM_QUIT = 0x0012
+    LLKHF_INJECTED = 0x10
+    VK_CONTROL = 0x11
+    VK_C = 0x43
+    HOTKEYS = {0x1B: "ESC", 0x7B: "F12", VK_C: "Ctrl+C"}  # C only counts with Ctrl held
+
+    def __init__(self):
+        from ctypes import wintypes
+
+        class KBDLLHOOKSTRUCT(ctypes.Structure):
+            _fields_ = [("vkCode", wintypes.DWORD), ("scanCode", wintypes.DWORD), ("flags", wintypes.DWORD),
+                        ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+        self.wintypes = wintypes
+        self.event_pointer = ctypes.POINTER(KBDLLHOOKSTRUCT)
+        self.hook_type = ctypes.WINFUNCTYPE(wintypes.LPARAM, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+        # Private instances, so the signatures set here don't leak into other ctypes users
+        self.user32 = ctypes.WinDLL("user32")
+        self.kernel32 = ctypes.WinDLL("kernel32")
+        self.user32.SetWindowsHookExW.argtypes = (ctypes.c_int, self.hook_type, wintypes.HINSTANCE, wintypes.DWORD)
+        self.user32.SetWindowsHookExW.restype = wintypes.HHOOK
+        self.user32.CallNextHookEx.argtypes = (wintypes.HHOOK, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+        self.user32.CallNextHookEx.restype = wintypes.LPARAM
+        self.user32.UnhookWindowsHookEx.argtypes = (wintypes.HHOOK,)
+        self.user32.GetAsyncKeyState.restype = ctypes.c_short
+        self.kernel32.GetModuleHandleW.argtypes = (wintypes.LPCWSTR,)
+        self.kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+        self.thread = None
+        self.thread_id = None
+        self.ready = threading.Event()
+
+    def start(self, on_trigger):
+        self.ready.clear()
+        self.thread = threading.Thread(target=self._run, args=(on_trigger,),
+                                       name="stop-hotkeys", daemon=True)
+        self.thread.start()
+        self.ready.wait(1.0)
+
+    def stop(self):
+        if self.thread_id:
+            self.user32.PostThreadMessageW(self.thread_id, self.WM_QUIT, 0, 0)
+            self.thread_id = None
+
+    def _run(self, on_trigger):
+        # The hook is called on the installing thread, so install and pump here
+        self.thread_id = self.kernel32.GetCurrentThreadId()
+        held = set()  # Keys down, so auto-repeat fires once per press
+
+        def on_key(code, wparam, lparam):
+            # Runs for every key on the system: keep it short and always pass the key on
+            if code == self.HC_ACTION:
+                event = ctypes.cast(lparam, self.event_pointer).contents
+                vk = event.vkCode
+                if wparam in (self.WM_KEYUP, self.WM_SYSKEYUP):
+                    held.discard(vk)
+                elif (wparam in (self.WM_KEYDOWN, self.WM_SYSKEYDOWN) and vk in self.HOTKEYS
+                      and vk not in held and not event.flags & self.LLKHF_INJECTED):
+                    held.add(vk)
+                    if vk != self.VK_C or self.user32.GetAsyncKeyState(self.VK_CONTROL) & 0x8000:
+                        on_trigger(f"{self.HOTKEYS[vk]} hotkey")
+            return self.user32.CallNextHookEx(None, code, wparam, lparam)
+
+        callback = self.hook_type(on_key)  # Must stay referenced while the hook is installed
+        hook = self.user32.SetWindowsHookExW(self.WH_KEYBOARD_LL, callback, self.kernel32.GetModuleHandleW(None), 0)
+        self.ready.set()
+        if not hook:
+            return
+        msg = self.wintypes.MSG()
+        try:
+            while self.user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                pass
+        finally:
+            self.user32.UnhookWindowsHookEx(hook)
+
+
+def default_hotkey_backend():
+    """Return the global hotkey backend for this platform"""
+    if sys.platform == "win32":
+        try:
+            return WindowsHotkeyBackend()
+        except (AttributeError, OSError):
+            pass
+    return NullHotkeyBackend()
+
+
+class MouseCornerWatcher:
+    """Stops when the mouse reaches the top-left corner (polled - there is no event for it)"""
+
+    def __init__(self, position, poll_interval=0.05, margin=5):
+        self.position = position
+        self.poll_interval = poll_interval
+        self.margin = margin
+        self.halt = None
+
+    def start(self, on_trigger):
+        self.halt = threading.Event()  # Per run, like PollingStopFileWatcher
+        threading.Thread(target=self._run, args=(on_trigger, self.halt),
+                         name="stop-mouse-corner", daemon=True).start()
+
+    def stop(self):
+        if self.halt:
+            self.halt.set()
+
+    def _run(self, on_trigger, halt):
+        while not halt.wait(self.poll_interval):
+            try:
+                mouse_x, mouse_y = self.position()
+            except Exception:
+                continue
+            if mouse_x <= self.margin and mouse_y <= self.margin:
+                on_trigger("mouse moved to corner")
+                return
+
+
+class StopMonitor:
+    """Runs stop sources only while a job is active and routes them to a StopSignal"""
+
+    def __init__(self, signal, sources, on_trigger=None):
+        self.signal = signal
+        self.sources = list(sources)
+        self.on_trigger = on_trigger
+        self.active = False
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Arm all stop sources for a new job"""
+        with self.lock:
+            if self.active:
+                return
+            self.active = True
+            for source in self.sources:
+                source.start(self._fire)
+
+    def stop(self):
+        """Disarm all stop sources (job finished or stopped)"""
+        with self.lock:
+            if not self.active:
+                return
+            self.active = False
+            for source in self.sources:
+                source.stop()
+
+    def _fire(self, reason):
+        self.signal.trigger(reason)
+        if self.on_trigger:
+            self.on_trigger(reason)
@@ -0,0 +1,172 @@
+"""Main-thread dispatch of GUI updates posted from any thread.
+
+Worker threads never touch Tk widgets: they post() a change under a key
+and the dispatcher applies it on the main thread, at most max_rate times
+a second. Posts under the same key coalesce, so only the latest status,
+click counter or clock value survives to the next frame; call() queues
+one-off callbacks that all run, in order. A burst of posts costs one
+wakeup of the Tk event loop.
+
+Periodic timers (the clock, focus keeping, live panels) run through
+every(). A timer is dropped when its active() check says there is
+nothing to do, and all of them stop while the window is minimized;
+resume() (and restoring the window) starts them again. A timer's
+interval may be a function, so the clock can tick once a minute while
+the app is idle: an idle, visible app wakes once a minute, a minimized
+one not at all. While minimized, posts are kept and applied when the
+window is shown again; calls still run.
+"""
+import itertools
+import threading
+import time
+import tkinter as tk
+
+UI_MAX_RATE = 30  # Most GUI refreshes a second
+
+_CALL = object()
+
+
+class Timer:
+    """A periodic callback run by UiDispatcher.every()"""
+
+    def __init__(self, interval_ms, callback, active=None):
+        self.interval_ms = interval_ms if callable(interval_ms) else int(interval_ms)
+        self.callback = callback
+        self.active = active
+        self.after_id = None
+
+    def wanted(self):
+        return self.active is None or self.active()
+
+    def next_interval(self):
+        return int(self.interval_ms()) if callable(self.interval_ms) else self.interval_ms
+
+
+class UiDispatcher:
+    """Applies state changes posted from any thread on the Tk main thread"""
+
+    def __init__(self, root, max_rate=UI_MAX_RATE, clock=time.monotonic):
+        self.root = root
+        self.frame = 1.0 / max_rate
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.pending = {}  # key: (callback, args), oldest first
+        self.call_ids = itertools.count()
+        self.last_flush = 0.0
+        self.timers = {}
+        self.visible = True
+        self.closed = False
+        root.bind("<Unmap>", self._on_unmap, add="+")
+        root.bind("<Map>", self._on_map, add="+")
+        # The first flush waits for the main loop; until then posts from
+        # other threads only queue (Tk can't take their calls yet)
+        self.scheduled = True
+        root.after(0, self.flush)
+
+    def post(self, key, callback, *args):
+        """Run callback(*args) on the main thread, replacing anything still pending under key"""
+        with self.lock:
+            # Re-inserting moves the key behind older entries, so the newest value is applied last
+            self.pending.pop(key, None)
+            self.pending[key] = (callback, args)
+            wake = self.visible and not self.scheduled
+            if wake:
+                self.scheduled = True
+        if wake:
+            self._schedule()
+
+    def call(self, callback, *args):
+        """Run callback(*args) on the main thread (never coalesced, runs even while minimized)"""
+        with self.lock:
+            self.pending[(_CALL, next(self.call_ids))] = (callback, args)
+            wake = not self.scheduled
+            if wake:
+                self.scheduled = True
+        if wake:
+            self._schedule()
+
+    def _schedule(self):
+        delay = self.frame - (self.clock() - self.last_flush)
+        try:
+            self.root.after(max(0, int(delay * 1000)), self.flush)
+        except (RuntimeError, tk.TclError):
+            # The main loop has ended (shutdown)
+            with self.lock:
+                self.scheduled = False
+
+    def flush(self):
+        """Apply everything pending (main thread)"""
+        with self.lock:
+            self.scheduled = False
+            if self.visible:
+                pending, self.pending = self.pending, {}
+            else:
+                # Keep state for when the window is shown; run only the calls
+                pending = {key: entry for key, entry in self.pending.items()
+                           if type(key) is tuple and key[0] is _CALL}
+                for key in pending:
+                    del self.pending[key]
+        self.last_flush = self.clock()
+        if self.closed:
+            return
+        for callback, args in pending.values():
+            callback(*args)
+
+    def every(self, name, interval_ms, callback, active=None):
+        """Run callback every interval_ms while the window is shown and active() (if given) is true.
+
+        interval_ms may be a function returning the next interval. The
+        callback runs once right away. When a tick finds the window
+        minimized or active() false the timer is dropped until resume().
+        """
+        self.cancel(name)
+        self.timers[name] = Timer(interval_ms, callback, active)
+        self._tick(name)
+
+    def _tick(self, name):
+        timer = self.timers.get(name)
+        if timer is None:
+            return
+        timer.after_id = None
+        if not self.visible or self.closed:
+            return
+        timer.callback()
+        if timer.wanted():
+            timer.after_id = self.root.after(timer.next_interval(), self._tick, name)
+
+    def resume(self):
+        """Restart dropped timers (e.g. when a job starts)"""
+        for name, timer in self.timers.items():
+            if timer.after_id is None:
+                self._tick(name)
+
+    def restart(self, name):
+        """Run a timer now and schedule it afresh (e.g. when its interval just got shorter)"""
+        timer = self.timers.get(name)
+        if timer is not None:
+            if timer.after_id is not None:
+                self.root.after_cancel(timer.after_id)
+            self._tick(name)
+
+    def cancel(self, name):
+        timer = self.timers.pop(name, None)
+        if timer is not None and timer.after_id is not None:
+            self.root.after_cancel(timer.after_id)
+
+    def _on_unmap(self, event):
+        if event.widget is self.root:
+            self.visible = False
+
+    def _on_map(self, event):
+        if event.widget is self.root and not self.visible:
+            self.visible = True
+            self.flush()
+            self.resume()
+
+    def close(self):
+        """Stop all timers and drop pending updates"""
+        self.closed = True
+        for name in list(self.timers):
+            self.cancel(name)
+        with self.lock:
+            self.pending.clear()